@@ -1,23 +1,44 @@
 import locale
 import dateparser
 import json
+import os
+import sqlite3
+import time
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 from flask_cors import CORS
 import random
 from collections import defaultdict
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
 from datetime import datetime
 from flask import Flask, request, jsonify
 
 from flask import Flask
 from flask_cors import CORS, cross_origin
 
+from data_store import DataStore, DataSnapshot
+from interaction_index import LikedPairCounts, UserInteractionIndex
+from interaction_log import InteractionLog, build_interaction_event
+from sqlite_storage import SQLiteDataStore
+from interaction_matrix import InteractionMatrix, LIKE, as_float64
+from apriori_rules import (AssociationRecommendationTable, CompiledRules, LiveRuleSource, MiningConfig, MiningLimitExceeded,
+                           Rule, long_rules, mine_association_rules, pair_rules, rules_from_dataframe)
+from content_ann import DEFAULT_N_PROBE, IVFIndex
+from content_neighbors import DEFAULT_TOP_K, ContentNeighbors
+from content_model_store import ContentModel, ContentModelStore, catalog_fingerprint
+from content_profiles import ContentProfiles
+from content_text import HashingTfidfVectorizer, catalog_text_documents, tag_words
+from implicit_als import DEFAULT_FACTORS as ALS_DEFAULT_FACTORS, DEFAULT_ITERATIONS as ALS_DEFAULT_ITERATIONS, ImplicitALS
+from item_cf import DEFAULT_TOP_K as ITEM_CF_DEFAULT_TOP_K, ItemItemCF
+from model_registry import ModelRegistry
+from similar_games import DEFAULT_TOP_K as SIMILAR_GAMES_DEFAULT_TOP_K, SimilarGamesTable
+from svd_scoring import SVDScorer
+from user_cf import DEFAULT_TOP_K as USER_CF_DEFAULT_TOP_K, UserNeighborhoods, rating_of
+
 # Importar las bibliotecas específicas de cada módulo
-from mlxtend.frequent_patterns import apriori, association_rules
-from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
-from surprise import Dataset, Reader, KNNBasic, SVD
+from surprise import Dataset, Reader, SVD
 
 # Configuración de la localización para parsear fechas con meses en español
 try:
@@ -45,50 +66,188 @@ def load_json_data(filepath: str) -> Dict:
         print(f"Error: No se pudo decodificar JSON desde '{filepath}'. Verifica el formato del archivo.")
         return {}
 
+# --- DEFINICIÓN GLOBAL DE LA RUTA AL ARCHIVO JSON ---
+# AJUSTA ESTA RUTA SI 'datos_juegos.json' NO ESTÁ EN LA MISMA CARPETA QUE app.py
+# Si 'datos_juegos.json' está en la misma carpeta que app.py:
+DATOS_JUEGOS_FILEPATH = 'datos_juegos.json'
+# Si 'datos_juegos.json' está en una carpeta 'data' dentro de la misma carpeta que app.py:
+# DATOS_JUEGOS_FILEPATH = 'data/datos_juegos.json'
+# Si 'datos_juegos.json' está un nivel arriba de donde está app.py:
+# DATOS_JUEGOS_FILEPATH = '../datos_juegos.json'
+
+# Ruta al archivo interacciones.json
+INTERACCIONES_FILE = 'interacciones.json'
+
+# Backend SQLite opcional. Para usarlo, migra primero los JSON con
+# `python sqlite_storage.py --db sri.db` y arranca la API con SRI_SQLITE_DB=sri.db.
+SQLITE_DB_FILEPATH = os.environ.get('SRI_SQLITE_DB')
+
+# Minería de reglas de asociación: algoritmo (apriori/fpgrowth), soportes, max_len y
+# límites de seguridad configurables con las variables SRI_RULES_* (ver apriori_rules.py).
+RULES_MINING_CONFIG = MiningConfig.from_env()
+
+# Vecinos por contenido que se guardan por juego (ver content_neighbors.py).
+CONTENT_TOP_K = int(os.environ.get('SRI_CONTENT_TOP_K', DEFAULT_TOP_K))
+
+# Modelo de contenido guardado en disco por huella del catálogo (ver content_model_store.py):
+# al arrancar se mapea en memoria y solo se vuelve a ajustar si cambió datos_juegos.json.
+content_model_store = ContentModelStore(os.environ.get('SRI_CONTENT_MODEL_DIR', 'modelos_contenido'))
+
+# SRI_CONTENT_TEXT=1 agrega las descripciones (sin HTML) al modelo de contenido, además
+# de categorías y etiquetas.
+CONTENT_USE_TEXT = os.environ.get('SRI_CONTENT_TEXT') == '1'
+
+# Desde SRI_CONTENT_ANN_MIN_GAMES juegos con contenido, los vecinos y los perfiles de usuario
+# se buscan en un índice aproximado (IVF, ver content_ann.py) en lugar de en todo el catálogo.
+# SRI_CONTENT_ANN_N_PROBE: listas del índice que se revisan por consulta (más = mejor recall).
+CONTENT_ANN_MIN_GAMES = int(os.environ.get('SRI_CONTENT_ANN_MIN_GAMES', 20000))
+CONTENT_ANN_N_PROBE = int(os.environ.get('SRI_CONTENT_ANN_N_PROBE', DEFAULT_N_PROBE))
+
+# Vecinos guardados por juego en el filtrado colaborativo ítem-ítem (ver item_cf.py). Con
+# tantos o más vecinos como juegos calificados, las predicciones son las de KNNBasic.
+ITEM_CF_TOP_K = int(os.environ.get('SRI_ITEM_CF_TOP_K', ITEM_CF_DEFAULT_TOP_K))
+
+# Vecinos guardados por usuario en el filtrado colaborativo basado en usuarios (ver user_cf.py).
+USER_CF_TOP_K = int(os.environ.get('SRI_USER_CF_TOP_K', USER_CF_DEFAULT_TOP_K))
+
+# El SVD completo solo se reentrena cada SRI_SVD_REFIT_INTERVAL segundos; entre tanto, cada
+# calificación nueva recalcula los factores de su usuario (fold-in, ver svd_scoring.py).
+SVD_REFIT_INTERVAL = float(os.environ.get('SRI_SVD_REFIT_INTERVAL', 600.0))
+
+# ALS implícito (ver implicit_als.py): factores, iteraciones e hilos del entrenamiento
+# (SRI_ALS_WORKERS vacío = un hilo por CPU).
+ALS_FACTORS = int(os.environ.get('SRI_ALS_FACTORS', ALS_DEFAULT_FACTORS))
+ALS_ITERATIONS = int(os.environ.get('SRI_ALS_ITERATIONS', ALS_DEFAULT_ITERATIONS))
+ALS_WORKERS = int(os.environ['SRI_ALS_WORKERS']) if os.environ.get('SRI_ALS_WORKERS') else None
+
+# Tabla de juegos similares (ver similar_games.py): los SRI_SIMILAR_GAMES_TOP_K vecinos de cada
+# juego, guardados en SRI_SIMILAR_GAMES_PATH con cada entrenamiento y cargados al arrancar.
+SIMILAR_GAMES_TOP_K = int(os.environ.get('SRI_SIMILAR_GAMES_TOP_K', SIMILAR_GAMES_DEFAULT_TOP_K))
+SIMILAR_GAMES_PATH = os.environ.get('SRI_SIMILAR_GAMES_PATH', os.path.join('modelos_colaborativos', 'juegos_similares.npz'))
+
+# Segundos mínimos entre dos entrenamientos completos (ver model_registry.py): las escrituras
+# de ese lapso se juntan en el siguiente. Entre tanto cada evento se refleja al momento en
+# las estadísticas por juego, los conteos de pares, los perfiles de contenido, los
+# vecindarios de usuarios y el fold-in del SVD.
+MODEL_REFRESH_INTERVAL = float(os.environ.get('SRI_MODEL_REFRESH_INTERVAL', 60.0))
+
+if SQLITE_DB_FILEPATH:
+    data_store = SQLiteDataStore(SQLITE_DB_FILEPATH)
+else:
+    # Bitácora de solo-anexar para /responder_juego (interacciones.log.jsonl).
+    interaction_log = InteractionLog(INTERACCIONES_FILE)
+
+    # Almacén compartido: los JSON se leen una vez y solo se recargan si cambian en disco.
+    data_store = DataStore(INTERACCIONES_FILE, DATOS_JUEGOS_FILEPATH, 'usuarios.json', interaction_log=interaction_log)
+
 def _load_base_json_data():
-    """Carga los datos base de interacciones, juegos y usuarios."""
-    interacciones = load_json_data('interacciones.json')
-    juegos = load_json_data('datos_juegos.json')
-    usuarios = load_json_data('usuarios.json')
-    return interacciones, juegos, usuarios
+    """Devuelve los datos base de interacciones, juegos y usuarios desde el almacén compartido."""
+    snapshot = data_store.get()
+    return snapshot.interacciones, snapshot.juegos, snapshot.usuarios
 
-# --- Lógica de Preprocesamiento y Entrenamiento por Modelo (llamadas por endpoint) ---
+# --- Lógica de Preprocesamiento y Entrenamiento por Modelo (llamadas por el registro de modelos) ---
 
-def prepare_apriori_models(interacciones_data: Dict, datos_juegos_data: Dict):
-    """Prepara y entrena el modelo Apriori."""
+def basket_columns(interaction_matrix: InteractionMatrix, game_id_to_name: Dict[str, str]):
+    """
+    Columnas de la canasta de Apriori: una por nombre de juego, en orden de primera
+    aparición (varios IDs pueden compartir nombre). Devuelve (nombres, nombre→columna,
+    columna de cada código de juego).
+    """
+    column_names: List[str] = []
+    column_of_name: Dict[str, int] = {}
+    column_of_game = np.empty(interaction_matrix.n_games, dtype=np.int64)
+    for game_code, game_id in enumerate(interaction_matrix.game_ids):
+        game_name = game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})")
+        if game_name not in column_of_name:
+            column_of_name[game_name] = len(column_names)
+            column_names.append(game_name)
+        column_of_game[game_code] = column_of_name[game_name]
+    return column_names, column_of_name, column_of_game
+
+def prepare_apriori_models(interaction_matrix: InteractionMatrix, datos_juegos_data: Dict, coocurrencias: LikedPairCounts,
+                           mining_config: MiningConfig = MiningConfig(), previous_long_rules: Optional[List[Rule]] = None,
+                           remine: bool = True):
+    """
+    Prepara el modelo Apriori (o FP-Growth, según `mining_config`).
+
+    Las reglas de 2 juegos se derivan siempre de los conteos incrementales
+    (`coocurrencias`); la minería completa solo aporta las de 3 o más y se
+    ejecuta cuando `remine` es verdadero. Si no, o si la minería supera los
+    límites de itemsets o memoria, se conservan `previous_long_rules`.
+    Devuelve (reglas combinadas compiladas, reglas largas, id→nombre, nombre→id).
+    """
     game_id_to_name = {str(game_id): details['nombre'] for game_id, details in datos_juegos_data.items()}
     name_to_game_id = {details['nombre']: str(game_id) for game_id, details in datos_juegos_data.items()}
 
-    user_game_matrix = {}
-    for user_interaction in interacciones_data.get('interacciones', []):
-        user_id = user_interaction.get('id')
-        if user_id is None:
-            continue
-        user_game_matrix[user_id] = {}
-        for interaction in user_interaction.get('interacciones', []):
-            game_id = str(interaction.get('id_juego'))
-            game_name = game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})")
-
-            if (interaction.get('calificacion', 0) >= 3.5 or interaction.get('like', False)):
-                user_game_matrix[user_id][game_name] = 1
-            else:
-                user_game_matrix[user_id][game_name] = 0
-
-    df_games = pd.DataFrame.from_dict(user_game_matrix, orient='index').fillna(0).astype(bool)
+    column_names, column_of_name, column_of_game = basket_columns(interaction_matrix, game_id_to_name)
+
+    # Gustado: calificación >= 3.5 o like. Si se repite un juego, gana la última interacción.
+    liked = (interaction_matrix.ratings >= 3.5) | (interaction_matrix.likes == LIKE)
+    user_codes = interaction_matrix.user_codes
+    columns = column_of_game[interaction_matrix.game_codes]
+    cells = user_codes.astype(np.int64) * len(column_names) + columns
+    _, last_reversed = np.unique(cells[::-1], return_index=True)
+    positions = len(cells) - 1 - last_reversed
+    positions = positions[liked[positions]]
+
+    # Canasta dispersa usuarios × juegos, sin densificar. Filas: usuarios con ID válido,
+    # incluidos los que no gustan de ningún juego (cuentan para el soporte).
+    valid_users = np.array([user_id is not None for user_id in interaction_matrix.user_ids], dtype=bool)
+    row_of_user = np.cumsum(valid_users) - 1
+    positions = positions[valid_users[user_codes[positions]]]
+    basket = sp.csr_matrix(
+        (np.ones(len(positions), dtype=bool), (row_of_user[user_codes[positions]], columns[positions])),
+        shape=(int(valid_users.sum()), len(column_names))
+    )
 
-    rules = pd.DataFrame()
-    if not df_games.empty:
+    mined_long_rules = previous_long_rules or []
+    if remine and basket.shape[0] and basket.shape[1]:
         try:
-            frequent_itemsets = apriori(df_games, min_support=0.01, use_colnames=True)
-            rules = association_rules(frequent_itemsets, metric='confidence', min_threshold=0.05)
-            print(f"Apriori: {len(frequent_itemsets)} itemsets frecuentes, {len(rules)} reglas de asociación.")
+            rules, n_itemsets = mine_association_rules(basket, column_names, mining_config)
+            print(f"Reglas ({mining_config.algorithm}): {n_itemsets} itemsets frecuentes, {len(rules)} reglas de asociación.")
+            mined_long_rules = long_rules(rules_from_dataframe(rules))
+        except MiningLimitExceeded as e:
+            print(f"Advertencia: Se abortó la minería de reglas ({e}). Se conservan las reglas anteriores.")
         except Exception as e:
             print(f"Error al generar reglas de asociación Apriori: {e}")
-    else:
+            mined_long_rules = []
+    elif remine:
         print("Apriori: Matriz de usuario-juego vacía, no se generaron reglas.")
-    return rules, game_id_to_name, name_to_game_id
+        mined_long_rules = []
+
+    n_users, item_counts, pairs = coocurrencias.copy_counts()
+    rules = pair_rules(n_users, item_counts, pairs, column_of_name, game_id_to_name, mining_config)
+    return CompiledRules.from_rules(rules + mined_long_rules), mined_long_rules, game_id_to_name, name_to_game_id
 
-def prepare_cold_start_recommender(interacciones_data: Dict, datos_juegos_data: Dict, usuarios_data: Dict):
+def prepare_association_recommendations(rules: CompiledRules, long_rules_list: List[Rule], interaction_matrix: InteractionMatrix,
+                                        coocurrencias: LikedPairCounts, game_id_to_name: Dict[str, str],
+                                        mining_config: MiningConfig, computed_at: int) -> AssociationRecommendationTable:
+    """
+    Calcula en lote las recomendaciones por asociación de todos los usuarios
+    de interacciones.json (un único producto disperso contra las reglas).
+    `computed_at` es el write_seq del índice de interacciones antes de construir la matriz.
+    Los usuarios que registren interacciones después se recalculan con los conteos vivos.
+    """
+    item_of_game = np.array([
+        rules.item_code_of.get(game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})"), -1)
+        for game_id in interaction_matrix.game_ids
+    ], dtype=np.int64)
+    items = item_of_game[interaction_matrix.game_codes]
+    liked = ((interaction_matrix.ratings >= 3.5) | (interaction_matrix.likes == LIKE)) & (items >= 0)
+    liked_matrix = sp.csr_matrix(
+        (np.ones(int(liked.sum()), dtype=np.int32), (interaction_matrix.user_codes[liked], items[liked])),
+        shape=(interaction_matrix.n_users, len(rules.items))
+    )
+    live = LiveRuleSource(
+        coocurrencias,
+        CompiledRules.from_rules(long_rules_list),
+        basket_columns(interaction_matrix, game_id_to_name)[1],
+        game_id_to_name,
+        mining_config
+    )
+    return AssociationRecommendationTable.build(rules, interaction_matrix.user_ids, liked_matrix, computed_at, live=live)
+
+def prepare_cold_start_recommender(interaction_matrix: InteractionMatrix, interacciones_por_usuario: UserInteractionIndex, datos_juegos_data: Dict, usuarios_data: Dict):
     """Prepara y entrena el Cold Start Recommender."""
     class ColdStartRecommender:
         def __init__(self):
@@ -127,33 +286,28 @@ def prepare_cold_start_recommender(interacciones_data: Dict, datos_juegos_data:
                     }
             # print(f"Cold Start: Cargados {len(self.user_profiles)} usuarios.")
 
-        def calculate_category_weights_from_interactions(self, interactions_data_loaded: Dict):
+        def calculate_category_weights_from_interactions(self, interaction_matrix: InteractionMatrix):
             category_ratings_sum = defaultdict(float)
             category_ratings_count = defaultdict(int)
 
-            for user_interaction_entry in interactions_data_loaded.get("interacciones", []):
-                for game_played in user_interaction_entry.get("interacciones", []):
-                    game_appid = str(game_played["id_juego"])
-                    
-                    if game_appid in self.game_features:
-                        game_info = self.game_features[game_appid]
-                        
-                        rating = 0.0
-                        if "calificacion" in game_played and game_played["calificacion"] is not None:
-                            try:
-                                rating = float(game_played["calificacion"])
-                            except ValueError:
-                                rating = 0.0
-                        elif game_played.get("like"):
-                            rating = 5.0
-                        elif not game_played.get("like") and game_played.get("calificacion") is None:
-                            rating = 1.0
-                        
-                        all_game_content_attributes = game_info.get('categorias', []) + game_info.get('tags', [])
-                        for attribute in all_game_content_attributes:
-                            normalized_attribute = attribute.lower()
-                            category_ratings_sum[normalized_attribute] += rating
-                            category_ratings_count[normalized_attribute] += 1
+            # Calificación efectiva: la explícita si existe; si no, 5.0 con like y 1.0 en otro caso.
+            effective_ratings = np.where(
+                interaction_matrix.has_rating,
+                interaction_matrix.ratings,
+                np.where(interaction_matrix.likes == LIKE, 5.0, 1.0)
+            )
+            game_ratings_sum = interaction_matrix.per_game_sum(effective_ratings)
+            game_ratings_count = interaction_matrix.per_game_count()
+
+            for game_code, game_appid in enumerate(interaction_matrix.game_ids):
+                if game_appid in self.game_features:
+                    game_info = self.game_features[game_appid]
+
+                    all_game_content_attributes = game_info.get('categorias', []) + game_info.get('tags', [])
+                    for attribute in all_game_content_attributes:
+                        normalized_attribute = attribute.lower()
+                        category_ratings_sum[normalized_attribute] += game_ratings_sum[game_code]
+                        category_ratings_count[normalized_attribute] += int(game_ratings_count[game_code])
             
             for category, total_rating in category_ratings_sum.items():
                 count = category_ratings_count[category]
@@ -174,12 +328,7 @@ def prepare_cold_start_recommender(interacciones_data: Dict, datos_juegos_data:
 
             scores: List[Tuple[str, float]] = []
             
-            interacted_game_ids = set()
-            for user_interaction_entry in interacciones_data.get('interacciones', []):
-                if user_interaction_entry.get('id') == user_id:
-                    for interaction in user_interaction_entry.get('interacciones', []):
-                        interacted_game_ids.add(str(interaction.get('id_juego')))
-                    break
+            interacted_game_ids = {str(game_id) for game_id in interacciones_por_usuario.games(user_id)}
 
 
             for game_id, game in self.game_features.items():
@@ -221,89 +370,125 @@ def prepare_cold_start_recommender(interacciones_data: Dict, datos_juegos_data:
 
     cold_start_recommender = ColdStartRecommender()
     cold_start_recommender.load_game_data_from_json(datos_juegos_data)
-    cold_start_recommender.calculate_category_weights_from_interactions(interacciones_data)
+    cold_start_recommender.calculate_category_weights_from_interactions(interaction_matrix)
     cold_start_recommender.load_user_data_from_json(usuarios_data)
     return cold_start_recommender
 
-def prepare_content_based_models(datos_juegos_data: Dict):
-    """Prepara el modelo de similitud de contenido (TF-IDF)."""
-    game_content_list = []
-    game_ids_ordered = []
-
-    for game_id, details in datos_juegos_data.items():
-        content_words = []
-        if 'categorias' in details and details['categorias']:
-            content_words.extend([cat.lower().replace(' ', '_') for cat in details['categorias']])
-        if 'tags' in details and details['tags']:
-            content_words.extend([tag['description'].lower().replace(' ', '_') for tag in details['tags']])
-        
-        if content_words:
-            game_content_list.append(" ".join(content_words))
-            game_ids_ordered.append(str(game_id))
+def prepare_content_based_models(datos_juegos_data: Dict, top_k: int = DEFAULT_TOP_K,
+                                 store: Optional[ContentModelStore] = None,
+                                 previous_model: Optional[ContentModel] = None,
+                                 use_text: bool = False, ann_min_games: Optional[int] = None,
+                                 ann_n_probe: int = DEFAULT_N_PROBE) -> ContentModel:
+    """
+    Prepara el modelo de similitud de contenido (TF-IDF): los `top_k` juegos
+    más similares de cada juego, calculados por bloques, y los vectores de
+    contenido de cada juego, con los que se comparan los perfiles de usuario.
 
-    games_df_content = pd.DataFrame({
-        'game_id': game_ids_ordered,
-        'content': game_content_list
-    })
-    games_df_content.set_index('game_id', inplace=True)
+    Con `use_text`, además de categorías/etiquetas usa las descripciones sin
+    HTML, vectorizadas por bloques con hashing (ver content_text.py).
 
-    tfidf_matrix = None
-    content_similarity_df = pd.DataFrame()
-    if not games_df_content.empty:
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform(games_df_content['content'])
-        content_similarity_matrix = cosine_similarity(tfidf_matrix)
+    Con `ann_min_games` o más juegos, los vecinos salen de un índice aproximado
+    revisando `ann_n_probe` listas por juego (ver content_ann.py); el índice
+    queda en el modelo para las consultas de perfiles.
 
-        content_similarity_df = pd.DataFrame(content_similarity_matrix, 
-                                            index=games_df_content.index, 
-                                            columns=games_df_content.index)
-        # print("Recomendaciones de Contenido: Matriz de similitud calculada.")
+    Solo depende del contenido del catálogo: si su huella no cambió se
+    reutiliza `previous_model` o el guardado en `store`, y solo en otro caso
+    se ajusta de nuevo (y se guarda).
+    """
+    if use_text:
+        fingerprint = catalog_fingerprint(catalog_text_documents(datos_juegos_data), top_k=top_k, mode='text',
+                                          ann=[ann_min_games, ann_n_probe])
     else:
+        game_content_list = []
+        game_ids_ordered = []
+
+        for game_id, details in datos_juegos_data.items():
+            content_words = tag_words(details)
+            if content_words:
+                game_content_list.append(" ".join(content_words))
+                game_ids_ordered.append(str(game_id))
+        fingerprint = catalog_fingerprint(zip(game_ids_ordered, game_content_list), top_k=top_k, mode='tags',
+                                          ann=[ann_min_games, ann_n_probe])
+
+    if previous_model is not None and previous_model.fingerprint == fingerprint:
+        return previous_model
+    if store is not None:
+        stored_model = store.load(fingerprint)
+        if stored_model is not None:
+            return stored_model
+
+    if use_text:
+        # Se recorre el catálogo como generador: el texto solo existe bloque por bloque.
+        game_ids_ordered = []
+
+        def documents():
+            for game_id, document in catalog_text_documents(datos_juegos_data):
+                game_ids_ordered.append(game_id)
+                yield document
+
+        vectorizer = HashingTfidfVectorizer()
+        content_matrix = vectorizer.fit_transform_stream(documents())
+    elif game_content_list:
+        vectorizer = TfidfVectorizer()
+        content_matrix = vectorizer.fit_transform(game_content_list)
+
+    if not game_ids_ordered:
         print("Recomendaciones de Contenido: No hay contenido de juego disponible para calcular la similitud.")
-    return content_similarity_df, games_df_content
-
-def prepare_surprise_data_and_models(interacciones_data: Dict):
-    """Prepara los datos para Surprise y entrena el modelo KNN básico (item-based)."""
-    surprise_formatted_data = []
-    for user_interaction_entry in interacciones_data.get("interacciones", []):
-        user_id = user_interaction_entry.get("id")
-        if user_id is None:
-            continue
-
-        for game_interaction in user_interaction_entry.get("interacciones", []):
-            game_appid = str(game_interaction.get("id_juego"))
-            raw_rating = game_interaction.get("calificacion")
-            
-            try:
-                rating = float(raw_rating)
-                if not (0 <= rating <= 5):
-                    continue
-            except (ValueError, TypeError):
-                continue
-            surprise_formatted_data.append((user_id, int(game_appid), rating))
+        return ContentModel(fingerprint, None, ContentNeighbors([], sp.csr_matrix((0, 0), dtype=np.float32)),
+                            sp.csr_matrix((0, 0), dtype=np.float32))
+
+    vectors = sp.csr_matrix(content_matrix, dtype=np.float32)
+    index = None
+    if ann_min_games is not None and len(game_ids_ordered) >= ann_min_games:
+        print(f"Recomendaciones de Contenido: {len(game_ids_ordered)} juegos, vecinos con índice aproximado.")
+        index = IVFIndex.build(vectors)
+        neighbors = ContentNeighbors.from_index(game_ids_ordered, index, top_k=top_k, n_probe=ann_n_probe)
+    else:
+        neighbors = ContentNeighbors.from_vectors(game_ids_ordered, content_matrix, top_k=top_k)
+    content_model = ContentModel(fingerprint, vectorizer, neighbors, vectors, index)
+    if store is not None:
+        store.save(content_model)
+    return content_model
+
+def prepare_surprise_data_and_models(interaction_matrix: InteractionMatrix, fit_svd: bool = True):
+    """
+    Prepara los datos para Surprise: un único trainset con todas las calificaciones
+    y, sobre él, el modelo SVD, entrenado una sola vez por versión de datos
+    (o ninguno con `fit_svd=False`, cuando se reutiliza el anterior).
+    Los endpoints solo predicen.
+    """
+    ratings = as_float64(interaction_matrix.ratings)
+    valid_positions = np.flatnonzero(interaction_matrix.has_rating & (ratings >= 0) & (ratings <= 5))
+    surprise_formatted_data = [
+        (interaction_matrix.user_ids[user_code], int(interaction_matrix.game_ids[game_code]), float(rating))
+        for user_code, game_code, rating in zip(
+            interaction_matrix.user_codes[valid_positions],
+            interaction_matrix.game_codes[valid_positions],
+            ratings[valid_positions]
+        )
+        if interaction_matrix.user_ids[user_code] is not None
+    ]
     
-    item_similarity_model = None
     trainset_global = None
+    svd_model = None
     if surprise_formatted_data:
         df_global = pd.DataFrame(surprise_formatted_data, columns=['userID', 'itemID', 'rating'])
         reader_global = Reader(rating_scale=(0, 5))
         dataset_global = Dataset.load_from_df(df_global, reader_global)
         trainset_global = dataset_global.build_full_trainset()
         
-        sim_options_global = {'name': 'cosine', 'user_based': False}
-        item_similarity_model = KNNBasic(sim_options=sim_options_global)
-        item_similarity_model.fit(trainset_global)
-        # print("Modelos colaborativos: Modelo de similitud de ítems pre-entrenado.")
+        if fit_svd:
+            svd_model = SVD()
+            svd_model.fit(trainset_global)
     else:
-        print("Modelos colaborativos: No hay datos suficientes para entrenar el modelo de similitud de ítems.")
+        print("Modelos colaborativos: No hay datos suficientes para entrenar los modelos de Surprise.")
     
-    return surprise_formatted_data, item_similarity_model, trainset_global
+    return surprise_formatted_data, trainset_global, svd_model
 
-def prepare_boosting_data(interacciones_data: Dict, datos_juegos_data: Dict, usuarios_data: Dict):
+def prepare_boosting_data(interaction_matrix: InteractionMatrix, datos_juegos_data: Dict, usuarios_data: Dict):
     """Prepara los datos para el algoritmo de Boosting."""
     juegos_dict = {}
     usuarios_dict = {user["id"]: user for user in usuarios_data.get("usuarios", [])}
-    juego_interacciones = defaultdict(list)
     game_average_rating = {}
 
     for appid_str, game_info_raw in datos_juegos_data.items():
@@ -330,20 +515,18 @@ def prepare_boosting_data(interacciones_data: Dict, datos_juegos_data: Dict, usu
 
         juegos_dict[appid] = processed_game_info
 
-    for user_interaction_set in interacciones_data.get("interacciones", []):
-        for interaction in user_interaction_set["interacciones"]:
-            game_id = interaction["id_juego"]
-            if game_id in juegos_dict:
-                juego_interacciones[game_id].append({"id_usuario": user_interaction_set["id"], **interaction})
-
-    for game_id, interactions in juego_interacciones.items():
-        valid_ratings = [inter["calificacion"] for inter in interactions if "calificacion" in inter]
-        if valid_ratings:
-            game_average_rating[game_id] = sum(valid_ratings) / len(valid_ratings)
-        else:
-            game_average_rating[game_id] = 0.0
+    has_rating = interaction_matrix.has_rating
+    ratings_sum = interaction_matrix.per_game_sum(interaction_matrix.ratings, has_rating)
+    ratings_count = interaction_matrix.per_game_count(has_rating)
+    for game_code, game_id_str in enumerate(interaction_matrix.game_ids):
+        game_id = int(game_id_str) if game_id_str.isdigit() else None
+        if game_id in juegos_dict:
+            if ratings_count[game_code]:
+                game_average_rating[game_id] = float(ratings_sum[game_code] / ratings_count[game_code])
+            else:
+                game_average_rating[game_id] = 0.0
     
-    return juegos_dict, usuarios_dict, juego_interacciones, game_average_rating
+    return juegos_dict, usuarios_dict, game_average_rating
 
 
 # --- Funciones de Recomendación (extraídas de los archivos originales) ---
@@ -351,56 +534,48 @@ def prepare_boosting_data(interacciones_data: Dict, datos_juegos_data: Dict, usu
 # --- Desde recomendacion_asociacion.py ---
 def recomendar_juegos_apriori(
     user_id: int,
-    reglas: pd.DataFrame,
+    recomendaciones_precalculadas: AssociationRecommendationTable,
     game_id_to_name_map: Dict[str, str],
     name_to_game_id_map: Dict[str, str],
-    all_interactions_data: Dict,
+    interacciones_por_usuario: UserInteractionIndex,
     datos_juegos_map: Dict,
     top_n: int = 10
 ) -> List[Dict[str, Any]]:
+    reglas = recomendaciones_precalculadas.rules
     juegos_gustados_usuario_nombres_set = set()
     juegos_gustados_usuario_info: List[Dict[str, Any]] = []
 
-    for user_interaction in all_interactions_data.get('interacciones', []):
-        if user_interaction.get('id') == user_id:
-            for interaction in user_interaction.get('interacciones', []):
-                game_id = str(interaction.get('id_juego'))
-                game_name = game_id_to_name_map.get(game_id, f"Juego Desconocido ({game_id})")
-                if (interaction.get('calificacion', 0) >= 3.5 or interaction.get('like', False)):
-                    juegos_gustados_usuario_nombres_set.add(game_name)
-                    juegos_gustados_usuario_info.append({
-                        "id": game_id,
-                        "nombre": game_name
-                    })
-            break
+    # Se toma la secuencia de escrituras antes de leer las interacciones del usuario.
+    read_seq = interacciones_por_usuario.write_seq
+    for interaction in interacciones_por_usuario.games(user_id).values():
+        game_id = str(interaction.get('id_juego'))
+        game_name = game_id_to_name_map.get(game_id, f"Juego Desconocido ({game_id})")
+        if (interaction.get('calificacion', 0) >= 3.5 or interaction.get('like', False)):
+            juegos_gustados_usuario_nombres_set.add(game_name)
+            juegos_gustados_usuario_info.append({
+                "id": game_id,
+                "nombre": game_name
+            })
 
-    recomendaciones_generadas: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
-
-    if juegos_gustados_usuario_nombres_set and not reglas.empty:
-        for _, row in reglas.iterrows():
-            antecedents_as_set = frozenset(row['antecedents'])
-            if antecedents_as_set.issubset(juegos_gustados_usuario_nombres_set):
-                matched_user_games = [
-                    game_info for game_info in juegos_gustados_usuario_info
-                    if game_info['nombre'] in antecedents_as_set
-                ]
-                new_recommendations = row['consequents'] - juegos_gustados_usuario_nombres_set
-                for game_name_consequent in new_recommendations:
-                    current_confidence = row['confidence']
-                    if game_name_consequent not in recomendaciones_generadas or \
-                       current_confidence > recomendaciones_generadas[game_name_consequent][0]:
-                        recomendaciones_generadas[game_name_consequent] = (current_confidence, matched_user_games)
+    # Se sirven desde la tabla calculada en lote; solo se recalculan (contra la máscara de
+    # bits de los juegos gustados) si el usuario registró interacciones después del lote.
+    sorted_recommendations: List[Tuple[str, float, int]] = []
+    if top_n == recomendaciones_precalculadas.top_n:
+        sorted_recommendations = recomendaciones_precalculadas.recommendations(
+            user_id, juegos_gustados_usuario_nombres_set, read_seq, interacciones_por_usuario.last_write(user_id)
+        )
+    elif juegos_gustados_usuario_nombres_set:
+        sorted_recommendations = reglas.match(juegos_gustados_usuario_nombres_set, top_n=top_n)
 
     final_recomendaciones_info: List[Dict[str, Any]] = []
 
-    if recomendaciones_generadas:
-        sorted_recommendations = sorted(
-            recomendaciones_generadas.items(),
-            key=lambda item: item[1][0],
-            reverse=True
-        )[:top_n]
-
-        for game_name, (confidence, based_on_games) in sorted_recommendations:
+    if sorted_recommendations:
+        for game_name, confidence, antecedents_as_set in sorted_recommendations:
+            # Explicación: los juegos gustados del usuario que forman el antecedente de la regla ganadora.
+            based_on_games = [
+                game_info for game_info in juegos_gustados_usuario_info
+                if game_info['nombre'] in antecedents_as_set
+            ]
             game_id = name_to_game_id_map.get(game_name)
             if game_id and game_id in datos_juegos_map:
                 game_data = datos_juegos_map[game_id].copy()
@@ -417,24 +592,23 @@ def recomendar_juegos_apriori(
 
 
 # --- Desde recomendacion_contenido_usuario.py ---
-def recomendar_juegos_tfidf(user_id, all_interactions, all_games_data, content_sim_df, games_df_content, top_n=5):
+def recomendar_juegos_tfidf(user_id, interacciones_por_usuario, all_games_data, content_neighbors: ContentNeighbors, top_n=5):
     
-    if all_interactions is None or all_games_data is None or content_sim_df is None or content_sim_df.empty:
-        return {"error": "Los datos necesarios para las recomendaciones no están disponibles. Asegúrate de que los archivos JSON se hayan cargado correctamente y que el DataFrame de similitud no esté vacío."}
+    if interacciones_por_usuario is None or all_games_data is None or content_neighbors is None or content_neighbors.n_games == 0:
+        return {"error": "Los datos necesarios para las recomendaciones no están disponibles. Asegúrate de que los archivos JSON se hayan cargado correctamente y que haya vecinos de similitud calculados."}
 
-    user_interactions = None
-    for interaction_entry in all_interactions.get('interacciones', []):
-        if interaction_entry.get('id') == user_id:
-            user_interactions = interaction_entry.get('interacciones', [])
-            break
+    user_interactions = list(interacciones_por_usuario.games(user_id).values())
 
-    if user_interactions is None or not user_interactions:
+    if not user_interactions:
         return {"message": f"No se encontraron interacciones para el usuario ID: {user_id}. No se pueden generar recomendaciones basadas en contenido."}
 
     played_game_ids = set()
+    # Calificación de cada juego del usuario, para no volver a recorrer sus interacciones por cada candidato.
+    rating_by_game_id = {}
     for interaction in user_interactions:
         game_id_str = str(interaction.get('id_juego'))
         played_game_ids.add(game_id_str)
+        rating_by_game_id.setdefault(game_id_str, interaction.get('calificacion', 0))
 
     highly_rated_game_ids = []
     for interaction in user_interactions:
@@ -446,33 +620,22 @@ def recomendar_juegos_tfidf(user_id, all_interactions, all_games_data, content_s
     if not highly_rated_game_ids:
         return []
 
-    predicted_scores = {}
-    for game_id_to_predict in games_df_content.index: # Usa games_df_content para iterar sobre los juegos disponibles
-        if game_id_to_predict not in played_game_ids:
-            sim_sum = 0
-            weighted_score_sum = 0
-            
-            for liked_game_id in highly_rated_game_ids:
-                if liked_game_id in content_sim_df.columns and game_id_to_predict in content_sim_df.index:
-                    similarity = content_sim_df.loc[game_id_to_predict, liked_game_id]
-                    
-                    current_rating = 0
-                    for interaction in user_interactions:
-                        if str(interaction.get('id_juego')) == liked_game_id:
-                            current_rating = interaction.get('calificacion', 0)
-                            break
-                    
-                    if current_rating > 0:
-                        weighted_score_sum += similarity * current_rating
-                        sim_sum += similarity
-                    else:
-                        weighted_score_sum += similarity * 5
-                        sim_sum += similarity
-            
-            if sim_sum > 0:
-                predicted_scores[game_id_to_predict] = weighted_score_sum / sim_sum
-                
-    recommended_games_raw = sorted(predicted_scores.items(), key=lambda x: x[1], reverse=True)
+    # Un producto disperso sobre las filas de vecinos de los juegos gustados: peso = su
+    # calificación, o 5 si solo tienen like. Los juegos ya jugados quedan fuera.
+    liked_codes = []
+    weights = []
+    for liked_game_id in highly_rated_game_ids:
+        game_code = content_neighbors.game_code_of.get(liked_game_id)
+        if game_code is not None:
+            current_rating = rating_by_game_id.get(liked_game_id, 0)
+            liked_codes.append(game_code)
+            weights.append(current_rating if current_rating > 0 else 5)
+    played_codes = [content_neighbors.game_code_of[game_id] for game_id in played_game_ids if game_id in content_neighbors.game_code_of]
+
+    recommended_games_raw = [
+        (content_neighbors.game_ids[game_code], score_value)
+        for game_code, score_value in content_neighbors.recommend(liked_codes, weights, played_codes, top_n)
+    ]
     
     if not recommended_games_raw:
         return []
@@ -492,35 +655,47 @@ def recomendar_juegos_tfidf(user_id, all_interactions, all_games_data, content_s
     
     return final_recommendations_info
 
-# --- Desde recomendaciones_colaborativo_surprise.py ---
-def recommend_user_based(data_for_surprise: List[Tuple[int, int, float]], games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
-    df = pd.DataFrame(data_for_surprise, columns=['userID', 'itemID', 'rating'])
-    
-    if target_user_id not in df['userID'].unique():
-        return []
+def recomendar_juegos_perfil_contenido(user_id, interacciones_por_usuario, all_games_data, content_profiles: ContentProfiles, top_n=5):
+    """
+    Variante por perfil de recomendar_juegos_tfidf: el perfil del usuario (suma de
+    los vectores de contenido de los juegos que le gustan, ponderada por su
+    calificación, o 5 si solo tienen like) se mantiene al día con cada
+    /responder_juego y aquí solo se compara contra el catálogo. El puntaje es la
+    similitud coseno con el perfil (0 a 1), no una calificación predicha.
+    """
+    if interacciones_por_usuario is None or all_games_data is None or content_profiles is None or content_profiles.n_games == 0:
+        return {"error": "Los datos necesarios para las recomendaciones no están disponibles. Asegúrate de que los archivos JSON se hayan cargado correctamente y que haya vectores de contenido calculados."}
 
-    reader = Reader(rating_scale=(0, 5)) 
-    dataset = Dataset.load_from_df(df, reader)
-    trainset = dataset.build_full_trainset()
-    
-    sim_options = {'name': 'cosine', 'user_based': True}
-    model = KNNBasic(sim_options=sim_options)
-    model.fit(trainset)
+    user_interactions = list(interacciones_por_usuario.games(user_id).values())
 
-    all_game_ids = set(df['itemID'].unique())
-    interacted_games = set(df[df['userID'] == target_user_id]['itemID'])
-    
-    uninteracted_games = all_game_ids - interacted_games
+    if not user_interactions:
+        return {"message": f"No se encontraron interacciones para el usuario ID: {user_id}. No se pueden generar recomendaciones basadas en contenido."}
 
-    predictions = []
-    for game_id in uninteracted_games:
-        prediction = model.predict(target_user_id, game_id)
-        predictions.append((game_id, prediction.est))
-    
-    predictions.sort(key=lambda x: -x[1])
-    
+    played_game_ids = {str(interaction.get('id_juego')) for interaction in user_interactions}
+    recommended_games_raw = content_profiles.recommend(user_id, played_game_ids, top_n)
+
+    final_recommendations_info = []
+    for game_id, score_value in recommended_games_raw:
+        game_info = all_games_data.get(game_id, {}).copy()
+        if game_info:
+            game_info['id'] = game_id
+            game_info['score'] = round(float(score_value), 4)
+            game_info['id_user'] = user_id
+            final_recommendations_info.append(game_info)
+
+    return final_recommendations_info
+
+# --- Desde recomendaciones_colaborativo_surprise.py ---
+def recommend_user_based(user_neighborhoods: UserNeighborhoods, games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
+    if user_neighborhoods is None or target_user_id not in user_neighborhoods.user_code_of:
+        return []
+
+    # Las predicciones salen solo de los vecinos guardados del usuario (al día con
+    # cada /responder_juego), sin recalcular similitudes entre todos los usuarios.
     num_recommendations = random.randint(min_n, max_n)
-    final_recommendations_raw = predictions[:min(num_recommendations, len(predictions))]
+    final_recommendations_raw = user_neighborhoods.recommend(target_user_id, num_recommendations)
+    if final_recommendations_raw is None:
+        return []
 
     formatted_recommendations: List[Dict] = []
     for game_id, score in final_recommendations_raw:
@@ -532,41 +707,50 @@ def recommend_user_based(data_for_surprise: List[Tuple[int, int, float]], games_
             formatted_recommendations.append(game_info)
     return formatted_recommendations
 
-def recommend_item_based(data_for_surprise: List[Tuple[int, int, float]], games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
-    df = pd.DataFrame(data_for_surprise, columns=['userID', 'itemID', 'rating'])
-
-    if target_user_id not in df['userID'].unique():
+def recommend_item_based(item_cf: ItemItemCF, games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
+    if item_cf is None or target_user_id not in item_cf.user_code_of:
         return []
-    
-    reader = Reader(rating_scale=(0, 5))
-    dataset = Dataset.load_from_df(df, reader)
-    trainset = dataset.build_full_trainset()
 
-    sim_options = {'name': 'cosine', 'user_based': False}
-    model = KNNBasic(sim_options=sim_options)
-    model.fit(trainset)
+    # Predicciones de todo el catálogo con dos productos dispersos sobre la tabla de
+    # vecinos ítem-ítem, en lugar de un KNNBasic.predict por juego.
+    num_recommendations = random.randint(min_n, max_n)
+    final_recommendations_raw = item_cf.recommend(target_user_id, num_recommendations)
 
-    all_game_ids = set(df['itemID'].unique())
-    interacted_games = set(df[df['userID'] == target_user_id]['itemID'])
-    
-    uninteracted_games = all_game_ids - interacted_games
+    formatted_recommendations: List[Dict] = []
+    for game_id, score in final_recommendations_raw:
+        game_info = games_raw_data.get(str(game_id), {}).copy()
+        if game_info:
+            game_info['id'] = str(game_id)
+            game_info['score'] = round(score, 2)
+            game_info['id_user'] = target_user_id
+            formatted_recommendations.append(game_info)
+    return formatted_recommendations
 
-    predictions = []
-    for game_id in uninteracted_games:
-        prediction = model.predict(target_user_id, game_id)
-        predictions.append((game_id, prediction.est))
-    
-    predictions.sort(key=lambda x: -x[1])
-    
+def fold_in_svd_user(svd_scorer: SVDScorer, interaction_index: UserInteractionIndex, user_id) -> bool:
+    """Recalcula los factores SVD del usuario con sus calificaciones actuales, sin reentrenar el modelo."""
+    ratings = []
+    for id_juego, interaction in interaction_index.games(user_id).items():
+        rating = rating_of(interaction)
+        if rating is not None:
+            ratings.append((int(id_juego), rating))
+    return svd_scorer.fold_in(user_id, ratings)
+
+def recommend_implicit_als(implicit_als: ImplicitALS, games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
+    if implicit_als is None:
+        return []
+
+    # Un producto de los factores del usuario por los de todos los juegos.
     num_recommendations = random.randint(min_n, max_n)
-    final_recommendations_raw = predictions[:min(num_recommendations, len(predictions))]
+    final_recommendations_raw = implicit_als.recommend(target_user_id, num_recommendations)
+    if final_recommendations_raw is None:
+        return []
 
     formatted_recommendations: List[Dict] = []
     for game_id, score in final_recommendations_raw:
         game_info = games_raw_data.get(str(game_id), {}).copy()
         if game_info:
             game_info['id'] = str(game_id)
-            game_info['score'] = round(score, 2)
+            game_info['score'] = round(score, 4)
             game_info['id_user'] = target_user_id
             formatted_recommendations.append(game_info)
     return formatted_recommendations
@@ -574,25 +758,18 @@ def recommend_item_based(data_for_surprise: List[Tuple[int, int, float]], games_
 def get_similar_games(
     target_game_id: int,
     games_raw_data: Dict,
-    model: KNNBasic,
-    trainset,
+    similar_games: SimilarGamesTable,
     top_n: int = 10
 ) -> List[Dict]:
-    try:
-        target_game_inner_id = trainset.to_inner_iid(target_game_id)
-    except ValueError:
-        print(f"Advertencia: El juego con ID {target_game_id} no se encontró en el trainset. No se pueden obtener juegos similares.")
+    # Una fila de la tabla precalculada, ya ordenada de mayor a menor similitud.
+    neighbors = similar_games.similar_to(target_game_id)
+    if not neighbors:
+        print(f"Advertencia: El juego con ID {target_game_id} no tiene juegos similares calculados.")
         return []
 
-    neighbors_inner_ids = model.get_neighbors(target_game_inner_id, k=top_n + 1)
-
     similar_games_info: List[Dict] = []
     
-    for inner_id in neighbors_inner_ids:
-        similar_game_id = trainset.to_raw_iid(inner_id)
-        
-        similarity_score = model.sim[target_game_inner_id, inner_id]
-
+    for similar_game_id, similarity_score in neighbors:
         game_info = games_raw_data.get(str(similar_game_id), {}).copy()
         if game_info:
             game_info['id'] = str(similar_game_id)
@@ -607,33 +784,14 @@ def get_similar_games(
 
     return similar_games_info
 
-def recommend_svd_ranking(data_for_surprise: List[Tuple[int, int, float]], games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
-    df = pd.DataFrame(data_for_surprise, columns=['userID', 'itemID', 'rating'])
-
-    if target_user_id not in df['userID'].unique():
+def recommend_svd_ranking(svd_scorer: SVDScorer, games_raw_data: Dict, target_user_id: int, min_n: int = 5, max_n: int = 10) -> List[Dict]:
+    if svd_scorer is None or not svd_scorer.has_user(target_user_id):
         return []
 
-    reader = Reader(rating_scale=(0, 5))
-    dataset = Dataset.load_from_df(df, reader)
-    trainset = dataset.build_full_trainset()
-
-    model = SVD()
-    model.fit(trainset)
-
-    all_game_ids = set(df['itemID'].unique())
-    interacted_games = set(df[df['userID'] == target_user_id]['itemID'])
-    
-    uninteracted_games = all_game_ids - interacted_games
-
-    predictions = []
-    for game_id in uninteracted_games:
-        prediction = model.predict(target_user_id, game_id)
-        predictions.append((game_id, prediction.est))
-    
-    predictions.sort(key=lambda x: -x[1])
-    
+    # Todos los juegos sin calificar se puntúan con una sola expresión vectorizada
+    # (mu + b_u + b_i + P[u] @ Q.T) en lugar de un model.predict por juego.
     num_recommendations = random.randint(min_n, max_n)
-    final_recommendations_raw = predictions[:min(num_recommendations, len(predictions))]
+    final_recommendations_raw = svd_scorer.recommend(target_user_id, num_recommendations)
 
     formatted_recommendations: List[Dict] = []
     for game_id, score in final_recommendations_raw:
@@ -646,13 +804,11 @@ def recommend_svd_ranking(data_for_surprise: List[Tuple[int, int, float]], games
     return formatted_recommendations
 
 # --- Desde recomendaciones_globales.py ---
-def get_most_played_games(interacciones_data_loaded: Dict, datos_juegos_data_loaded: Dict, limit=10):
-    game_playtime = defaultdict(float)
-    for user_interaction in interacciones_data_loaded.get("interacciones", []):
-        for interaction in user_interaction.get("interacciones", []):
-            game_id = str(interaction.get("id_juego"))
-            hours_played = interaction.get("horas_jugadas", 0.0)
-            game_playtime[game_id] += hours_played if hours_played > 0 else 1
+def get_most_played_games(interaction_matrix: InteractionMatrix, datos_juegos_data_loaded: Dict, limit=10):
+    # Cada interacción suma sus horas jugadas, o 1 si no tiene horas.
+    hours = interaction_matrix.hours
+    playtime = interaction_matrix.per_game_sum(np.where(hours > 0, hours, 1.0))
+    game_playtime = {game_id: float(playtime[game_code]) for game_code, game_id in enumerate(interaction_matrix.game_ids)}
 
     sorted_games_by_playtime = sorted(game_playtime.items(), key=lambda item: item[1], reverse=True)
 
@@ -665,22 +821,21 @@ def get_most_played_games(interacciones_data_loaded: Dict, datos_juegos_data_loa
             top_played_games.append(game_info)
     return top_played_games
 
-def get_top_rated_games(interacciones_data_loaded: Dict, datos_juegos_data_loaded: Dict, limit=10):
-    game_ratings_sum = {}
-    game_ratings_count = {}
+def get_top_rated_games(interaction_matrix: InteractionMatrix, datos_juegos_data_loaded: Dict, limit=10):
+    has_rating = interaction_matrix.has_rating
+    ratings_sum = interaction_matrix.per_game_sum(interaction_matrix.ratings, has_rating)
+    ratings_count = interaction_matrix.per_game_count(has_rating)
 
-    for user_interaction in interacciones_data_loaded.get("interacciones", []):
-        for interaction in user_interaction.get("interacciones", []):
-            game_id = str(interaction.get("id_juego"))
-            rating = interaction.get("calificacion")
-
-            if rating is not None and isinstance(rating, (int, float)):
-                game_ratings_sum[game_id] = game_ratings_sum.get(game_id, 0) + rating
-                game_ratings_count[game_id] = game_ratings_count.get(game_id, 0) + 1
+    # Los empates se resuelven por orden de primera calificación, como antes.
+    rated_positions = np.flatnonzero(has_rating)
+    _, first_rated = np.unique(interaction_matrix.game_codes[rated_positions], return_index=True)
+    rated_game_codes = interaction_matrix.game_codes[rated_positions[np.sort(first_rated)]]
 
     game_average_ratings = {}
-    for game_id, total_rating in game_ratings_sum.items():
-        count = game_ratings_count[game_id]
+    for game_code in rated_game_codes:
+        game_id = interaction_matrix.game_ids[game_code]
+        total_rating = float(ratings_sum[game_code])
+        count = int(ratings_count[game_code])
         if count > 0:
             game_average_ratings[game_id] = total_rating / count
         else: # Si no hay calificaciones, asigna 0.0 para evitar divisiones por cero
@@ -797,6 +952,172 @@ def get_general_cold_start_recommendations(
     return final_recs
 
 
+# --- Registro de Modelos (se entrenan una vez por versión de datos) ---
+
+class TrainedModels(NamedTuple):
+    """Conjunto completo de modelos entrenados sobre un mismo snapshot de datos."""
+    snapshot: DataSnapshot
+    interaction_matrix: InteractionMatrix
+    # Apriori
+    rules: CompiledRules
+    # Reglas de 3 o más juegos de la última minería completa y cuándo se hizo (time.time()).
+    long_rules: List[Rule]
+    rules_mined_at: float
+    association_recommendations: AssociationRecommendationTable
+    game_id_to_name: Dict[str, str]
+    name_to_game_id: Dict[str, str]
+    # Cold Start
+    cold_start_recommender: Any
+    # Contenido (TF-IDF)
+    content_model: ContentModel
+    # Colaborativo: el SVD de Surprise se entrena sobre trainset_global.
+    surprise_formatted_data: List[Tuple[int, int, float]]
+    trainset_global: Any
+    svd_model: Any
+    svd_scorer: Optional[SVDScorer]
+    # Cuándo se entrenó svd_model (time.time()); entre reentrenamientos se reutiliza con fold-in.
+    svd_fitted_at: float
+    # write_seq del índice de interacciones antes de leer los datos de este entrenamiento.
+    computed_at: int
+    item_cf: Optional[ItemItemCF]
+    similar_games: Optional[SimilarGamesTable]
+    implicit_als: Optional[ImplicitALS]
+    # Boosting
+    juegos_dict: Dict
+    game_average_rating: Dict
+    # Globales
+    most_played: List[Dict[str, Any]]
+    top_rated: List[Dict[str, Any]]
+
+def build_models(snapshot: DataSnapshot) -> TrainedModels:
+    """Entrena todas las estrategias de recomendación a partir de un snapshot del almacén."""
+    interacciones_data, datos_juegos_data, usuarios_data = snapshot.interacciones, snapshot.juegos, snapshot.usuarios
+
+    # Escrituras ya incluidas en los datos con los que se entrena (se toma antes de leerlos).
+    computed_at = snapshot.interacciones_por_usuario.write_seq
+
+    # Representación columnar compartida: se recorre el JSON anidado una sola vez por versión.
+    interaction_matrix = InteractionMatrix.from_interacciones(interacciones_data)
+
+    # La minería completa (itemsets de 3 o más) solo se repite cada SRI_RULES_REMINE_INTERVAL segundos;
+    # entre tanto, las reglas de pares salen de los conteos incrementales del snapshot.
+    previous_models = model_registry.get()
+    remine = previous_models is None or time.time() - previous_models.rules_mined_at >= RULES_MINING_CONFIG.remine_interval
+    rules_mined_at = time.time() if remine else previous_models.rules_mined_at
+    rules, long_rules_list, game_id_to_name, name_to_game_id = prepare_apriori_models(
+        interaction_matrix,
+        datos_juegos_data,
+        snapshot.coocurrencias,
+        RULES_MINING_CONFIG,
+        previous_long_rules=previous_models.long_rules if previous_models is not None else None,
+        remine=remine
+    )
+    association_recommendations = prepare_association_recommendations(
+        rules, long_rules_list, interaction_matrix, snapshot.coocurrencias, game_id_to_name, RULES_MINING_CONFIG, computed_at
+    )
+    cold_start_recommender = prepare_cold_start_recommender(interaction_matrix, snapshot.interacciones_por_usuario, datos_juegos_data, usuarios_data)
+    # El catálogo solo cambia cuando el DataStore recarga datos_juegos.json (objeto nuevo): mientras
+    # sea el mismo objeto, se reutiliza el modelo anterior sin volver a calcular la huella.
+    if previous_models is not None and previous_models.snapshot.juegos is datos_juegos_data:
+        content_model = previous_models.content_model
+    else:
+        content_model = prepare_content_based_models(
+            datos_juegos_data,
+            CONTENT_TOP_K,
+            store=content_model_store,
+            previous_model=previous_models.content_model if previous_models is not None else None,
+            use_text=CONTENT_USE_TEXT,
+            ann_min_games=CONTENT_ANN_MIN_GAMES,
+            ann_n_probe=CONTENT_ANN_N_PROBE
+        )
+    # Los perfiles de contenido viven en el snapshot y se actualizan con cada evento;
+    # aquí solo reciben los vectores del modelo (si cambió) y se recalculan de una vez.
+    snapshot.perfiles_contenido.attach(content_model.fingerprint, content_model.neighbors.game_ids, content_model.vectors,
+                                       content_model.index, CONTENT_ANN_N_PROBE)
+    # El SVD completo solo se reentrena cada SRI_SVD_REFIT_INTERVAL segundos; entre tanto se
+    # reutiliza el anterior, que ya tiene el fold-in de los usuarios que calificaron después.
+    refit_svd = (previous_models is None or previous_models.svd_scorer is None
+                 or time.time() - previous_models.svd_fitted_at >= SVD_REFIT_INTERVAL)
+    surprise_formatted_data, trainset_global, svd_model = prepare_surprise_data_and_models(interaction_matrix, fit_svd=refit_svd)
+    # Los vecindarios de usuarios viven en el snapshot y se actualizan con cada evento;
+    # aquí se recalculan completos una vez por versión.
+    snapshot.vecindarios_usuarios.rebuild(USER_CF_TOP_K)
+    if refit_svd:
+        svd_fitted_at = time.time()
+        # Los usuarios que calificaron mientras se entrenaba reciben su fold-in al publicar (ver fold_in_pending_users).
+        svd_scorer = SVDScorer.from_model(svd_model, trainset_global) if svd_model is not None else None
+    else:
+        svd_model, svd_scorer, svd_fitted_at = previous_models.svd_model, previous_models.svd_scorer, previous_models.svd_fitted_at
+    item_cf = ItemItemCF.from_ratings(surprise_formatted_data, top_k=ITEM_CF_TOP_K) if surprise_formatted_data else None
+    # Juegos similares: los vecinos de item_cf recortados a una tabla compacta que se guarda
+    # en disco para el siguiente arranque.
+    similar_games = None
+    if item_cf is not None:
+        similar_games = SimilarGamesTable.from_item_neighbors(item_cf.item_ids, item_cf.neighbors, SIMILAR_GAMES_TOP_K)
+        similar_games.save(SIMILAR_GAMES_PATH)
+    # ALS implícito: usa todas las interacciones (likes, dislikes, calificaciones y horas).
+    implicit_als = ImplicitALS.fit(interaction_matrix, factors=ALS_FACTORS, iterations=ALS_ITERATIONS,
+                                   workers=ALS_WORKERS) if interaction_matrix.nnz else None
+    juegos_dict, _, game_average_rating = prepare_boosting_data(interaction_matrix, datos_juegos_data, usuarios_data)
+
+    return TrainedModels(
+        snapshot=snapshot,
+        rules=rules,
+        long_rules=long_rules_list,
+        rules_mined_at=rules_mined_at,
+        association_recommendations=association_recommendations,
+        game_id_to_name=game_id_to_name,
+        name_to_game_id=name_to_game_id,
+        cold_start_recommender=cold_start_recommender,
+        content_model=content_model,
+        surprise_formatted_data=surprise_formatted_data,
+        trainset_global=trainset_global,
+        svd_model=svd_model,
+        svd_scorer=svd_scorer,
+        svd_fitted_at=svd_fitted_at,
+        computed_at=computed_at,
+        item_cf=item_cf,
+        similar_games=similar_games,
+        implicit_als=implicit_als,
+        juegos_dict=juegos_dict,
+        game_average_rating=game_average_rating,
+        most_played=get_most_played_games(interaction_matrix, datos_juegos_data),
+        top_rated=get_top_rated_games(interaction_matrix, datos_juegos_data),
+        interaction_matrix=interaction_matrix,
+    )
+
+def fold_in_pending_users(models: TrainedModels) -> None:
+    """
+    Fold-in en el SVD recién publicado de cada usuario que escribió después de
+    que empezara su entrenamiento. Esas escrituras no están en el trainset y
+    /responder_juego pudo aplicarlas sobre el conjunto anterior; las que llegan
+    después de publicar ya las aplica /responder_juego sobre este. Repetir un
+    fold-in da el mismo resultado.
+    """
+    if models.svd_scorer is None:
+        return
+    interaction_index = models.snapshot.interacciones_por_usuario
+    for user_id in interaction_index.written_since(models.computed_at):
+        fold_in_svd_user(models.svd_scorer, interaction_index, user_id)
+
+model_registry = ModelRegistry(data_store, build_models, on_publish=fold_in_pending_users,
+                               min_interval=MODEL_REFRESH_INTERVAL)
+
+# Tabla de juegos similares del último entrenamiento guardado: responde mientras
+# todavía no hay modelos publicados en este proceso.
+stored_similar_games = SimilarGamesTable.load(SIMILAR_GAMES_PATH)
+
+# Se ejecutará una sola vez al iniciar la aplicación; después el registro
+# reconstruye los modelos en segundo plano cuando cambian los datos.
+with app.app_context():
+    print("Iniciando carga de datos y pre-cálculo de modelos...")
+    model_registry.start()
+    data_store.start_compactor()
+
+def _models_not_ready():
+    return jsonify({"error": "Los modelos de recomendación todavía no están disponibles. Intenta de nuevo en unos segundos."}), 503
+
+
 # --- Endpoints de Flask unificados ---
 
 # Endpoints de Recomendaciones Globales
@@ -804,10 +1125,12 @@ def get_general_cold_start_recommendations(
 def global_most_played_games_endpoint():
     """
     Endpoint para obtener los 10 juegos más jugados/interactuados globalmente.
-    Recarga interacciones y datos de juegos en cada solicitud.
+    Sirve el ranking precalculado por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, _ = _load_base_json_data()
-    recommendations = get_most_played_games(interacciones_data, datos_juegos_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    recommendations = models.most_played
 
     if not recommendations:
         return jsonify({"message": "No se pudieron encontrar juegos más jugados globalmente."}), 404
@@ -819,10 +1142,12 @@ def global_top_rated_games_endpoint():
     """
     Endpoint para obtener los 10 juegos mejor valorados globalmente
     basados en su calificación promedio.
-    Recarga interacciones y datos de juegos en cada solicitud.
+    Sirve el ranking precalculado por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, _ = _load_base_json_data()
-    recommendations = get_top_rated_games(interacciones_data, datos_juegos_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    recommendations = models.top_rated
 
     if not recommendations:
         return jsonify({"message": "No se pudieron encontrar juegos mejor valorados globalmente."}), 404
@@ -834,21 +1159,22 @@ def global_top_rated_games_endpoint():
 def get_apriori_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones de juegos basadas en reglas de asociación (Apriori) para un usuario específico.
-    Carga datos y entrena el modelo Apriori en cada solicitud.
+    Usa las reglas precalculadas por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, _ = _load_base_json_data()
-    rules, game_id_to_name, name_to_game_id = prepare_apriori_models(interacciones_data, datos_juegos_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
 
-    if rules.empty:
+    if models.rules.n_rules == 0:
         return jsonify({"error": "No se han cargado reglas de asociación o no se pudieron generar."}), 500
 
     recommendations = recomendar_juegos_apriori(
         user_id,
-        rules,
-        game_id_to_name,
-        name_to_game_id,
-        interacciones_data,
-        datos_juegos_data,
+        models.association_recommendations,
+        models.game_id_to_name,
+        models.name_to_game_id,
+        models.snapshot.interacciones_por_usuario,
+        models.snapshot.juegos,
         top_n=10
     )
     
@@ -867,10 +1193,13 @@ def get_cold_start_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones para usuarios en "cold start"
     basadas en sus datos de perfil (edad, géneros favoritos).
-    Carga datos y prepara el Cold Start Recommender en cada solicitud.
+    Usa el Cold Start Recommender precalculado por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    cold_start_recommender = prepare_cold_start_recommender(interacciones_data, datos_juegos_data, usuarios_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    cold_start_recommender = models.cold_start_recommender
 
     try:
         user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
@@ -896,21 +1225,21 @@ def user_content_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones de juegos basadas en contenido
     para un usuario específico.
-    Carga datos y prepara el modelo de contenido en cada solicitud.
+    Puntúa con la tabla de vecinos por contenido precalculada por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
     user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
     if not user_exists:
         return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
 
-    content_similarity_df, games_df_content = prepare_content_based_models(datos_juegos_data)
-
     recommendations = recomendar_juegos_tfidf(
         user_id,
-        interacciones_data,
-        datos_juegos_data,
-        content_similarity_df,
-        games_df_content, # Pasar games_df_content
+        models.snapshot.interacciones_por_usuario,
+        models.snapshot.juegos,
+        models.content_model.neighbors,
         top_n=10
     )
 
@@ -919,32 +1248,65 @@ def user_content_recommendations_endpoint(user_id):
     
     return jsonify({"user_id": user_id, "recommendations": recommendations})
 
+@app.route('/recommendations/content-profile/<int:user_id>', methods=['GET'])
+def user_content_profile_recommendations_endpoint(user_id):
+    """
+    Recomendaciones basadas en contenido por perfil de usuario: compara el perfil
+    de contenido del usuario (al día con cada /responder_juego) con el catálogo,
+    con el índice aproximado en catálogos grandes. El puntaje es la similitud
+    coseno con el perfil.
+    """
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
+    if not user_exists:
+        return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
+
+    recommendations = recomendar_juegos_perfil_contenido(
+        user_id,
+        models.snapshot.interacciones_por_usuario,
+        models.snapshot.juegos,
+        models.snapshot.perfiles_contenido,
+        top_n=10
+    )
+
+    if not recommendations:
+        return jsonify({"user_id": user_id, "recommendations": [], "message": f"No se encontraron recomendaciones de contenido para el usuario {user_id}. Asegúrese de que el usuario tenga interacciones significativas."}), 404
+
+    return jsonify({"user_id": user_id, "recommendations": recommendations})
+
 # Endpoints de Recomendaciones Colaborativas (Surprise)
 @app.route('/recommendations/collaborative/user-based/<int:user_id>', methods=['GET'])
 def get_user_based_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones colaborativas basadas en usuario para un usuario específico.
-    Carga datos y entrena el modelo KNN user-based en cada solicitud.
+    Usa los vecinos de cada usuario precalculados (user_cf.py) y mantenidos al día con cada evento.
     Si no hay interacciones para el usuario, devuelve juegos populares.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    surprise_formatted_data, _, _ = prepare_surprise_data_and_models(interacciones_data) 
-
-    if not surprise_formatted_data:
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    datos_juegos_data = models.snapshot.juegos
+    trainset_global = models.trainset_global
+
+    if trainset_global is None:
         return jsonify({"error": "Datos no cargados para recomendaciones colaborativas."}), 500
 
     user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
     if not user_exists:
         return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
 
-    recommendations = recommend_user_based(surprise_formatted_data, datos_juegos_data, user_id)
+    recommendations = recommend_user_based(models.snapshot.vecindarios_usuarios, datos_juegos_data, user_id)
     
     if not recommendations:
         # Si no se encontraron recomendaciones User-Based, proporcionar un fallback de juegos populares
         print(f"No se encontraron recomendaciones User-Based para el usuario ID: {user_id}. Proporcionando fallback de juegos populares.")
         
-        most_played = get_most_played_games(interacciones_data, datos_juegos_data, limit=10)
-        top_rated = get_top_rated_games(interacciones_data, datos_juegos_data, limit=10)
+        most_played = models.most_played
+        top_rated = models.top_rated
         
         fallback_recommendations = []
         seen_game_ids = set()
@@ -996,19 +1358,23 @@ def get_user_based_recommendations_endpoint(user_id):
 def get_item_based_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones colaborativas basadas en ítem para un usuario específico.
-    Carga datos y entrena el modelo KNN item-based en cada solicitud.
+    Usa el filtrado colaborativo ítem-ítem (item_cf.py) precalculado por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    surprise_formatted_data, _, _ = prepare_surprise_data_and_models(interacciones_data) # No necesitamos el modelo de ítems aquí
-
-    if not surprise_formatted_data:
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    datos_juegos_data = models.snapshot.juegos
+    trainset_global = models.trainset_global
+
+    if trainset_global is None:
         return jsonify({"error": "Datos no cargados para recomendaciones colaborativas."}), 500
 
     user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
     if not user_exists:
         return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
 
-    recommendations = recommend_item_based(surprise_formatted_data, datos_juegos_data, user_id)
+    recommendations = recommend_item_based(models.item_cf, datos_juegos_data, user_id)
     if not recommendations:
         return jsonify({"user_id": user_id, "recommendations": [], "message": f"No se encontraron recomendaciones colaborativas Item-Based para el usuario ID: {user_id}. Es posible que no haya suficientes juegos similares o interacciones."}), 404
 
@@ -1018,40 +1384,76 @@ def get_item_based_recommendations_endpoint(user_id):
 def get_svd_recommendations_endpoint(user_id):
     """
     Endpoint para obtener recomendaciones colaborativas SVD para un usuario específico.
-    Carga datos y entrena el modelo SVD en cada solicitud.
+    Usa el modelo SVD precalculado por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    surprise_formatted_data, _, _ = prepare_surprise_data_and_models(interacciones_data) # No necesitamos el modelo de ítems aquí
-
-    if not surprise_formatted_data:
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    datos_juegos_data = models.snapshot.juegos
+    trainset_global = models.trainset_global
+
+    if trainset_global is None:
         return jsonify({"error": "Datos no cargados para recomendaciones colaborativas."}), 500
 
     user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
     if not user_exists:
         return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
 
-    recommendations = recommend_svd_ranking(surprise_formatted_data, datos_juegos_data, user_id)
+    recommendations = recommend_svd_ranking(models.svd_scorer, datos_juegos_data, user_id)
     if not recommendations:
         return jsonify({"user_id": user_id, "recommendations": [], "message": f"No se encontraron recomendaciones colaborativas SVD para el usuario ID: {user_id}. Es posible que no haya suficientes interacciones o datos para el modelo."}), 404
 
     return jsonify({"user_id": user_id, "recommendations": recommendations})
 
+@app.route('/recommendations/collaborative/implicit-als/<int:user_id>', methods=['GET'])
+def get_implicit_als_recommendations_endpoint(user_id):
+    """
+    Endpoint para obtener recomendaciones colaborativas con retroalimentación implícita (ALS)
+    para un usuario específico. A diferencia de los modelos de Surprise, también usa likes,
+    dislikes y horas jugadas, así que sirve para usuarios sin calificaciones.
+    """
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    _, _, usuarios_data = _load_base_json_data()
+    datos_juegos_data = models.snapshot.juegos
+
+    if models.implicit_als is None:
+        return jsonify({"error": "Datos no cargados para recomendaciones colaborativas."}), 500
+
+    user_exists = any(u['id'] == user_id for u in usuarios_data.get('usuarios', []))
+    if not user_exists:
+        return jsonify({"error": f"El usuario con ID {user_id} no se encuentra en la base de datos."}), 404
+
+    recommendations = recommend_implicit_als(models.implicit_als, datos_juegos_data, user_id)
+    if not recommendations:
+        return jsonify({"user_id": user_id, "recommendations": [], "message": f"No se encontraron recomendaciones colaborativas ALS para el usuario ID: {user_id}. Es posible que no tenga interacciones."}), 404
+
+    return jsonify({"user_id": user_id, "recommendations": recommendations})
+
 @app.route('/recommendations/collaborative/similar-games/<int:game_id>', methods=['GET'])
 def get_similar_games_endpoint_consolidated(game_id):
     """
     Endpoint para obtener juegos similares (basado en colaborativo de ítems) para un juego específico.
-    Carga datos y entrena el modelo KNN item-based en cada solicitud.
+    Usa la tabla de juegos similares precalculada por el registro de modelos (o,
+    antes del primer entrenamiento, la guardada en disco).
     """
-    interacciones_data, datos_juegos_data, _ = _load_base_json_data()
-    surprise_formatted_data, item_similarity_model, trainset_global = prepare_surprise_data_and_models(interacciones_data)
+    models = model_registry.get()
+    if models is not None:
+        datos_juegos_data, similar_games = models.snapshot.juegos, models.similar_games
+    elif stored_similar_games is not None:
+        datos_juegos_data, similar_games = data_store.get().juegos, stored_similar_games
+    else:
+        return _models_not_ready()
 
-    if not item_similarity_model or not trainset_global:
-        return jsonify({"error": "Modelo de similitud de ítems no entrenado o datos no cargados."}), 500
+    if similar_games is None:
+        return jsonify({"error": "Tabla de juegos similares no calculada o datos no cargados."}), 500
 
     if str(game_id) not in datos_juegos_data:
         return jsonify({"error": f"El juego con ID {game_id} no se encuentra en la base de datos de juegos."}), 404
 
-    similar_games = get_similar_games(game_id, datos_juegos_data, item_similarity_model, trainset_global)
+    similar_games = get_similar_games(game_id, datos_juegos_data, similar_games)
     
     if not similar_games:
         return jsonify({"message": f"No se encontraron juegos similares para el juego ID: {game_id}."}), 404
@@ -1063,10 +1465,12 @@ def get_similar_games_endpoint_consolidated(game_id):
 def recommend_rpg_games():
     """
     Endpoint para recomendar juegos de 'rol' con boosting, sin filtro de fecha.
-    Carga datos y prepara los datos para boosting en cada solicitud.
+    Usa los datos de boosting precalculados por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    juegos_dict, _, _, game_average_rating = prepare_boosting_data(interacciones_data, datos_juegos_data, usuarios_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    juegos_dict, game_average_rating = models.juegos_dict, models.game_average_rating
 
     recommendations = get_general_cold_start_recommendations(
         juegos_dict,
@@ -1084,10 +1488,12 @@ def recommend_rpg_games():
 def recommend_action_2025_games():
     """
     Endpoint para recomendar juegos de 'acción' lanzados entre 2025-01-01 y 2025-05-22.
-    Carga datos y prepara los datos para boosting en cada solicitud.
+    Usa los datos de boosting precalculados por el registro de modelos.
     """
-    interacciones_data, datos_juegos_data, usuarios_data = _load_base_json_data()
-    juegos_dict, _, _, game_average_rating = prepare_boosting_data(interacciones_data, datos_juegos_data, usuarios_data)
+    models = model_registry.get()
+    if models is None:
+        return _models_not_ready()
+    juegos_dict, game_average_rating = models.juegos_dict, models.game_average_rating
 
     recommendations = get_general_cold_start_recommendations(
         juegos_dict,
@@ -1122,28 +1528,11 @@ def crear_usuario():
         if not nombre or not isinstance(edad, int) or not isinstance(generos, list):
             return jsonify({'error': 'Datos inválidos'}), 400
 
-        with open('usuarios.json', 'r', encoding='utf-8') as f:
-            usuarios_data = json.load(f)
-
-        # ✅ Validar si ya existe el nombre (sin distinguir mayúsculas)
-        for u in usuarios_data['usuarios']:
-            if u['nombre'].strip().lower() == nombre.strip().lower():
-                return jsonify({'error': 'El nombre ya está en uso. Elige otro.'}), 409
-
-        nuevos_usuarios = usuarios_data['usuarios']
-        nuevo_id = max(u['id'] for u in nuevos_usuarios) + 1 if nuevos_usuarios else 1
-
-        nuevo_usuario = {
-            'id': nuevo_id,
-            'nombre': nombre,
-            'edad': edad,
-            'generos_favoritos': [g.lower() for g in generos]
-        }
-
-        nuevos_usuarios.append(nuevo_usuario)
-
-        with open('usuarios.json', 'w', encoding='utf-8') as f:
-            json.dump({'usuarios': nuevos_usuarios}, f, indent=2, ensure_ascii=False)
+        # ✅ El almacén valida si ya existe el nombre (sin distinguir mayúsculas)
+        nuevo_usuario = data_store.create_user(nombre, edad, [g.lower() for g in generos])
+        if nuevo_usuario is None:
+            return jsonify({'error': 'El nombre ya está en uso. Elige otro.'}), 409
+        model_registry.request_refresh()
 
         return jsonify({'mensaje': 'Usuario creado', 'usuario': nuevo_usuario}), 201
 
@@ -1159,13 +1548,7 @@ def login_usuario():
         if not nombre:
             return jsonify({'error': 'Falta el nombre'}), 400
 
-        with open('usuarios.json', 'r', encoding='utf-8') as f:
-            usuarios_data = json.load(f)
-
-        usuario = next(
-            (u for u in usuarios_data['usuarios'] if u['nombre'].strip().lower() == nombre.strip().lower()),
-            None
-        )
+        usuario = data_store.find_user_by_name(nombre)
 
         if usuario:
             return jsonify({'mensaje': 'Login exitoso', 'usuario': usuario}), 200
@@ -1181,12 +1564,7 @@ def get_game_by_id(game_id):
     """
     Endpoint para obtener los datos completos de un juego por su ID.
     """
-    datos_juegos_data: Dict = {}
-    juegos = load_json_data('datos_juegos.json')
-    datos_juegos_data = juegos
-
-    #datos_juegos_data: Dict = {}
-    game_info = datos_juegos_data.get(str(game_id))
+    game_info = data_store.get_game(str(game_id))
 
     if not game_info:
         return jsonify({"error": f"Juego con ID {game_id} no encontrado."}), 404
@@ -1197,9 +1575,6 @@ def get_game_by_id(game_id):
 
     return jsonify(game_info_with_id), 200
 
-# Ruta al archivo interacciones.json
-INTERACCIONES_FILE = 'interacciones.json'
-
 @app.route('/responder_juego', methods=['POST'])
 def responder_juego():
     data = request.get_json()
@@ -1208,16 +1583,6 @@ def responder_juego():
     calificacion = data.get('calificacion')
     like        = data.get('like')
 
-    # 1) Cargo localmente el JSON “crudo”
-    try:
-        with open(INTERACCIONES_FILE, 'r', encoding='utf-8') as f:
-            full_data = json.load(f)
-    except (IOError, json.JSONDecodeError):
-        full_data = {'interacciones': []}
-
-    # 2) Extraigo la lista en una variable distinta
-    interactions_list = full_data.get('interacciones', [])
-
     # Validaciones iniciales
     if id_usuario is None or id_juego is None:
         return jsonify({'error': 'Faltan id_usuario o id_juego.'}), 400
@@ -1236,82 +1601,32 @@ def responder_juego():
     if like is not None and not isinstance(like, bool):
         return jsonify({'error': 'El campo "like" debe ser booleano.'}), 400
 
-    # Crear el objeto de interacción base con los datos disponibles
-    nueva_interaccion = {'id_juego': id_juego}
+    # El evento solo lleva los campos enviados: "si le di like, solo va a guardar
+    # el campo like, no me pongas calificacion 0.0 ni horas". Si la interacción ya
+    # existe (búsqueda O(1) en el índice por usuario del almacén), se reemplazan
+    # calificacion/like por los enviados y se eliminan las horas_jugadas.
+    nueva_interaccion = build_interaction_event(id_usuario, id_juego, calificacion, like)
 
-    # Solo añadir campos si tienen un valor válido y no son nulos
-    if calificacion is not None:
-        nueva_interaccion['calificacion'] = calificacion
-    if like is not None:
-        nueva_interaccion['like'] = like
-    
-    # horas_jugadas solo se agrega si no hay calificación ni like. 
-    # Si hay calificación, el modelo de Surprise la usa.
-    # Si hay like, es una interacción binaria.
-    # Si no hay ninguna de las dos, ¿qué tipo de interacción es? 
-    # Asumo que 'horas_jugadas' solo se usaría si no hay otra métrica.
-    # Pero el requisito es "si le di like, solo va a guardar el campo like, no me pongas calificacion 0.0 ni horas"
-    # Y "Calificacion se agrega solo cuando califique, no hay mas igual con el like."
-    # Esto implica que no deberían coexistir si se quieren mutuamente excluyentes para el modelo.
-    # Sin embargo, el front-end puede enviar ambos. La lógica actual del front-end en product-js.js
-    # envía calificacion: 0 cuando se da like/dislike sin calificar, lo cual está causando el problema.
-    # La solución es que el front-end no envíe 0, sino `null` o no enviar el campo `calificacion`.
-    # Y que el backend priorice o maneje esta exclusividad.
-
-    # Lógica para manejar si la interacción ya existe
-    usuario_encontrado = False
-    for usuario in interactions_list:
-        if usuario.get('id') == id_usuario:
-            usuario_encontrado = True
-            juego_encontrado = False
-            for inter in usuario.setdefault('interacciones', []):
-                if inter.get('id_juego') == id_juego:
-                    # Si ya existe, actualiza solo los campos que se enviaron
-                    if 'calificacion' in nueva_interaccion:
-                        inter['calificacion'] = nueva_interaccion['calificacion']
-                    elif 'calificacion' in inter: # Si no se envió calificacion, elimínala si existe
-                        del inter['calificacion']
-
-                    if 'like' in nueva_interaccion:
-                        inter['like'] = nueva_interaccion['like']
-                    elif 'like' in inter: # Si no se envió like, elimínala si existe
-                        del inter['like']
-                    
-                    # Asegúrate de que no haya horas_jugadas si hay calificacion o like.
-                    # El requisito dice "no me pongas horas".
-                    if 'horas_jugadas' in inter:
-                         del inter['horas_jugadas'] # Eliminar horas_jugadas al actualizar.
-                    
-                    juego_encontrado = True
-                    break
-            
-            if not juego_encontrado:
-                # Si no la encontré, la agrego con los campos relevantes
-                usuario['interacciones'].append(nueva_interaccion)
-            break
-
-    if not usuario_encontrado:
-        # Si el usuario no existía, crearlo con la nueva interacción
-        interactions_list.append({
-            'id': id_usuario,
-            'interacciones': [nueva_interaccion]
-        })
-
-    # 4) Guardo de nuevo SOLO esa lista en el archivo
+    # Se anexa una línea a la bitácora (costo constante) en lugar de reescribir
+    # interacciones.json completo; el compactador la pliega en segundo plano.
     try:
-        with open(INTERACCIONES_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'interacciones': interactions_list}, f, ensure_ascii=False, indent=2)
-    except IOError as e:
+        data_store.record_interaction(nueva_interaccion)
+    except (IOError, json.JSONDecodeError, sqlite3.Error) as e:
         return jsonify({'error': f'No se pudo guardar datos: {e}'}), 500
+    model_registry.request_refresh()
+
+    # Las recomendaciones SVD del usuario se actualizan ya (fold-in contra los factores de
+    # juego congelados); el reentrenamiento completo sigue su propio intervalo.
+    models = model_registry.get()
+    if models is not None and models.svd_scorer is not None:
+        fold_in_svd_user(models.svd_scorer, data_store.get().interacciones_por_usuario, id_usuario)
 
     return jsonify({'mensaje': 'Respuesta registrada correctamente'}), 200
 
 @app.route("/juegos", methods=["GET"])
 @cross_origin()
 def obtener_todos_los_juegos():
-    datos_juegos_data: Dict = {}
-    juegos = load_json_data('datos_juegos.json')
-    datos_juegos_data = juegos
+    _, datos_juegos_data, _ = _load_base_json_data()
     search_term = request.args.get('nombre', '').lower()
     if not datos_juegos_data:
         return jsonify({'error': 'Datos de juegos no cargados en el servidor.'}), 500
@@ -1352,13 +1667,8 @@ def check_user_interacciones(user_id):
       "error": "El usuario con ID 74 no se encuentra en interacciones.json."
     }
     """
-    interacciones_data, _, _ = _load_base_json_data()
-
-    # Localiza al usuario en la lista
-    entry = next(
-        (u for u in interacciones_data.get('interacciones', []) if u.get('id') == user_id),
-        None
-    )
+    # Búsqueda directa en el índice por usuario del almacén
+    entry = data_store.get().interacciones_por_usuario.entry(user_id)
 
     if not entry:
         return (
@@ -1376,49 +1686,11 @@ def check_user_interacciones(user_id):
 
 # En tu archivo Flask (app.py o similar)
 
-def _load_interacciones_data():
-    try:
-        with open('interacciones.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"interacciones": []} # Devuelve una estructura vacía si el archivo no existe
-    except json.JSONDecodeError:
-        return {"interacciones": []} # Devuelve vacío si hay error de parseo
-
 @app.route('/games/<string:game_id>/aggregate-interactions', methods=['GET'])
 def get_aggregate_interactions(game_id):
-    interacciones_data_root = _load_interacciones_data()
-    all_user_interactions = interacciones_data_root.get('interacciones', [])
-
-    total_likes = 0
-    total_dislikes = 0
-    ratings_sum = 0
-    rating_count = 0
-
-    for user_entry in all_user_interactions:
-        for interaction in user_entry.get('interacciones', []):
-            if str(interaction.get('id_juego')) == str(game_id):
-                # Contar likes/dislikes
-                if interaction.get('like') is True:
-                    total_likes += 1
-                elif interaction.get('like') is False:
-                    total_dislikes += 1
-                
-                # Sumar calificaciones válidas
-                calificacion = interaction.get('calificacion')
-                if calificacion is not None:
-                    try:
-                        # Asegurarse que la calificación sea un número y esté en un rango esperado (ej. 1-5)
-                        rating_value = float(calificacion)
-                        if 1 <= rating_value <= 5: # Asumiendo un rango de 1 a 5
-                            ratings_sum += rating_value
-                            rating_count += 1
-                    except ValueError:
-                        pass # Ignorar calificaciones no numéricas
-
-    average_rating = None
-    if rating_count > 0:
-        average_rating = ratings_sum / rating_count
+    # Contadores por juego que el almacén mantiene al día en cada /responder_juego:
+    # ya no se recorren las interacciones de todos los usuarios en cada vista.
+    stats = data_store.get().estadisticas_por_juego.get(game_id)
 
     # Si no hay interacciones para este juego, podríamos devolver 404 o simplemente ceros.
     # Devolver ceros es más simple para el frontend en este caso.
@@ -1427,10 +1699,10 @@ def get_aggregate_interactions(game_id):
         
     return jsonify({
         "game_id": game_id,
-        "total_likes": total_likes,
-        "total_dislikes": total_dislikes,
-        "average_rating": average_rating, # Puede ser null si rating_count es 0
-        "rating_count": rating_count
+        "total_likes": stats.total_likes,
+        "total_dislikes": stats.total_dislikes,
+        "average_rating": stats.average_rating, # Puede ser null si rating_count es 0
+        "rating_count": stats.rating_count
     })
 
 def load_json_data(filepath: str) -> dict: # En Python moderno, es 'dict' no 'Dict' para type hints
@@ -1450,22 +1722,12 @@ def load_json_data(filepath: str) -> dict: # En Python moderno, es 'dict' no 'Di
         raise
 
 
-# --- DEFINICIÓN GLOBAL DE LA RUTA AL ARCHIVO JSON ---
-# AJUSTA ESTA RUTA SI 'datos_juegos.json' NO ESTÁ EN LA MISMA CARPETA QUE app.py
-# Si 'datos_juegos.json' está en la misma carpeta que app.py:
-DATOS_JUEGOS_FILEPATH = 'datos_juegos.json'
-# Si 'datos_juegos.json' está en una carpeta 'data' dentro de la misma carpeta que app.py:
-# DATOS_JUEGOS_FILEPATH = 'data/datos_juegos.json'
-# Si 'datos_juegos.json' está un nivel arriba de donde está app.py:
-# DATOS_JUEGOS_FILEPATH = '../datos_juegos.json'
-
 # --- Tus Endpoints ---
 @app.route('/api/juegos', methods=['GET'])
 @cross_origin()
 def get_todos_los_juegos():
     try:
-        # Ahora DATOS_JUEGOS_FILEPATH está definida globalmente
-        juegos_data_dict = load_json_data(DATOS_JUEGOS_FILEPATH)
+        _, juegos_data_dict, _ = _load_base_json_data()
         if not isinstance(juegos_data_dict, dict):
             app.logger.error("El formato de datos_juegos.json no es un objeto/diccionario.")
             return jsonify({"error": "Formato de datos incorrecto en el servidor."}), 500
@@ -1486,12 +1748,7 @@ def get_todos_los_juegos():
 @cross_origin()
 def get_juego_por_id(appid):
     try:
-        juegos_data_dict = load_json_data(DATOS_JUEGOS_FILEPATH)
-        if not isinstance(juegos_data_dict, dict):
-            app.logger.error("El formato de datos_juegos.json no es un objeto/diccionario.")
-            return jsonify({"error": "Formato de datos incorrecto en el servidor."}), 500
-
-        juego = juegos_data_dict.get(appid)
+        juego = data_store.get_game(appid)
         
         if juego:
             return jsonify(juego)
@@ -1507,7 +1764,7 @@ def get_juego_por_id(appid):
 
 # Punto de trada principal para ejecutar la aplicación Flask
 if __name__ == '__main__':
-    # No se llama a initialize_models_and_data() aquí.
-    # Cada endpoint cargará y entrenará lo que necesite.
-    print("La API está activa. Los modelos se entrenarán por solicitud en cada endpoint.")
+    # Los modelos ya se entrenaron al importar el módulo (model_registry.start()).
+    # El registro los reconstruye en segundo plano cuando cambian los datos.
+    print("La API está activa. Los modelos se entrenan una vez y se actualizan en segundo plano.")
     app.run(debug=True, port=5000)
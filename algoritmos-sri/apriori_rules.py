@@ -0,0 +1,587 @@
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from mlxtend.frequent_patterns import apriori, association_rules, fpgrowth
+
+WORD_BITS = 64
+
+MINING_ALGORITHMS = {'apriori': apriori, 'fpgrowth': fpgrowth}
+
+# Segundos entre revisiones de la memoria del proceso de minería.
+RSS_POLL_INTERVAL = 0.05
+
+
+class MiningConfig(NamedTuple):
+    """Parámetros de la minería de reglas; los valores por omisión reproducen el comportamiento original."""
+    algorithm: str = 'apriori'
+    min_support: float = 0.01
+    min_confidence: float = 0.05
+    max_len: Optional[int] = None
+    # Segundos entre minerías completas. Entre una y otra, las reglas de 2 juegos
+    # salen de los conteos incrementales y solo se reutilizan las de 3 o más.
+    remine_interval: float = 600.0
+    # Límites de seguridad: si se superan se aborta y se conservan las reglas anteriores.
+    # Los itemsets se estiman antes de minar (ver `estimate_itemsets`) y se cuentan al
+    # terminar; la memoria es la residente del proceso aparte que mina (ver
+    # `mine_association_rules`), que se detiene en cuanto la supera.
+    max_itemsets: int = 500_000
+    max_rss_mb: Optional[float] = 4096.0
+
+    @classmethod
+    def from_env(cls) -> 'MiningConfig':
+        """
+        Lee la configuración de las variables de entorno (las que falten usan el valor por omisión):
+        SRI_RULES_ALGORITHM (apriori | fpgrowth), SRI_RULES_MIN_SUPPORT, SRI_RULES_MIN_CONFIDENCE,
+        SRI_RULES_MAX_LEN, SRI_RULES_REMINE_INTERVAL, SRI_RULES_MAX_ITEMSETS y SRI_RULES_MAX_RSS_MB.
+        """
+        defaults = cls()
+        max_len = os.environ.get('SRI_RULES_MAX_LEN')
+        max_rss_mb = os.environ.get('SRI_RULES_MAX_RSS_MB')
+        config = cls(
+            algorithm=os.environ.get('SRI_RULES_ALGORITHM', defaults.algorithm).lower(),
+            min_support=float(os.environ.get('SRI_RULES_MIN_SUPPORT', defaults.min_support)),
+            min_confidence=float(os.environ.get('SRI_RULES_MIN_CONFIDENCE', defaults.min_confidence)),
+            max_len=int(max_len) if max_len else defaults.max_len,
+            remine_interval=float(os.environ.get('SRI_RULES_REMINE_INTERVAL', defaults.remine_interval)),
+            max_itemsets=int(os.environ.get('SRI_RULES_MAX_ITEMSETS', defaults.max_itemsets)),
+            max_rss_mb=float(max_rss_mb) if max_rss_mb else defaults.max_rss_mb,
+        )
+        if config.algorithm not in MINING_ALGORITHMS:
+            raise ValueError(f"Algoritmo de reglas desconocido '{config.algorithm}'. Opciones: {', '.join(MINING_ALGORITHMS)}.")
+        return config
+
+
+class MiningLimitExceeded(RuntimeError):
+    """La minería superó el límite de itemsets o de memoria configurado."""
+
+
+def process_rss_mb(pid: int) -> Optional[float]:
+    """Memoria residente actual de un proceso en MB; None si no hay /proc (o el proceso ya terminó)."""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def estimate_itemsets(basket: sp.csr_matrix, min_support: float, max_len: Optional[int] = None) -> int:
+    """
+    Cota de lo que va a manejar la minería, calculada sin minar: los itemsets
+    frecuentes de 1 y 2 juegos (exactos, con un producto disperso de la
+    canasta) más los candidatos de 3 que apriori arma con esos pares (pares
+    frecuentes con el mismo primer juego, combinados de a dos). Un nivel que
+    explota ya se ve en sus candidatos, antes de que la minería los cuente.
+    """
+    n_rows = basket.shape[0]
+    if n_rows == 0:
+        return 0
+    item_support = np.asarray(basket.sum(axis=0)).ravel() / n_rows
+    frequent = np.flatnonzero(item_support >= min_support)
+    if max_len == 1 or frequent.size < 2:
+        return int(frequent.size)
+    frequent_basket = basket[:, frequent].astype(np.int32)
+    pair_counts = sp.triu(frequent_basket.T @ frequent_basket, k=1).tocsr()
+    pair_counts.data = (pair_counts.data / n_rows >= min_support).astype(np.int8)
+    pair_counts.eliminate_zeros()
+    if max_len == 2:
+        return int(frequent.size + pair_counts.nnz)
+    pairs_by_first = np.diff(pair_counts.indptr)
+    return int(frequent.size + pair_counts.nnz + (pairs_by_first * (pairs_by_first - 1) // 2).sum())
+
+
+def _mine(basket: sp.csr_matrix, columns: List[str], config: MiningConfig) -> Tuple[Optional[pd.DataFrame], int, float]:
+    """
+    La minería completa (una sola pasada de `config.algorithm` con
+    max_len=`config.max_len` y las reglas), en el proceso que la ejecuta.
+    Devuelve (reglas, itemsets frecuentes, pico de memoria residente en MB);
+    sin reglas si los itemsets superan `config.max_itemsets`.
+    """
+    df_games = pd.DataFrame.sparse.from_spmatrix(basket.astype(bool), columns=columns)
+    frequent_itemsets = MINING_ALGORITHMS[config.algorithm](
+        df_games, min_support=config.min_support, use_colnames=True, max_len=config.max_len
+    )
+    rules = None
+    if len(frequent_itemsets) <= config.max_itemsets:
+        # Solo se calculan las métricas que usa el recomendador.
+        rules = association_rules(
+            frequent_itemsets,
+            metric='confidence',
+            min_threshold=config.min_confidence,
+            return_metrics=['antecedent support', 'consequent support', 'support', 'confidence'],
+        )
+    # ru_maxrss está en KB en Linux.
+    return rules, len(frequent_itemsets), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def mine_association_rules(basket: sp.csr_matrix, columns: List[str], config: MiningConfig = MiningConfig()) -> Tuple[pd.DataFrame, int]:
+    """
+    Mina reglas de asociación sobre una matriz dispersa booleana usuarios × juegos
+    sin densificarla. Devuelve (reglas, cantidad de itemsets frecuentes).
+
+    Antes de minar se compara `estimate_itemsets` con `config.max_itemsets`. La
+    minería (una sola pasada hasta `config.max_len`) corre en un proceso aparte
+    cuya memoria residente se revisa cada `RSS_POLL_INTERVAL` segundos: si
+    supera `config.max_rss_mb` el proceso se termina ahí mismo, sin esperar a
+    que acabe un nivel. Al terminar se revisa además su pico de memoria (por
+    si creció entre dos revisiones) y la cantidad de itemsets frecuentes.
+
+    Lanza MiningLimitExceeded si se supera algún límite de `config`, para que
+    quien llama conserve las reglas anteriores.
+    """
+    estimate = estimate_itemsets(basket, config.min_support, config.max_len)
+    if estimate > config.max_itemsets:
+        raise MiningLimitExceeded(
+            f"Los itemsets frecuentes de hasta 2 juegos y los candidatos de 3 ({estimate}) superan el límite de "
+            f"{config.max_itemsets}; sube min_support o define max_len."
+        )
+
+    with tempfile.TemporaryDirectory(prefix='sri-reglas-') as directory:
+        input_path, output_path = os.path.join(directory, 'entrada.pkl'), os.path.join(directory, 'salida.pkl')
+        with open(input_path, 'wb') as f:
+            pickle.dump((basket, columns, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), input_path, output_path])
+        while True:
+            try:
+                process.wait(timeout=RSS_POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                rss_mb = process_rss_mb(process.pid)
+                if config.max_rss_mb is not None and rss_mb is not None and rss_mb > config.max_rss_mb:
+                    process.kill()
+                    process.wait()
+                    raise MiningLimitExceeded(
+                        f"La memoria residente de la minería llegó a {rss_mb:.0f} MB, más que el límite de "
+                        f"{config.max_rss_mb:.0f} MB."
+                    )
+        if process.returncode != 0:
+            raise RuntimeError(f"El proceso de minería terminó con código {process.returncode}.")
+        with open(output_path, 'rb') as f:
+            rules, n_itemsets, peak_rss_mb = pickle.load(f)
+
+    if rules is None:
+        raise MiningLimitExceeded(
+            f"{n_itemsets} itemsets frecuentes superan el límite de {config.max_itemsets}; "
+            f"sube min_support o define max_len."
+        )
+    if config.max_rss_mb is not None and peak_rss_mb > config.max_rss_mb:
+        raise MiningLimitExceeded(
+            f"La memoria residente de la minería llegó a {peak_rss_mb:.0f} MB, más que el límite de "
+            f"{config.max_rss_mb:.0f} MB."
+        )
+    return rules, n_itemsets
+
+
+def _bit_words(n_items: int) -> int:
+    return max(1, (n_items + WORD_BITS - 1) // WORD_BITS)
+
+
+# Regla de asociación: (antecedente, consecuente, confianza).
+Rule = Tuple[frozenset, frozenset, float]
+# Recomendación: (juego consecuente, confianza, antecedente de la regla que la generó).
+Recommendation = Tuple[str, float, frozenset]
+
+
+def rules_from_dataframe(rules: pd.DataFrame) -> List[Rule]:
+    """Convierte la tabla de `association_rules` en una lista de reglas, en el mismo orden."""
+    if rules.empty:
+        return []
+    return [
+        (frozenset(antecedent), frozenset(consequent), float(rule_confidence))
+        for antecedent, consequent, rule_confidence in zip(rules['antecedents'], rules['consequents'], rules['confidence'])
+    ]
+
+
+def long_rules(rules: List[Rule]) -> List[Rule]:
+    """Reglas que involucran 3 o más juegos (las de 2 se derivan de los conteos incrementales)."""
+    return [rule for rule in rules if len(rule[0]) + len(rule[1]) >= 3]
+
+
+def pair_rules(n_users: int, item_counts: Dict[str, int], pairs: Dict[str, Dict[str, int]],
+               column_of_name: Dict[str, int], game_id_to_name: Dict[str, str], config: MiningConfig) -> List[Rule]:
+    """
+    Reglas de un antecedente y un consecuente derivadas de los conteos de 1 y 2
+    itemsets (ver `interaction_index.LikedPairCounts`), con los mismos umbrales y
+    cálculos que `apriori` + `association_rules`: soporte = conteo / usuarios y
+    confianza = soporte(A ∪ C) / soporte(A).
+
+    Los pares siguen la columna de sus juegos en la canasta (`column_of_name`;
+    los juegos nuevos van al final) y, dentro de cada par, las dos direcciones
+    van en ese mismo orden de columna del antecedente.
+    `pairs` puede ser solo una parte de los conteos (los vecinos de los juegos
+    de un usuario); solo se generan reglas cuyo antecedente es una de sus llaves.
+    """
+    if n_users == 0 or (config.max_len is not None and config.max_len < 2):
+        return []
+
+    def name_of(game_id: str) -> str:
+        return game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})")
+
+    def position(game_id: str) -> Tuple[int, Any]:
+        name = name_of(game_id)
+        return (0, column_of_name[name]) if name in column_of_name else (1, name)
+
+    itemsets: Dict[Tuple[str, str], int] = {}
+    for game_id, row in pairs.items():
+        for other, count in row.items():
+            if count / n_users >= config.min_support:
+                itemsets[tuple(sorted((game_id, other), key=position))] = count
+
+    rules: List[Rule] = []
+    for itemset in sorted(itemsets, key=lambda pair: (position(pair[0]), position(pair[1]))):
+        id_of_name = {name_of(game_id): game_id for game_id in itemset}
+        if len(id_of_name) < 2:
+            continue  # dos IDs con el mismo nombre son una sola columna de la canasta
+        support_ac = itemsets[itemset] / n_users
+        names = frozenset(id_of_name)
+        # `itemset` ya está ordenado por columna: primero la regla cuyo antecedente es el de menor columna.
+        for antecedent_id in itemset:
+            if antecedent_id not in pairs:
+                continue
+            antecedent = frozenset([name_of(antecedent_id)])
+            confidence = support_ac / (item_counts[antecedent_id] / n_users)
+            if confidence >= config.min_confidence:
+                rules.append((antecedent, names - antecedent, confidence))
+    return rules
+
+
+def rank_candidates(candidates: Iterable[Recommendation], top_n: int = 10) -> List[Recommendation]:
+    """
+    Agrega tuplas (consecuente, confianza, antecedente) dadas en orden de la
+    tabla: para cada consecuente queda la de mayor confianza (la primera en
+    caso de empate) y se ordena por confianza descendente, respetando el orden
+    en que apareció cada consecuente. Es el recorrido original de
+    recomendar_juegos_apriori; `CompiledRules.rank` hace lo mismo vectorizado.
+    """
+    best: Dict[str, Tuple[float, frozenset]] = {}
+    for name, confidence, antecedent in candidates:
+        if name not in best or confidence > best[name][0]:
+            best[name] = (confidence, antecedent)
+    ranked = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top_n]
+    return [(name, confidence, antecedent) for name, (confidence, antecedent) in ranked]
+
+
+class CompiledRules:
+    """
+    Reglas de asociación compiladas una vez por entrenamiento para evaluarlas
+    con operaciones vectorizadas en lugar de `reglas.iterrows()`.
+
+    Cada nombre de juego que aparece en alguna regla recibe un código entero;
+    los antecedentes se guardan como máscaras de bits (uint64, una fila por
+    regla) y los consecuentes como pares aplanados (regla, item) en el orden de
+    la tabla original. Una regla aplica a un usuario si
+    `antecedentes & ~gustados == 0`.
+
+    Además, un índice invertido por item de antecedente (formato CSR:
+    `rules_by_item_ids[rules_by_item_indptr[c]:rules_by_item_indptr[c + 1]]`)
+    permite revisar solo las reglas que mencionan algún juego gustado por el
+    usuario. Cada regla se indexa bajo el item menos frecuente de su
+    antecedente: para que aplique ese item tiene que estar gustado, así que
+    basta con revisar las listas de los juegos gustados, y las listas de los
+    juegos populares no crecen con cada regla que los menciona.
+    """
+
+    def __init__(self, items: List[str], antecedents: List[frozenset], antecedent_rule: np.ndarray,
+                 antecedent_item: np.ndarray, consequent_rule: np.ndarray, consequent_item: np.ndarray,
+                 confidence: np.ndarray):
+        self.items = items
+        self.item_code_of: Dict[str, int] = {name: code for code, name in enumerate(items)}
+        self.antecedents = antecedents
+        self.antecedent_rule = antecedent_rule
+        self.antecedent_item = antecedent_item
+        self.antecedent_bits = np.zeros((len(antecedents), _bit_words(len(items))), dtype=np.uint64)
+        np.bitwise_or.at(
+            self.antecedent_bits,
+            (antecedent_rule, antecedent_item // WORD_BITS),
+            np.left_shift(np.uint64(1), (antecedent_item % WORD_BITS).astype(np.uint64)),
+        )
+        self.consequent_rule = consequent_rule
+        self.consequent_item = consequent_item
+        self.confidence = confidence
+
+        # Pares de consecuentes agrupados por regla (vienen en orden de regla).
+        self.consequent_indptr = np.concatenate((
+            [0], np.cumsum(np.bincount(consequent_rule, minlength=self.n_rules))
+        )).astype(np.int64)
+
+        # Índice invertido item -> reglas (ordenadas por posición en la tabla), con cada
+        # regla bajo el item de su antecedente que aparece en menos antecedentes.
+        item_frequency = np.bincount(antecedent_item, minlength=len(items))
+        by_rule = np.lexsort((antecedent_item, item_frequency[antecedent_item], antecedent_rule))
+        is_key = np.ones(by_rule.size, dtype=bool)
+        is_key[1:] = antecedent_rule[by_rule[1:]] != antecedent_rule[by_rule[:-1]]
+        key_rule = antecedent_rule[by_rule[is_key]]
+        key_item = antecedent_item[by_rule[is_key]]
+        order = np.lexsort((key_rule, key_item))
+        self.rules_by_item_ids = key_rule[order].astype(np.int32)
+        self.rules_by_item_indptr = np.concatenate((
+            [0], np.cumsum(np.bincount(key_item, minlength=len(items)))
+        )).astype(np.int64)
+        # Reglas sin antecedente (aplican a cualquier usuario); mlxtend no las genera, pero se respetan.
+        self.unconditional_rules = np.flatnonzero(~np.any(self.antecedent_bits, axis=1)).astype(np.int32)
+
+    @classmethod
+    def from_dataframe(cls, rules: pd.DataFrame) -> 'CompiledRules':
+        """Compila la tabla de `association_rules` (columnas antecedents, consequents y confidence)."""
+        return cls.from_rules(rules_from_dataframe(rules))
+
+    @classmethod
+    def from_rules(cls, rules: List[Rule]) -> 'CompiledRules':
+        """Compila una lista de reglas (antecedente, consecuente, confianza) en el orden dado."""
+        items: List[str] = []
+        item_code_of: Dict[str, int] = {}
+
+        def code_of(name: str) -> int:
+            code = item_code_of.get(name)
+            if code is None:
+                code = item_code_of[name] = len(items)
+                items.append(name)
+            return code
+
+        antecedents: List[frozenset] = []
+        antecedent_rule: List[int] = []
+        antecedent_item: List[int] = []
+        consequent_rule: List[int] = []
+        consequent_item: List[int] = []
+
+        confidence = np.asarray([rule_confidence for _, _, rule_confidence in rules], dtype=np.float64)
+        for rule_idx, (antecedent, consequent, _) in enumerate(rules):
+            antecedents.append(antecedent)
+            for name in antecedent:
+                antecedent_rule.append(rule_idx)
+                antecedent_item.append(code_of(name))
+            for name in consequent:
+                consequent_rule.append(rule_idx)
+                consequent_item.append(code_of(name))
+
+        return cls(
+            items,
+            antecedents,
+            np.asarray(antecedent_rule, dtype=np.int64),
+            np.asarray(antecedent_item, dtype=np.int64),
+            np.asarray(consequent_rule, dtype=np.int32),
+            np.asarray(consequent_item, dtype=np.int32),
+            confidence,
+        )
+
+    @property
+    def n_rules(self) -> int:
+        return len(self.antecedents)
+
+    def candidate_rules(self, liked_codes: List[int]) -> np.ndarray:
+        """Reglas (en orden de la tabla) que podrían aplicar a un usuario que gusta de los items dados."""
+        slices = [self.rules_by_item_ids[self.rules_by_item_indptr[c]:self.rules_by_item_indptr[c + 1]] for c in liked_codes]
+        if self.unconditional_rules.size:
+            slices.append(self.unconditional_rules)
+        if not slices:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(slices))
+
+    def encode(self, names: Iterable[str]) -> np.ndarray:
+        """Máscara de bits de un conjunto de nombres (los que no aparecen en ninguna regla se ignoran)."""
+        bits = np.zeros(self.antecedent_bits.shape[1], dtype=np.uint64)
+        for name in names:
+            code = self.item_code_of.get(name)
+            if code is not None:
+                bits[code // WORD_BITS] |= np.uint64(1) << np.uint64(code % WORD_BITS)
+        return bits
+
+    def match(self, liked_names: Iterable[str], top_n: int = 10) -> List[Recommendation]:
+        """
+        Aplica todas las reglas a un conjunto de juegos gustados y devuelve hasta
+        `top_n` tuplas (consecuente, confianza, antecedente de la regla que lo generó).
+
+        Equivale a recorrer la tabla en orden quedándose, para cada consecuente
+        no gustado, con la regla de mayor confianza (la primera en caso de
+        empate), y ordenar por confianza descendente respetando el orden en que
+        apareció cada consecuente.
+        """
+        if self.n_rules == 0:
+            return []
+        liked_names = set(liked_names)
+        liked_codes = [self.item_code_of[name] for name in liked_names if name in self.item_code_of]
+        return self.rank(self._matched_rules(liked_names, liked_codes), liked_codes, top_n)
+
+    def candidates(self, liked_names: Iterable[str]) -> List[Recommendation]:
+        """
+        Todas las tuplas (consecuente no gustado, confianza, antecedente) de las
+        reglas que aplican, en el orden de la tabla y sin agregar por consecuente.
+        """
+        if self.n_rules == 0:
+            return []
+        liked_names = set(liked_names)
+        liked_codes = [self.item_code_of[name] for name in liked_names if name in self.item_code_of]
+        pairs = self._consequent_pairs(self._matched_rules(liked_names, liked_codes), liked_codes)
+        return [
+            (self.items[self.consequent_item[pair]], float(self.confidence[self.consequent_rule[pair]]), self.antecedents[self.consequent_rule[pair]])
+            for pair in pairs
+        ]
+
+    def _matched_rules(self, liked_names: Set[str], liked_codes: List[int]) -> np.ndarray:
+        # Solo se revisan las reglas que mencionan algún juego gustado; de esas,
+        # aplican las que no tienen items fuera del conjunto gustado.
+        candidates = self.candidate_rules(liked_codes)
+        user_bits = self.encode(liked_names)
+        return candidates[~np.any(self.antecedent_bits[candidates] & ~user_bits, axis=1)]
+
+    def _consequent_pairs(self, matched_rules: np.ndarray, liked_codes) -> np.ndarray:
+        """Pares (regla, consecuente) de las reglas que aplican, en orden de la tabla, sin consecuentes gustados."""
+        starts = self.consequent_indptr[matched_rules]
+        lengths = self.consequent_indptr[matched_rules + 1] - starts
+        pairs = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+        liked_items = np.zeros(len(self.items), dtype=bool)
+        liked_items[liked_codes] = True
+        return pairs[~liked_items[self.consequent_item[pairs]]]
+
+    def match_batch(self, liked: sp.csr_matrix, top_n: int = 10) -> List[List[Recommendation]]:
+        """
+        Igual que `match`, pero para muchos usuarios a la vez. `liked` es una
+        matriz dispersa usuarios × items (columnas = `self.items`) con los
+        juegos gustados de cada usuario. Las reglas que aplican a todos los
+        usuarios salen de un único producto disperso contra la matriz
+        items × reglas de antecedentes: una regla aplica si el usuario gusta
+        de tantos items de su antecedente como tamaño tiene el antecedente.
+        """
+        n_users = liked.shape[0]
+        if self.n_rules == 0:
+            return [[] for _ in range(n_users)]
+
+        liked = (liked.tocsr() > 0).astype(np.int32)
+        antecedent_matrix = sp.csr_matrix(
+            (np.ones(len(self.antecedent_rule), dtype=np.int32), (self.antecedent_item, self.antecedent_rule)),
+            shape=(len(self.items), self.n_rules)
+        )
+        antecedent_size = np.bincount(self.antecedent_rule, minlength=self.n_rules)
+
+        hits = (liked @ antecedent_matrix).tocsr()
+        hits.data = (hits.data == antecedent_size[hits.indices]).astype(np.int8)
+        hits.eliminate_zeros()
+        hits.sort_indices()
+
+        results = []
+        for user in range(n_users):
+            matched_rules = hits.indices[hits.indptr[user]:hits.indptr[user + 1]]
+            if self.unconditional_rules.size:
+                matched_rules = np.union1d(matched_rules, self.unconditional_rules)
+            liked_codes = liked.indices[liked.indptr[user]:liked.indptr[user + 1]]
+            results.append(self.rank(matched_rules, liked_codes, top_n))
+        return results
+
+    def rank(self, matched_rules: np.ndarray, liked_codes, top_n: int) -> List[Recommendation]:
+        """Ordena los consecuentes no gustados de las reglas que aplican (índices en orden de la tabla)."""
+        if matched_rules.size == 0:
+            return []
+
+        pairs = self._consequent_pairs(matched_rules, liked_codes)
+        if pairs.size == 0:
+            return []
+
+        pair_items = self.consequent_item[pairs]
+        pair_confidence = self.confidence[self.consequent_rule[pairs]]
+
+        # Mejor par por consecuente: mayor confianza y, a igualdad, el primero en la tabla.
+        order = np.lexsort((pairs, -pair_confidence, pair_items))
+        is_first = np.ones(order.size, dtype=bool)
+        is_first[1:] = pair_items[order[1:]] != pair_items[order[:-1]]
+        best = order[is_first]
+
+        # Orden de primera aparición de cada consecuente (ambos arreglos quedan ordenados por código de item).
+        _, first_seen = np.unique(pair_items, return_index=True)
+        ranking = np.lexsort((first_seen, -pair_confidence[best]))[:top_n]
+
+        return [
+            (self.items[pair_items[best[i]]], float(pair_confidence[best[i]]), self.antecedents[self.consequent_rule[pairs[best[i]]]])
+            for i in ranking
+        ]
+
+
+class LiveRuleSource(NamedTuple):
+    """
+    Lo necesario para recalcular las reglas de un usuario al momento: las de
+    2 juegos desde los conteos vivos (`interaction_index.LikedPairCounts`) y las
+    de 3 o más desde la última minería completa, ya compiladas.
+    """
+    counts: Any
+    long_rules: CompiledRules
+    column_of_name: Dict[str, int]
+    game_id_to_name: Dict[str, str]
+    config: MiningConfig
+
+    def candidates(self, user_id, liked_names: Iterable[str]) -> List[Recommendation]:
+        """Candidatos (sin agregar) del usuario, en el mismo orden que la tabla de reglas combinada."""
+        liked_ids = self.counts.liked(user_id)
+        n_users, item_counts, pairs = self.counts.neighbourhood(liked_ids)
+        candidates = [
+            (next(iter(consequent)), confidence, antecedent)
+            for antecedent, consequent, confidence in pair_rules(
+                n_users, item_counts, pairs, self.column_of_name, self.game_id_to_name, self.config
+            )
+        ]
+        liked_names = set(liked_names)
+        candidates = [candidate for candidate in candidates if candidate[0] not in liked_names]
+        return candidates + self.long_rules.candidates(liked_names)
+
+
+class AssociationRecommendationTable:
+    """
+    Recomendaciones por asociación materializadas por usuario.
+
+    Se llena en lote (`build`, un único producto disperso para todos los
+    usuarios) justo después de compilar las reglas. Cada entrada guarda el
+    `write_seq` del índice de interacciones con el que se calculó; si el
+    usuario registró eventos después, la entrada se recalcula al pedirla y
+    se reemplaza, sin tocar las de los demás usuarios. Con `live`, ese
+    recálculo usa los conteos de pares al momento, así que un like nuevo se
+    refleja sin esperar al siguiente entrenamiento.
+    """
+
+    def __init__(self, rules: CompiledRules, top_n: int = 10, live: Optional[LiveRuleSource] = None):
+        self.rules = rules
+        self.top_n = top_n
+        self.live = live
+        self._entries: Dict[Any, Tuple[int, List[Recommendation]]] = {}
+
+    @classmethod
+    def build(cls, rules: CompiledRules, user_ids: List[Any], liked: sp.csr_matrix, computed_at: int,
+              top_n: int = 10, live: Optional[LiveRuleSource] = None) -> 'AssociationRecommendationTable':
+        """`liked`: usuarios (en el orden de `user_ids`) × items de las reglas; `computed_at`: write_seq de los datos."""
+        table = cls(rules, top_n, live)
+        for user_id, recommendations in zip(user_ids, rules.match_batch(liked, top_n)):
+            table._entries[user_id] = (computed_at, recommendations)
+        return table
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def recommendations(self, user_id, liked_names: Iterable[str], read_seq: int, last_write: int) -> List[Recommendation]:
+        """
+        Devuelve las recomendaciones del usuario desde la tabla si siguen
+        vigentes (`last_write` no es posterior al cálculo); si no, las
+        recalcula con `liked_names`, leídos después de tomar `read_seq`.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and last_write <= entry[0]:
+            return entry[1]
+        if self.live is not None:
+            recommendations = rank_candidates(self.live.candidates(user_id, liked_names), self.top_n)
+        else:
+            recommendations = self.rules.match(liked_names, self.top_n)
+        self._entries[user_id] = (read_seq, recommendations)
+        return recommendations
+
+
+if __name__ == '__main__':
+    # Proceso de minería de `mine_association_rules`: lee (canasta, columnas, config)
+    # del archivo de entrada y escribe el resultado de `_mine` en el de salida.
+    with open(sys.argv[1], 'rb') as f:
+        mining_args = pickle.load(f)
+    with open(sys.argv[2], 'wb') as f:
+        pickle.dump(_mine(*mining_args), f, protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,128 @@
+"""
+Benchmark del emparejamiento de reglas de asociación para un usuario.
+
+Compara, sobre tablas sintéticas de reglas con el formato de mlxtend
+(antecedents/consequents como frozenset y confidence):
+
+  - iterrows: el recorrido original fila por fila con `issubset`.
+  - bitmask:  AND de bits contra todas las reglas compiladas.
+  - indexado: `CompiledRules.match`, que solo revisa las reglas indexadas
+              bajo algún juego gustado.
+
+Uso:
+    python benchmark_apriori_rules.py
+    python benchmark_apriori_rules.py --sizes 10000 100000 --queries 50
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from apriori_rules import CompiledRules
+
+
+def synthetic_rules(n_rules: int, n_games: int, seed: int) -> Tuple[pd.DataFrame, List[str], List[float]]:
+    """
+    Reglas con antecedentes de 1 a 3 juegos y consecuentes de 1 a 3, con
+    popularidad tipo Zipf. Devuelve también los pesos acumulados de los juegos
+    para muestrear usuarios con la misma distribución.
+    """
+    rng = random.Random(seed)
+    games = [f"Juego {i}" for i in range(n_games)]
+    weights = list(np.cumsum([1.0 / (rank + 1) for rank in range(n_games)]))
+
+    rows = []
+    for _ in range(n_rules):
+        items = set()
+        size = rng.randint(2, 4)
+        while len(items) < size:
+            items.add(rng.choices(games, cum_weights=weights)[0])
+        items = list(items)
+        split = rng.randint(1, min(3, size - 1))
+        rows.append({
+            'antecedents': frozenset(items[:split]),
+            'consequents': frozenset(items[split:]),
+            'confidence': round(rng.random(), 2),
+        })
+    return pd.DataFrame(rows), games, weights
+
+
+def liked_sets(games: List[str], weights: List[float], n_queries: int, n_liked: int, seed: int) -> List[Set[str]]:
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n_queries):
+        liked = set()
+        while len(liked) < n_liked:
+            liked.add(rng.choices(games, cum_weights=weights)[0])
+        queries.append(liked)
+    return queries
+
+
+def match_iterrows(reglas: pd.DataFrame, liked: Set[str], top_n: int) -> List[Tuple[str, float]]:
+    """Recorrido original de recomendar_juegos_apriori (sin la parte de formato)."""
+    recomendaciones: Dict[str, float] = {}
+    for _, row in reglas.iterrows():
+        antecedents_as_set = frozenset(row['antecedents'])
+        if antecedents_as_set.issubset(liked):
+            for consequent in row['consequents'] - liked:
+                if consequent not in recomendaciones or row['confidence'] > recomendaciones[consequent]:
+                    recomendaciones[consequent] = row['confidence']
+    return sorted(recomendaciones.items(), key=lambda item: item[1], reverse=True)[:top_n]
+
+
+def match_bitmask_scan(compiled: CompiledRules, liked: Set[str]) -> np.ndarray:
+    """Reglas que aplican evaluando el AND de bits sobre toda la tabla (sin el índice)."""
+    user_bits = compiled.encode(liked)
+    return np.flatnonzero(~np.any(compiled.antecedent_bits & ~user_bits, axis=1))
+
+
+def time_per_query(fn, queries) -> float:
+    started = time.perf_counter()
+    for liked in queries:
+        fn(liked)
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del emparejamiento de reglas Apriori.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--games', type=int, default=5_000, help="Cantidad de juegos distintos en las reglas.")
+    parser.add_argument('--liked', type=int, default=5, help="Juegos gustados por usuario de prueba.")
+    parser.add_argument('--queries', type=int, default=200, help="Consultas para bitmask e indexado.")
+    parser.add_argument('--iterrows-queries', type=int, default=3, help="Consultas para iterrows (es muy lento).")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'reglas':>10} {'compilar':>10} {'iterrows':>12} {'bitmask':>12} {'indexado':>12} {'reglas revisadas':>17}")
+    for n_rules in args.sizes:
+        reglas, games, weights = synthetic_rules(n_rules, args.games, args.seed)
+        queries = liked_sets(games, weights, args.queries, args.liked, args.seed + 1)
+
+        started = time.perf_counter()
+        compiled = CompiledRules.from_dataframe(reglas)
+        compile_time = time.perf_counter() - started
+
+        # Las tres variantes deben coincidir en los consecuentes y sus confianzas.
+        for liked in queries[:args.iterrows_queries]:
+            expected = match_iterrows(reglas, liked, args.top_n)
+            got = [(name, confidence) for name, confidence, _ in compiled.match(liked, args.top_n)]
+            assert [c for _, c in expected] == [c for _, c in got], "Los resultados no coinciden con iterrows."
+
+        iterrows_time = time_per_query(lambda liked: match_iterrows(reglas, liked, args.top_n), queries[:args.iterrows_queries])
+        scan_time = time_per_query(lambda liked: match_bitmask_scan(compiled, liked), queries)
+        indexed_time = time_per_query(lambda liked: compiled.match(liked, args.top_n), queries)
+
+        examined = np.mean([
+            compiled.candidate_rules([compiled.item_code_of[n] for n in liked if n in compiled.item_code_of]).size
+            for liked in queries
+        ])
+        print(f"{n_rules:>10,} {compile_time:>9.2f}s {iterrows_time * 1e3:>10.1f}ms {scan_time * 1e3:>10.3f}ms "
+              f"{indexed_time * 1e3:>10.3f}ms {examined:>17,.0f}")
+
+
+if __name__ == '__main__':
+    main()
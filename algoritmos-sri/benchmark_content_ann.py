@@ -0,0 +1,154 @@
+"""
+Benchmark del índice aproximado de vecinos por contenido (content_ann.IVFIndex).
+
+Sobre catálogos sintéticos con texto vectorizados con HashingTfidfVectorizer,
+mide para cada `n_probe`:
+
+  - recall@10: fracción de los 10 vecinos exactos (coseno sobre todo el
+               catálogo) que devuelve el índice.
+  - latencia:  tiempo medio por consulta.
+
+Cada juego sintético pertenece a un "género" con su propio vocabulario y
+etiquetas, y mezcla palabras comunes a todo el catálogo; así tiene vecinos de
+verdad, como el catálogo real (con texto sin estructura todos los juegos son
+casi igual de parecidos y el recall no dice nada).
+
+Hay dos tipos de consulta: "juego" (juegos similares a X) y "perfil" (suma
+ponderada de los vectores de los juegos que le gustan a un usuario, sin esos
+juegos en el resultado; los gustos se concentran en unas pocas zonas del
+catálogo, como los de un usuario real). La búsqueda exacta se mide igual, como referencia.
+
+Al final de cada tamaño se mide también la construcción de la tabla de
+vecinos de todo el catálogo con el índice (`ContentNeighbors.from_index`,
+la que usa app.py con SRI_CONTENT_ANN_MIN_GAMES) y su recall@10.
+
+Uso:
+    python benchmark_content_ann.py
+    python benchmark_content_ann.py --sizes 10000 50000 --n-probe 1 4 8 16 --centroid-terms 1000
+"""
+import argparse
+import random
+import time
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from content_ann import DEFAULT_CENTROID_TERMS, DEFAULT_N_PROBE, IVFIndex
+from content_neighbors import ContentNeighbors
+from content_text import HashingTfidfVectorizer, text_document
+
+
+def genre_games(n_games: int, n_genres: int, words_per_genre: int, seed: int) -> Iterator[Tuple[str, Dict]]:
+    """Juegos sintéticos con el formato de datos_juegos.json, agrupados por género."""
+    rng = random.Random(seed)
+    common_words = [f"comun{i}" for i in range(2_000)]
+    for i in range(n_games):
+        genre = rng.randrange(n_genres)
+        # Algunos juegos mezclan dos géneros.
+        genres = [genre, rng.randrange(n_genres)] if rng.random() < 0.3 else [genre]
+        vocabulary = [f"g{g}palabra{w}" for g in genres for w in range(words_per_genre)]
+        text = rng.choices(vocabulary, k=rng.randint(20, 80)) + rng.choices(common_words, k=rng.randint(10, 40))
+        tags = {f"Etiqueta {g}-{rng.randrange(8)}" for g in genres for _ in range(rng.randint(2, 5))}
+        yield str(100000 + i), {
+            'categorias': ['Un jugador'],
+            'tags': [{'description': tag} for tag in tags],
+            'descripcion_corta': " ".join(text[:15]),
+            'descripcion_larga': "<p>" + " ".join(text[15:]) + "</p>",
+        }
+
+
+def exact_search(vectors: sp.csr_matrix, query: sp.csr_matrix, k: int, exclude: np.ndarray) -> np.ndarray:
+    query_dense = np.zeros(vectors.shape[1])
+    query_dense[query.indices] = query.data
+    scores = vectors @ query_dense
+    scores[exclude] = -np.inf
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind='stable')]
+
+
+def user_profiles(vectors: sp.csr_matrix, n_users: int, n_liked: int, rng: np.random.Generator):
+    """
+    (perfil normalizado, juegos gustados) con calificaciones aleatorias como
+    pesos. Los gustos de cada usuario salen de 1 a 3 "zonas" del catálogo (los
+    30 juegos más parecidos a un juego al azar), no del catálogo entero.
+    """
+    profiles = []
+    for _ in range(n_users):
+        seeds = rng.choice(vectors.shape[0], rng.integers(1, 4), replace=False)
+        pool = np.unique(np.concatenate([exact_search(vectors, vectors[seed], 30, np.empty(0, dtype=int)) for seed in seeds]))
+        liked = rng.choice(pool, min(n_liked, len(pool)), replace=False)
+        weights = rng.choice([3, 4, 4.5, 5], len(liked))
+        profile = normalize(sp.csr_matrix(weights.reshape(1, -1)) @ vectors[liked])
+        profiles.append((profile, liked))
+    return profiles
+
+
+def measure(search, queries):
+    """(resultados, segundos por consulta)."""
+    started = time.perf_counter()
+    results = [search(query, exclude) for query, exclude in queries]
+    return results, (time.perf_counter() - started) / len(queries)
+
+
+def recall(results, expected) -> float:
+    hits = sum(len(np.intersect1d(got, want)) for got, want in zip(results, expected))
+    return hits / sum(len(want) for want in expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice aproximado de vecinos por contenido.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000])
+    parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--centroid-terms', type=int, default=DEFAULT_CENTROID_TERMS, help="Términos por centroide.")
+    parser.add_argument('--queries', type=int, default=300, help="Consultas de cada tipo.")
+    parser.add_argument('--liked', type=int, default=10, help="Juegos gustados por perfil de usuario.")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--table-k', type=int, default=100, help="Vecinos por juego de la tabla completa (0 = no medirla).")
+    parser.add_argument('--genres', type=int, default=None, help="Géneros del catálogo (por omisión, juegos / 50).")
+    parser.add_argument('--words-per-genre', type=int, default=150)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'juegos':>8} {'listas':>7} {'construir':>10} {'consulta':>8} {'n_probe':>8} {'recall@10':>10} {'latencia':>10}")
+    for n_games in args.sizes:
+        documents = (text_document(details) for _, details in genre_games(n_games, args.genres or max(1, n_games // 50), args.words_per_genre, args.seed))
+        vectors = HashingTfidfVectorizer().fit_transform_stream(documents).astype(np.float32)
+
+        started = time.perf_counter()
+        index = IVFIndex.build(vectors, centroid_terms=args.centroid_terms, seed=args.seed)
+        build_time = time.perf_counter() - started
+
+        rng = np.random.default_rng(args.seed)
+        game_codes = rng.choice(n_games, args.queries, replace=False)
+        query_sets = {
+            'juego': [(vectors[code], np.array([code])) for code in game_codes],
+            'perfil': user_profiles(vectors, args.queries, args.liked, rng),
+        }
+        prefix = f"{n_games:>8,} {index.n_lists:>7} {build_time:>9.2f}s"
+        for kind, queries in query_sets.items():
+            expected, exact_time = measure(lambda q, ex: exact_search(vectors, q, args.k, ex), queries)
+            print(f"{prefix} {kind:>8} {'exacta':>8} {1.0:>10.3f} {exact_time * 1e3:>8.3f}ms")
+            for n_probe in args.n_probe:
+                results, ann_time = measure(
+                    lambda q, ex: index.search(q, args.k, n_probe=n_probe, exclude=ex)[0], queries
+                )
+                print(f"{prefix} {kind:>8} {n_probe:>8} {recall(results, expected):>10.3f} {ann_time * 1e3:>8.3f}ms")
+
+        if args.table_k:
+            started = time.perf_counter()
+            table = ContentNeighbors.from_index([str(code) for code in range(n_games)], index, args.table_k, DEFAULT_N_PROBE)
+            table_time = time.perf_counter() - started
+            expected, _ = measure(lambda q, ex: exact_search(vectors, q, args.k, ex), query_sets['juego'])
+            table_top = []
+            for code in game_codes:
+                start, stop = table.neighbors.indptr[code], table.neighbors.indptr[code + 1]
+                row_codes, row_similarities = table.neighbors.indices[start:stop], table.neighbors.data[start:stop]
+                table_top.append(row_codes[np.argsort(-row_similarities, kind='stable')[:args.k]])
+            print(f"{prefix} {'tabla':>8} {DEFAULT_N_PROBE:>8} {recall(table_top, expected):>10.3f} {table_time:>9.1f}s "
+                  f"(top-{args.table_k} de todo el catálogo)")
+
+
+if __name__ == '__main__':
+    main()
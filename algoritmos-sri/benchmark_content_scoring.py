@@ -0,0 +1,142 @@
+"""
+Benchmark de la puntuación por contenido de recomendar_juegos_tfidf.
+
+Compara, sobre catálogos sintéticos de etiquetas vectorizadas con TF-IDF:
+
+  - densa:     el recorrido original sobre la matriz N×N en un DataFrame,
+               con un `.loc` por cada par (candidato, juego gustado).
+  - vecinos:   recorrido en Python de las listas de vecinos de cada juego gustado.
+  - vectorial: `ContentNeighbors.recommend`, un producto disperso y argpartition.
+
+Uso:
+    python benchmark_content_scoring.py
+    python benchmark_content_scoring.py --sizes 1000 20000 --top-k 100 --dense-max 2000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from content_neighbors import ContentNeighbors
+
+
+def synthetic_catalog(n_games: int, n_tags: int, seed: int) -> Tuple[List[str], List[str]]:
+    """Juegos con 3 a 15 etiquetas, con popularidad tipo Zipf."""
+    rng = random.Random(seed)
+    tags = [f"tag_{i}" for i in range(n_tags)]
+    weights = list(np.cumsum([1.0 / (rank + 1) for rank in range(n_tags)]))
+    game_ids = [str(100000 + i) for i in range(n_games)]
+    contents = [" ".join(set(rng.choices(tags, cum_weights=weights, k=rng.randint(3, 15)))) for _ in game_ids]
+    return game_ids, contents
+
+
+def synthetic_users(game_ids: List[str], n_users: int, n_liked: int, seed: int) -> List[Tuple[Dict[str, float], List[str]]]:
+    """(calificación por juego jugado, juegos gustados) por usuario; 0 = like sin calificación."""
+    rng = random.Random(seed)
+    users = []
+    for _ in range(n_users):
+        played = rng.sample(game_ids, n_liked * 2)
+        ratings = {game_id: rng.choice([0, 3, 4, 4.5, 5]) for game_id in played}
+        users.append((ratings, played[:n_liked]))
+    return users
+
+
+def score_dense(sim_df: pd.DataFrame, ratings: Dict[str, float], liked: List[str], top_n: int) -> List[Tuple[str, float]]:
+    """Recorrido original (sin la parte de formato)."""
+    predicted_scores = {}
+    for game_id_to_predict in sim_df.index:
+        if game_id_to_predict not in ratings:
+            sim_sum = 0
+            weighted_score_sum = 0
+            for liked_game_id in liked:
+                similarity = sim_df.loc[game_id_to_predict, liked_game_id]
+                current_rating = ratings.get(liked_game_id, 0)
+                weighted_score_sum += similarity * (current_rating if current_rating > 0 else 5)
+                sim_sum += similarity
+            if sim_sum > 0:
+                predicted_scores[game_id_to_predict] = weighted_score_sum / sim_sum
+    return sorted(predicted_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+
+
+def score_neighbor_loop(model: ContentNeighbors, ratings: Dict[str, float], liked: List[str], top_n: int) -> List[Tuple[str, float]]:
+    """Recorrido en Python de las listas de vecinos."""
+    weighted_score_sums: Dict[int, float] = {}
+    sim_sums: Dict[int, float] = {}
+    for liked_game_id in liked:
+        weight = ratings[liked_game_id] if ratings[liked_game_id] > 0 else 5
+        neighbor_codes, similarities = model.neighbors_of(liked_game_id)
+        for game_code, similarity in zip(neighbor_codes.tolist(), similarities.tolist()):
+            weighted_score_sums[game_code] = weighted_score_sums.get(game_code, 0) + similarity * weight
+            sim_sums[game_code] = sim_sums.get(game_code, 0) + similarity
+    predicted_scores = {
+        model.game_ids[game_code]: weighted_score_sums[game_code] / sim_sum
+        for game_code, sim_sum in sim_sums.items()
+        if model.game_ids[game_code] not in ratings and sim_sum > 0
+    }
+    return sorted(predicted_scores.items(), key=lambda x: x[1], reverse=True)[:top_n]
+
+
+def score_vectorized(model: ContentNeighbors, ratings: Dict[str, float], liked: List[str], top_n: int) -> List[Tuple[str, float]]:
+    liked_codes = [model.game_code_of[game_id] for game_id in liked]
+    weights = [ratings[game_id] if ratings[game_id] > 0 else 5 for game_id in liked]
+    played_codes = [model.game_code_of[game_id] for game_id in ratings]
+    return [(model.game_ids[code], score) for code, score in model.recommend(liked_codes, weights, played_codes, top_n)]
+
+
+def time_per_query(fn, users) -> float:
+    started = time.perf_counter()
+    for ratings, liked in users:
+        fn(ratings, liked)
+    return (time.perf_counter() - started) / len(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la puntuación por contenido.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 5_000, 20_000])
+    parser.add_argument('--tags', type=int, default=400, help="Cantidad de etiquetas distintas.")
+    parser.add_argument('--top-k', type=int, default=100, help="Vecinos guardados por juego.")
+    parser.add_argument('--liked', type=int, default=10, help="Juegos gustados por usuario de prueba.")
+    parser.add_argument('--queries', type=int, default=200, help="Consultas para vecinos y vectorial.")
+    parser.add_argument('--dense-queries', type=int, default=3, help="Consultas para la versión densa (es muy lenta).")
+    parser.add_argument('--dense-max', type=int, default=5_000, help="Tamaño máximo de catálogo para la versión densa.")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'juegos':>8} {'construir':>10} {'densa':>12} {'vecinos':>12} {'vectorial':>12} {'vs densa':>10} {'vs vecinos':>11}")
+    for n_games in args.sizes:
+        game_ids, contents = synthetic_catalog(n_games, args.tags, args.seed)
+        users = synthetic_users(game_ids, args.queries, args.liked, args.seed + 1)
+        vectors = TfidfVectorizer().fit_transform(contents)
+
+        started = time.perf_counter()
+        model = ContentNeighbors.from_vectors(game_ids, vectors, top_k=args.top_k)
+        build_time = time.perf_counter() - started
+
+        # La versión vectorial debe dar las mismas puntuaciones que el recorrido de vecinos.
+        for ratings, liked in users[:20]:
+            expected = [round(score, 4) for _, score in score_neighbor_loop(model, ratings, liked, args.top_n)]
+            got = [round(score, 4) for _, score in score_vectorized(model, ratings, liked, args.top_n)]
+            assert expected == got, "Las puntuaciones no coinciden con el recorrido de vecinos."
+
+        loop_time = time_per_query(lambda r, l: score_neighbor_loop(model, r, l, args.top_n), users)
+        vector_time = time_per_query(lambda r, l: score_vectorized(model, r, l, args.top_n), users)
+
+        # La versión densa solo se mide en catálogos chicos: la matriz N×N no cabe en memoria.
+        dense_col, dense_speedup_col = f"{'-':>12}", f"{'-':>10}"
+        if n_games <= args.dense_max:
+            sim_df = pd.DataFrame((vectors @ vectors.T).toarray(), index=game_ids, columns=game_ids)
+            dense_time = time_per_query(lambda r, l: score_dense(sim_df, r, l, args.top_n), users[:args.dense_queries])
+            del sim_df
+            dense_col, dense_speedup_col = f"{dense_time * 1e3:>10.1f}ms", f"{dense_time / vector_time:>9.0f}x"
+
+        print(f"{n_games:>8,} {build_time:>9.2f}s {dense_col} {loop_time * 1e3:>10.2f}ms "
+              f"{vector_time * 1e3:>10.3f}ms {dense_speedup_col} {loop_time / vector_time:>10.1f}x")
+
+
+if __name__ == '__main__':
+    main()
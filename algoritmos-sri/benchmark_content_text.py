@@ -0,0 +1,102 @@
+"""
+Benchmark de construcción del modelo de contenido con texto (SRI_CONTENT_TEXT=1).
+
+Genera catálogos sintéticos con el formato de datos_juegos.json (categorías,
+etiquetas y descripciones corta/larga con HTML) y mide, para cada tamaño:
+
+  - vectorizar: `HashingTfidfVectorizer.fit_transform_stream` por bloques.
+  - vecinos:    `ContentNeighbors.from_vectors` (top-K exacto, por bloques).
+  - RSS:        memoria residente máxima del proceso que construye el modelo.
+
+Cada tamaño corre en un proceso nuevo para que el RSS máximo no arrastre el
+de los tamaños anteriores. El catálogo se genera juego por juego dentro del
+recorrido, como lo haría la lectura de datos_juegos.json en streaming.
+
+Uso:
+    python benchmark_content_text.py
+    python benchmark_content_text.py --sizes 1000 10000 --top-k 50
+"""
+import argparse
+import multiprocessing
+import random
+import resource
+import time
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from content_neighbors import ContentNeighbors
+from content_text import HashingTfidfVectorizer, text_document
+
+CATEGORIES = ['Un jugador', 'Multijugador', 'Cooperativo', 'Logros de Steam', 'Compatibilidad con mando']
+
+
+def synthetic_games(n_games: int, n_words: int, n_tags: int, seed: int) -> Iterator[Tuple[str, Dict]]:
+    """Juegos sintéticos; las palabras y etiquetas siguen una popularidad tipo Zipf."""
+    rng = random.Random(seed)
+    words = [f"palabra{i}" for i in range(n_words)]
+    word_weights = list(np.cumsum([1.0 / (rank + 1) for rank in range(n_words)]))
+    tags = [f"Etiqueta {i}" for i in range(n_tags)]
+    tag_weights = list(np.cumsum([1.0 / (rank + 1) for rank in range(n_tags)]))
+    for i in range(n_games):
+        paragraphs = [
+            " ".join(rng.choices(words, cum_weights=word_weights, k=rng.randint(10, 60)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        yield str(100000 + i), {
+            'categorias': rng.sample(CATEGORIES, rng.randint(1, 3)),
+            'tags': [{'description': tag} for tag in set(rng.choices(tags, cum_weights=tag_weights, k=rng.randint(3, 15)))],
+            'descripcion_corta': " ".join(rng.choices(words, cum_weights=word_weights, k=20)),
+            'descripcion_larga': '<img class="bb_img" src="x.gif" /><br>' + "<br><br>".join(f"<p>{p} &amp; más</p>" for p in paragraphs),
+        }
+
+
+def build(n_games: int, args, results) -> None:
+    game_ids = []
+
+    def documents():
+        for game_id, details in synthetic_games(n_games, args.words, args.tags, args.seed):
+            game_ids.append(game_id)
+            yield text_document(details)
+
+    started = time.perf_counter()
+    vectorizer = HashingTfidfVectorizer(n_features=args.n_features)
+    vectors = vectorizer.fit_transform_stream(documents(), chunk_size=args.chunk_size)
+    vectorize_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model = ContentNeighbors.from_vectors(game_ids, vectors, top_k=args.top_k, block_size=args.block_size)
+    neighbors_time = time.perf_counter() - started
+
+    neighbors = model.neighbors
+    neighbor_bytes = neighbors.data.nbytes + neighbors.indices.nbytes + neighbors.indptr.nbytes
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((vectorize_time, neighbors_time, vectors.nnz, neighbors.nnz, neighbor_bytes, peak_rss_mb))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del modelo de contenido con texto.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--words', type=int, default=30_000, help="Vocabulario de las descripciones.")
+    parser.add_argument('--tags', type=int, default=400, help="Cantidad de etiquetas distintas.")
+    parser.add_argument('--top-k', type=int, default=100, help="Vecinos guardados por juego.")
+    parser.add_argument('--n-features', type=int, default=2 ** 20, help="Columnas del hashing.")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Documentos por bloque al vectorizar.")
+    parser.add_argument('--block-size', type=int, default=256, help="Filas por bloque al calcular vecinos.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    print(f"{'juegos':>8} {'vectorizar':>11} {'vecinos':>10} {'nnz texto':>12} {'nnz vecinos':>12} {'vecinos MB':>11} {'RSS máx MB':>11}")
+    for n_games in args.sizes:
+        results = context.Queue()
+        process = context.Process(target=build, args=(n_games, args, results))
+        process.start()
+        vectorize_time, neighbors_time, text_nnz, neighbors_nnz, neighbor_bytes, peak_rss_mb = results.get()
+        process.join()
+        print(f"{n_games:>8,} {vectorize_time:>10.2f}s {neighbors_time:>9.2f}s {text_nnz:>12,} {neighbors_nnz:>12,} "
+              f"{neighbor_bytes / 2 ** 20:>11.1f} {peak_rss_mb:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
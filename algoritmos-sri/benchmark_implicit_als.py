@@ -0,0 +1,75 @@
+"""
+Benchmark del entrenamiento del ALS implícito (implicit_als.ImplicitALS).
+
+Sobre interacciones sintéticas (popularidad de juegos tipo Zipf; cada
+interacción con like/dislike, calificación y horas al azar) mide, para cada
+cantidad de usuarios y de hilos:
+
+  - ajuste:       ImplicitALS.fit completo.
+  - por interacción: tiempo de ajuste / (interacciones × iteraciones). Si el
+                  costo crece linealmente con las interacciones, esta columna
+                  se mantiene casi constante al crecer los datos.
+  - recomendar:   ImplicitALS.recommend de un usuario.
+
+Uso:
+    python benchmark_implicit_als.py
+    python benchmark_implicit_als.py --sizes 20000 100000 --workers 1 4 --factors 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from implicit_als import DEFAULT_FACTORS, DEFAULT_ITERATIONS, ImplicitALS
+from interaction_matrix import InteractionMatrix
+
+
+def synthetic_matrix(n_users: int, n_games: int, per_user: int, seed: int) -> InteractionMatrix:
+    """Matriz columnar de interacciones sintéticas (sin pasar por el JSON)."""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(1, per_user + 1, size=n_users)
+    user_codes = np.repeat(np.arange(n_users, dtype=np.int32), counts)
+    popularity = 1.0 / np.arange(1, n_games + 1) ** 0.8
+    game_codes = rng.choice(n_games, size=len(user_codes), p=popularity / popularity.sum()).astype(np.int32)
+    n = len(user_codes)
+    ratings = np.where(rng.random(n) < 0.4, rng.choice([1, 2, 3, 4, 5], size=n), np.nan).astype(np.float32)
+    likes = rng.choice([-1, 0, 1], size=n, p=[0.1, 0.4, 0.5]).astype(np.int8)
+    hours = np.where(rng.random(n) < 0.6, rng.exponential(20.0, size=n), np.nan).astype(np.float32)
+    return InteractionMatrix(list(range(1, n_users + 1)), [str(100000 + game) for game in range(n_games)],
+                             user_codes, game_codes, ratings, likes, hours)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del entrenamiento del ALS implícito.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000], help="Cantidad de usuarios.")
+    parser.add_argument('--games', type=int, default=5_000)
+    parser.add_argument('--per-user', type=int, default=40, help="Interacciones máximas por usuario.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4], help="Hilos del entrenamiento.")
+    parser.add_argument('--factors', type=int, default=DEFAULT_FACTORS)
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'usuarios':>9} {'interacciones':>14} {'hilos':>6} {'ajuste':>9} {'por interacción':>16} {'recomendar':>11}")
+    for n_users in args.sizes:
+        matrix = synthetic_matrix(n_users, args.games, args.per_user, args.seed)
+        for workers in args.workers:
+            started = time.perf_counter()
+            model = ImplicitALS.fit(matrix, factors=args.factors, iterations=args.iterations, workers=workers,
+                                    seed=args.seed)
+            fit_time = time.perf_counter() - started
+
+            queries = np.random.default_rng(args.seed).choice(model.user_ids, size=min(args.queries, n_users), replace=False)
+            started = time.perf_counter()
+            for user_id in queries:
+                model.recommend(int(user_id), 10)
+            recommend_time = (time.perf_counter() - started) / len(queries)
+
+            per_interaction = fit_time / (matrix.nnz * args.iterations)
+            print(f"{n_users:>9,} {matrix.nnz:>14,} {workers:>6} {fit_time:>8.2f}s {per_interaction * 1e9:>14.0f}ns "
+                  f"{recommend_time * 1e3:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark del filtrado colaborativo ítem-ítem (item_cf.ItemItemCF) frente a
+KNNBasic(sim_options={'name': 'cosine', 'user_based': False}) de Surprise.
+
+Sobre calificaciones sintéticas (escala 1-5, popularidad de juegos tipo Zipf)
+mide para cada tamaño de catálogo:
+
+  - ajuste:  KNNBasic.fit (matriz densa de similitud) frente a
+             ItemItemCF.from_ratings (similitud dispersa con top-K por juego).
+  - predict: un KNNBasic.predict por juego del catálogo, por usuario.
+  - lote:    ItemItemCF.recommend_batch, en usuarios por segundo.
+
+Con --top-k 0 la tabla de vecinos queda completa y se verifica que las
+predicciones coinciden con las de KNNBasic; con un top-K menor se reporta la
+diferencia máxima.
+
+Uso:
+    python benchmark_item_cf.py
+    python benchmark_item_cf.py --sizes 500 2000 --users 20000 --top-k 100
+"""
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from surprise import Dataset, KNNBasic, Reader
+
+from item_cf import ItemItemCF
+
+
+def synthetic_ratings(n_users: int, n_games: int, per_user: int, seed: int) -> List[Tuple[int, int, float]]:
+    rng = random.Random(seed)
+    weights = list(np.cumsum([1.0 / (rank + 1) ** 0.8 for rank in range(n_games)]))
+    ratings = []
+    for user_id in range(1, n_users + 1):
+        for game_id in set(rng.choices(range(n_games), cum_weights=weights, k=rng.randint(1, per_user))):
+            ratings.append((user_id, 100000 + game_id, float(rng.choice([1, 2, 3, 4, 4.5, 5]))))
+    return ratings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del filtrado colaborativo ítem-ítem.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2_000], help="Juegos del catálogo.")
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--per-user', type=int, default=60, help="Calificaciones máximas por usuario.")
+    parser.add_argument('--top-k', type=int, default=0, help="Vecinos por juego (0 = todos).")
+    parser.add_argument('--queries', type=int, default=20, help="Usuarios consultados con KNNBasic.predict.")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'juegos':>8} {'usuarios':>9} {'ajuste knn':>11} {'ajuste cf':>10} {'dif. máx':>10} "
+          f"{'predict':>12} {'lote':>12} {'usuarios/s':>11}")
+    for n_games in args.sizes:
+        ratings = synthetic_ratings(args.users, n_games, args.per_user, args.seed)
+        df = pd.DataFrame(ratings, columns=['userID', 'itemID', 'rating'])
+        trainset = Dataset.load_from_df(df, Reader(rating_scale=(0, 5))).build_full_trainset()
+
+        started = time.perf_counter()
+        knn = KNNBasic(sim_options={'name': 'cosine', 'user_based': False}, verbose=False)
+        knn.fit(trainset)
+        knn_fit_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        item_cf = ItemItemCF.from_ratings(ratings, top_k=args.top_k or n_games)
+        cf_fit_time = time.perf_counter() - started
+
+        rng = random.Random(args.seed)
+        queries = rng.sample(item_cf.user_ids, min(args.queries, len(item_cf.user_ids)))
+
+        started = time.perf_counter()
+        expected = [np.array([knn.predict(user_id, game_id).est for game_id in item_cf.item_ids]) for user_id in queries]
+        predict_time = (time.perf_counter() - started) / len(queries)
+
+        max_diff = 0.0
+        for user_id, user_expected in zip(queries, expected):
+            scores = item_cf.scores(np.array([item_cf.user_code_of[user_id]]))[0]
+            unrated = np.isfinite(scores)
+            max_diff = max(max_diff, float(np.abs(scores[unrated] - user_expected[unrated]).max()))
+        if not args.top_k:
+            assert max_diff < 1e-9, "Las predicciones no coinciden con KNNBasic."
+
+        started = time.perf_counter()
+        item_cf.recommend_batch(item_cf.user_ids, args.top_n)
+        batch_time = (time.perf_counter() - started) / len(item_cf.user_ids)
+
+        print(f"{n_games:>8,} {len(item_cf.user_ids):>9,} {knn_fit_time:>10.2f}s {cf_fit_time:>9.2f}s {max_diff:>10.1e} "
+              f"{predict_time * 1e3:>10.1f}ms {batch_time * 1e3:>10.3f}ms {1 / batch_time:>11,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark de la puntuación SVD de recommend_svd_ranking.
+
+Entrena un `SVD` de Surprise sobre calificaciones sintéticas (escala 0-5,
+popularidad de juegos tipo Zipf) y compara, por usuario:
+
+  - predict:  el recorrido original, un `model.predict` por juego sin calificar.
+  - vectorial: `SVDScorer.recommend`, mu + b_u + b_i + P[u] @ Q.T de una vez.
+  - lote:     `SVDScorer.recommend_batch`, una multiplicación de matrices por bloque de usuarios.
+  - fold-in:  `SVDScorer.fold_in` de un usuario con todas sus calificaciones,
+              frente a `ajuste`, el `SVD.fit` completo que reemplaza.
+
+Antes de medir verifica que las predicciones vectoriales coinciden con las
+de `model.predict` (ya recortadas a la escala) para todos los juegos.
+
+Uso:
+    python benchmark_svd_scoring.py
+    python benchmark_svd_scoring.py --sizes 1000 10000 --users 5000 --factors 50
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from surprise import SVD, Dataset, Reader
+
+from svd_scoring import SVDScorer
+
+
+def synthetic_ratings(n_users: int, n_games: int, per_user: int, seed: int) -> List[Tuple[int, int, float]]:
+    rng = random.Random(seed)
+    weights = list(np.cumsum([1.0 / (rank + 1) for rank in range(n_games)]))
+    ratings = []
+    for user_id in range(1, n_users + 1):
+        for game_id in set(rng.choices(range(n_games), cum_weights=weights, k=rng.randint(1, per_user))):
+            ratings.append((user_id, 100000 + game_id, float(rng.choice([0, 1, 2, 3, 4, 4.5, 5]))))
+    return ratings
+
+
+def recommend_predict(model: SVD, trainset, user_id: int, top_n: int) -> List[Tuple[int, float]]:
+    """Recorrido original (sin la parte de formato)."""
+    interacted = {trainset.to_raw_iid(inner_iid) for inner_iid, _ in trainset.ur[trainset.to_inner_uid(user_id)]}
+    predictions = [(trainset.to_raw_iid(inner_iid), model.predict(user_id, trainset.to_raw_iid(inner_iid)).est)
+                   for inner_iid in trainset.all_items() if trainset.to_raw_iid(inner_iid) not in interacted]
+    predictions.sort(key=lambda x: -x[1])
+    return predictions[:top_n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la puntuación SVD.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000], help="Juegos del catálogo.")
+    parser.add_argument('--users', type=int, default=2_000)
+    parser.add_argument('--per-user', type=int, default=30, help="Calificaciones máximas por usuario.")
+    parser.add_argument('--factors', type=int, default=100, help="n_factors del SVD.")
+    parser.add_argument('--epochs', type=int, default=5, help="n_epochs del SVD (no afecta la puntuación).")
+    parser.add_argument('--queries', type=int, default=50, help="Usuarios consultados con predict.")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'juegos':>8} {'usuarios':>9} {'dif. máx':>10} {'predict':>12} {'vectorial':>12} {'lote':>12} {'vs predict':>11} "
+          f"{'ajuste':>9} {'fold-in':>10}")
+    for n_games in args.sizes:
+        ratings = synthetic_ratings(args.users, n_games, args.per_user, args.seed)
+        df = pd.DataFrame(ratings, columns=['userID', 'itemID', 'rating'])
+        trainset = Dataset.load_from_df(df, Reader(rating_scale=(0, 5))).build_full_trainset()
+        model = SVD(n_factors=args.factors, n_epochs=args.epochs, random_state=args.seed)
+        started = time.perf_counter()
+        model.fit(trainset)
+        fit_time = time.perf_counter() - started
+        scorer = SVDScorer.from_model(model, trainset)
+
+        rng = random.Random(args.seed)
+        user_ids = [trainset.to_raw_uid(inner_uid) for inner_uid in trainset.all_users()]
+        queries = rng.sample(user_ids, min(args.queries, len(user_ids)))
+
+        # Misma predicción que model.predict para cada juego; los calificados quedan en -inf.
+        max_diff = 0.0
+        for user_id in queries[:10]:
+            scores = scorer.scores(np.array([scorer.user_code_of[user_id]]))[0]
+            expected = np.array([model.predict(user_id, game_id).est for game_id in scorer.item_ids])
+            unrated = np.isfinite(scores)
+            max_diff = max(max_diff, float(np.abs(scores[unrated] - expected[unrated]).max()))
+        assert max_diff < 1e-9, "Las predicciones vectoriales no coinciden con model.predict."
+
+        started = time.perf_counter()
+        for user_id in queries:
+            recommend_predict(model, trainset, user_id, args.top_n)
+        predict_time = (time.perf_counter() - started) / len(queries)
+
+        started = time.perf_counter()
+        for user_id in user_ids:
+            scorer.recommend(user_id, args.top_n)
+        vector_time = (time.perf_counter() - started) / len(user_ids)
+
+        started = time.perf_counter()
+        scorer.recommend_batch(user_ids, args.top_n)
+        batch_time = (time.perf_counter() - started) / len(user_ids)
+
+        user_ratings: Dict[int, List[Tuple[int, float]]] = {}
+        for user_id, game_id, rating in ratings:
+            user_ratings.setdefault(user_id, []).append((game_id, rating))
+        started = time.perf_counter()
+        for user_id in queries:
+            scorer.fold_in(user_id, user_ratings[user_id])
+        fold_in_time = (time.perf_counter() - started) / len(queries)
+
+        print(f"{n_games:>8,} {len(user_ids):>9,} {max_diff:>10.1e} {predict_time * 1e3:>10.2f}ms "
+              f"{vector_time * 1e3:>10.3f}ms {batch_time * 1e3:>10.3f}ms {predict_time / vector_time:>10.0f}x "
+              f"{fit_time:>8.2f}s {fold_in_time * 1e3:>8.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
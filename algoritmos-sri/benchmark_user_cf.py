@@ -0,0 +1,101 @@
+"""
+Benchmark de los vecindarios de usuarios (user_cf.UserNeighborhoods) frente a
+KNNBasic(sim_options={'name': 'cosine', 'user_based': True}) de Surprise.
+
+Sobre calificaciones sintéticas (escala 1-5, popularidad de juegos tipo Zipf)
+mide para cada cantidad de usuarios:
+
+  - ajuste knn:  KNNBasic.fit (matriz densa usuarios × usuarios).
+  - rebuild:     UserNeighborhoods.rebuild (top-K por usuario, por bloques).
+  - evento:      UserNeighborhoods.update de una calificación nueva (similitudes
+                 con quienes calificaron el juego y sus entradas recíprocas).
+  - recomendar:  UserNeighborhoods.recommend de un usuario.
+
+Con --top-k 0 se guardan todos los vecinos y se verifica que las
+predicciones coinciden con las de KNNBasic.
+
+Uso:
+    python benchmark_user_cf.py
+    python benchmark_user_cf.py --sizes 5000 20000 --games 2000 --top-k 100
+"""
+import argparse
+import random
+import time
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from surprise import Dataset, KNNBasic, Reader
+
+from user_cf import UserNeighborhoods
+
+
+def synthetic_interacciones(n_users: int, n_games: int, per_user: int, seed: int) -> Dict:
+    """Interacciones sintéticas con el formato de interacciones.json."""
+    rng = random.Random(seed)
+    weights = list(np.cumsum([1.0 / (rank + 1) ** 0.8 for rank in range(n_games)]))
+    usuarios = []
+    for user_id in range(1, n_users + 1):
+        games = set(rng.choices(range(n_games), cum_weights=weights, k=rng.randint(1, per_user)))
+        usuarios.append({'id': user_id, 'interacciones': [
+            {'id_juego': 100000 + game, 'calificacion': rng.choice([1, 2, 3, 4, 4.5, 5])} for game in games
+        ]})
+    return {'interacciones': usuarios}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los vecindarios de usuarios.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[2_000, 10_000], help="Cantidad de usuarios.")
+    parser.add_argument('--games', type=int, default=1_000)
+    parser.add_argument('--per-user', type=int, default=30, help="Calificaciones máximas por usuario.")
+    parser.add_argument('--top-k', type=int, default=0, help="Vecinos por usuario (0 = todos).")
+    parser.add_argument('--knn-max', type=int, default=10_000, help="Usuarios máximos para ajustar KNNBasic.")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'usuarios':>9} {'ajuste knn':>11} {'rebuild':>9} {'dif. máx':>10} {'evento':>10} {'recomendar':>11}")
+    for n_users in args.sizes:
+        interacciones = synthetic_interacciones(n_users, args.games, args.per_user, args.seed)
+        neighborhoods = UserNeighborhoods(interacciones)
+        started = time.perf_counter()
+        neighborhoods.rebuild(top_k=args.top_k or n_users)
+        rebuild_time = time.perf_counter() - started
+
+        rng = random.Random(args.seed)
+        queries = rng.sample(range(1, n_users + 1), min(args.queries, n_users))
+
+        knn_col, diff_col = f"{'-':>11}", f"{'-':>10}"
+        if n_users <= args.knn_max:
+            ratings = [(entry['id'], interaction['id_juego'], float(interaction['calificacion']))
+                       for entry in interacciones['interacciones'] for interaction in entry['interacciones']]
+            trainset = Dataset.load_from_df(pd.DataFrame(ratings, columns=['userID', 'itemID', 'rating']),
+                                            Reader(rating_scale=(0, 5))).build_full_trainset()
+            started = time.perf_counter()
+            knn = KNNBasic(sim_options={'name': 'cosine', 'user_based': True}, verbose=False)
+            knn.fit(trainset)
+            knn_col = f"{time.perf_counter() - started:>10.2f}s"
+            max_diff = 0.0
+            for user_id in queries[:20]:
+                for game_id, score in neighborhoods.recommend(user_id, args.games):
+                    max_diff = max(max_diff, abs(score - knn.predict(user_id, game_id).est))
+            if not args.top_k:
+                assert max_diff < 1e-9, "Las predicciones no coinciden con KNNBasic."
+            diff_col = f"{max_diff:>10.1e}"
+
+        started = time.perf_counter()
+        for user_id in queries:
+            neighborhoods.recommend(user_id, args.top_n)
+        recommend_time = (time.perf_counter() - started) / len(queries)
+
+        started = time.perf_counter()
+        for user_id in queries:
+            neighborhoods.update(user_id, {'id_juego': 100000 + rng.randrange(args.games), 'calificacion': rng.choice([1, 5])})
+        update_time = (time.perf_counter() - started) / len(queries)
+
+        print(f"{n_users:>9,} {knn_col} {rebuild_time:>8.2f}s {diff_col} {update_time * 1e3:>8.2f}ms {recommend_time * 1e3:>9.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import threading
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+DEFAULT_N_PROBE = 4
+DEFAULT_CENTROID_TERMS = 2_000
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000
+ASSIGN_BLOCK = 4096
+
+
+def _prune_rows(matrix: sp.csr_matrix, max_terms: int) -> sp.csr_matrix:
+    """Conserva los `max_terms` valores más grandes de cada fila."""
+    matrix = sp.csr_matrix(matrix)
+    data, indices, indptr = [], [], [0]
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        row_data, row_indices = matrix.data[start:end], matrix.indices[start:end]
+        if len(row_data) > max_terms:
+            keep = np.sort(np.argpartition(-row_data, max_terms - 1)[:max_terms])
+            row_data, row_indices = row_data[keep], row_indices[keep]
+        data.append(row_data)
+        indices.append(row_indices)
+        indptr.append(indptr[-1] + len(row_data))
+    return sp.csr_matrix(
+        (np.concatenate(data), np.concatenate(indices), np.array(indptr)), shape=matrix.shape
+    )
+
+
+def _assign(vectors: sp.csr_matrix, centroids_t: sp.csr_matrix) -> np.ndarray:
+    """Lista (centroide con mayor coseno) de cada fila, por bloques de filas."""
+    assignment = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], ASSIGN_BLOCK):
+        scores = (vectors[start:start + ASSIGN_BLOCK] @ centroids_t).toarray()
+        assignment[start:start + ASSIGN_BLOCK] = np.argmax(scores, axis=1)
+    return assignment
+
+
+def _centroids(vectors: sp.csr_matrix, assignment: np.ndarray, n_lists: int, max_terms: int) -> sp.csr_matrix:
+    """Centroides esféricos: suma de los vectores de cada lista, recortada a `max_terms` términos y normalizada."""
+    membership = sp.csr_matrix(
+        (np.ones(len(assignment), dtype=vectors.dtype), (assignment, np.arange(len(assignment)))),
+        shape=(n_lists, vectors.shape[0]),
+    )
+    return normalize(_prune_rows(membership @ vectors, max_terms))
+
+
+class IVFIndex:
+    """
+    Índice aproximado de vecinos por coseno (IVF, "inverted file") sobre los
+    vectores de contenido de los juegos (TF-IDF o hashing, con norma L2 unitaria).
+
+    Los juegos se reparten en `n_lists` listas con k-means esférico directamente
+    sobre los vectores dispersos; cada centroide se recorta a sus
+    `centroid_terms` términos de más peso para que siga siendo disperso aunque
+    haya 2^20 columnas. Una búsqueda compara la consulta con los centroides,
+    junta los juegos de las `n_probe` listas más cercanas y los puntúa con el
+    coseno exacto.
+
+    `n_probe` regula el compromiso: más listas = mejor recall y más latencia;
+    con n_probe = n_lists la búsqueda es exacta. La consulta puede ser el vector
+    de un juego ("juegos similares a X") o cualquier combinación de vectores,
+    como el perfil de un usuario.
+    """
+
+    def __init__(self, vectors: sp.csr_matrix, centroids: sp.csr_matrix, list_indptr: np.ndarray, list_items: np.ndarray):
+        # Las filas se guardan en orden de lista: los candidatos de una lista son
+        # un tramo contiguo de `data`/`indices` y se puntúan sin copiar filas.
+        self.vectors = sp.csr_matrix(vectors[list_items])
+        self.centroids = centroids
+        # Traspuesta en CSR: permite recorrer solo las filas de los términos de la consulta.
+        self._centroids_t = sp.csr_matrix(centroids.T)
+        self.list_indptr = list_indptr
+        self.list_items = list_items
+        self.position_of = np.empty(len(list_items), dtype=np.int64)
+        self.position_of[list_items] = np.arange(len(list_items))
+        self._buffers = threading.local()
+
+    @classmethod
+    def build(cls, vectors: sp.csr_matrix, n_lists: Optional[int] = None,
+              centroid_terms: int = DEFAULT_CENTROID_TERMS, seed: int = 0) -> 'IVFIndex':
+        """
+        Por omisión usa ~sqrt(N) listas. k-means se ajusta sobre una muestra de
+        hasta KMEANS_SAMPLE juegos y al final se asignan todos los juegos.
+        """
+        vectors = sp.csr_matrix(vectors)
+        n_games = vectors.shape[0]
+        n_lists = max(1, min(n_lists or int(np.sqrt(n_games)), n_games))
+
+        rng = np.random.default_rng(seed)
+        sample = vectors[np.sort(rng.choice(n_games, min(n_games, KMEANS_SAMPLE), replace=False))]
+        centroids = normalize(_prune_rows(sample[rng.choice(sample.shape[0], n_lists, replace=False)], centroid_terms))
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = _assign(sample, sp.csr_matrix(centroids.T))
+            updated = sp.lil_matrix(_centroids(sample, assignment, n_lists, centroid_terms))
+            # Una lista que quedó vacía conserva su centroide anterior.
+            for empty in np.flatnonzero(np.bincount(assignment, minlength=n_lists) == 0):
+                updated[empty] = centroids[empty]
+            centroids = sp.csr_matrix(updated)
+
+        assignment = _assign(vectors, sp.csr_matrix(centroids.T))
+        list_items = np.argsort(assignment, kind='stable').astype(np.int32)
+        list_indptr = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=n_lists)))).astype(np.int64)
+        return cls(vectors, centroids, list_indptr, list_items)
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def _probe(self, queries: sp.csr_matrix, n_probe: int) -> np.ndarray:
+        """Las `n_probe` listas más cercanas a cada consulta (consultas × n_probe)."""
+        scores = (queries @ self._centroids_t).toarray()
+        n_probe = min(n_probe, self.n_lists)
+        if n_probe == self.n_lists:
+            return np.tile(np.arange(self.n_lists), (queries.shape[0], 1))
+        return np.argpartition(-scores, n_probe - 1, axis=1)[:, :n_probe]
+
+    def neighbor_blocks(self, k: int, n_probe: int = DEFAULT_N_PROBE,
+                        block_size: int = 256) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Los `k` vecinos aproximados de todos los juegos, por bloques de hasta
+        `block_size` juegos de una misma lista: (índices de los juegos del
+        bloque, índices de sus vecinos, similitudes), los dos últimos de forma
+        juegos × k; sin el propio juego.
+
+        Los juegos del bloque se comparan juntos, con un producto disperso,
+        contra la unión de las listas que revisaría cada uno; cada juego ve al
+        menos sus propias `n_probe` listas, así que el recall es el de `search`
+        o mejor, y es mucho más rápido que una búsqueda por juego.
+        """
+        for l in range(self.n_lists):
+            for first in range(self.list_indptr[l], self.list_indptr[l + 1], block_size):
+                last = min(first + block_size, self.list_indptr[l + 1])
+                queries = self.vectors[first:last]
+                lists = np.unique(self._probe(queries, n_probe))
+                positions = np.concatenate([np.arange(self.list_indptr[p], self.list_indptr[p + 1]) for p in lists])
+                similarity = (queries @ self.vectors[positions].T).toarray()
+                similarity[positions[None, :] == np.arange(first, last)[:, None]] = -np.inf  # sin el propio juego
+
+                row_k = min(k, len(positions))
+                top = np.argpartition(-similarity, row_k - 1, axis=1)[:, :row_k] if row_k else np.empty((last - first, 0), dtype=np.int64)
+                yield (self.list_items[first:last], self.list_items[positions[top]],
+                       np.take_along_axis(similarity, top, axis=1).astype(np.float32))
+
+    def search(self, query: sp.csr_matrix, k: int = 10, n_probe: int = DEFAULT_N_PROBE,
+               exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Los `k` juegos más similares a `query` (un vector 1 × columnas), sin los
+        índices de `exclude`. Devuelve (índices, similitudes) en orden
+        descendente de similitud; los empates, por índice.
+        """
+        query = sp.csr_matrix(query)
+        query.sum_duplicates()
+        if query.nnz == 0 or k <= 0:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        centroids_t = self._centroids_t
+        starts = centroids_t.indptr[query.indices]
+        lengths = centroids_t.indptr[query.indices + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        centroid_scores = np.bincount(
+            centroids_t.indices[positions],
+            weights=centroids_t.data[positions] * np.repeat(query.data, lengths),
+            minlength=self.n_lists,
+        )
+        n_probe = min(n_probe, self.n_lists)
+        lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe] if n_probe < self.n_lists else np.arange(self.n_lists)
+
+        # Consulta densa en un arreglo reutilizado por hilo: crear (y poner en
+        # cero) uno de 2^20 columnas en cada consulta cuesta más que la búsqueda.
+        query_dense = getattr(self._buffers, 'query', None)
+        if query_dense is None:
+            query_dense = self._buffers.query = np.zeros(self.vectors.shape[1], dtype=np.float64)
+        query_dense[query.indices] = query.data
+        candidates, scores = [], []
+        try:
+            for l in lists:
+                first, last = self.list_indptr[l], self.list_indptr[l + 1]
+                if first == last:
+                    continue
+                row_bounds = self.vectors.indptr[first:last + 1]
+                nnz = slice(row_bounds[0], row_bounds[-1])
+                cumulative = np.concatenate(([0.0], np.cumsum(self.vectors.data[nnz] * query_dense[self.vectors.indices[nnz]])))
+                candidates.append(self.list_items[first:last])
+                scores.append(cumulative[row_bounds[1:] - row_bounds[0]] - cumulative[row_bounds[:-1] - row_bounds[0]])
+        finally:
+            query_dense[query.indices] = 0.0
+        if not candidates:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        candidates, scores = np.concatenate(candidates), np.concatenate(scores)
+        if exclude is not None and len(exclude):
+            keep = ~np.isin(candidates, exclude)
+            candidates, scores = candidates[keep], scores[keep]
+
+        top = np.argpartition(-scores, k - 1)[:k] if candidates.size > k else np.arange(candidates.size)
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return candidates[top], scores[top].astype(np.float32)
+
+    def similar_to(self, code: int, k: int = 10, n_probe: int = DEFAULT_N_PROBE) -> Tuple[np.ndarray, np.ndarray]:
+        """Los `k` juegos más similares al juego `code` (sin él mismo)."""
+        return self.search(self.vectors[self.position_of[code]], k, n_probe, exclude=np.array([code]))
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Any, Iterable, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from content_ann import IVFIndex
+from content_neighbors import ContentNeighbors
+from content_text import HashingTfidfVectorizer
+
+# Se incrementa si cambia la forma de calcular o guardar los artefactos.
+STORE_FORMAT = 5
+
+# Arreglos del índice aproximado, en el orden de `save`.
+INDEX_ARRAYS = ('index_centroids_indptr', 'index_centroids_indices', 'index_centroids_data',
+                'index_list_indptr', 'index_list_items')
+
+
+def catalog_fingerprint(documents: Iterable[Tuple[str, str]], **params: Any) -> str:
+    """
+    Huella del modelo de contenido: depende solo de los juegos con contenido, sus
+    documentos normalizados (categorías/etiquetas y, en el modelo de texto, las
+    descripciones sin HTML) y los parámetros del modelo (K, modo, índice, ...).
+    `documents` se recorre una sola vez, así que puede ser un generador.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({'format': STORE_FORMAT, **params}, sort_keys=True).encode('utf-8'))
+    for game_id, document in documents:
+        digest.update(f"\n{game_id}\t{document}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ContentModel(NamedTuple):
+    """
+    Modelo de contenido entrenado: el vectorizador (TF-IDF o hashing), los
+    vecinos de cada juego, los vectores de contenido de los juegos (filas en
+    el orden de `neighbors.game_ids`, norma L2 unitaria, float32) y, en
+    catálogos grandes, el índice aproximado sobre ellos. Los vectores y el
+    índice los usan los perfiles de usuario (ver content_profiles.py).
+    """
+    fingerprint: str
+    vectorizer: Optional[Union[TfidfVectorizer, HashingTfidfVectorizer]]
+    neighbors: ContentNeighbors
+    vectors: sp.csr_matrix
+    index: Optional[IVFIndex] = None
+
+
+class ContentModelStore:
+    """
+    Artefactos del modelo de contenido en disco, un subdirectorio por huella del
+    catálogo:
+
+      - neighbors_indptr.npy / neighbors_indices.npy / neighbors_data.npy: la
+        matriz CSR de vecinos, en .npy sin comprimir para poder mapearla en memoria.
+      - vectors_indptr.npy / vectors_indices.npy / vectors_data.npy: la matriz
+        CSR de vectores de contenido, igual.
+      - index_*.npy (solo si el modelo tiene índice): los centroides (CSR) y
+        las listas del índice aproximado, para no volver a ajustar el k-means.
+      - vectorizer.npy y meta.json (IDs de juego y parámetros): el vectorizador
+        ajustado. Para TF-IDF, el IDF y el vocabulario; para hashing, las
+        frecuencias de documento por columna.
+
+    Un proceso nuevo (o una recarga) que encuentre la huella actual carga el
+    modelo con mmap en lugar de volver a ajustarlo. Se escribe en un directorio
+    temporal que se renombra al final, así que un lector nunca ve un modelo a medias.
+    Tras guardar un modelo se borran los de huellas anteriores.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, fingerprint)
+
+    def load(self, fingerprint: str) -> Optional[ContentModel]:
+        path = self._path(fingerprint)
+        if not os.path.isdir(path):
+            return None
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            names = ['neighbors_indptr', 'neighbors_indices', 'neighbors_data',
+                     'vectors_indptr', 'vectors_indices', 'vectors_data', 'vectorizer']
+            if meta['index']:
+                names += list(INDEX_ARRAYS)
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in names}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Advertencia: No se pudo cargar el modelo de contenido guardado en '{path}': {e}")
+            return None
+
+        game_ids = meta['game_ids']
+        neighbors = sp.csr_matrix(
+            (arrays['neighbors_data'], arrays['neighbors_indices'], arrays['neighbors_indptr']),
+            shape=(len(game_ids), len(game_ids)),
+            copy=False,
+        )
+        vectors = sp.csr_matrix(
+            (arrays['vectors_data'], arrays['vectors_indices'], arrays['vectors_indptr']),
+            shape=(len(game_ids), meta['n_terms']),
+            copy=False,
+        )
+        index = None
+        if meta['index']:
+            list_indptr = np.asarray(arrays['index_list_indptr'])
+            centroids = sp.csr_matrix(
+                (arrays['index_centroids_data'], arrays['index_centroids_indices'], arrays['index_centroids_indptr']),
+                shape=(len(list_indptr) - 1, meta['n_terms']),
+            )
+            index = IVFIndex(vectors, centroids, list_indptr, np.asarray(arrays['index_list_items']))
+        vectorizer = None
+        vectorizer_meta = meta['vectorizer']
+        if vectorizer_meta['kind'] == 'tfidf':
+            vectorizer = TfidfVectorizer(vocabulary=vectorizer_meta['vocabulary'])
+            vectorizer.idf_ = np.asarray(arrays['vectorizer'])
+        elif vectorizer_meta['kind'] == 'hashing':
+            vectorizer = HashingTfidfVectorizer(
+                vectorizer_meta['n_features'],
+                np.asarray(arrays['vectorizer']),
+                vectorizer_meta['n_documents'],
+                sublinear_tf=vectorizer_meta['sublinear_tf'],
+                max_df=vectorizer_meta['max_df'],
+            )
+        return ContentModel(fingerprint, vectorizer, ContentNeighbors(game_ids, neighbors), vectors, index)
+
+    def _prune(self, keep: str) -> None:
+        """
+        Borra los modelos guardados con otra huella. Los directorios temporales
+        (con punto al inicio) son de guardados en curso y no se tocan; un proceso
+        que todavía tenga mapeado un modelo borrado lo sigue leyendo sin problema.
+        """
+        for name in os.listdir(self.directory):
+            path = self._path(name)
+            if name != keep and not name.startswith('.') and os.path.isfile(os.path.join(path, 'meta.json')):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def save(self, model: ContentModel) -> None:
+        path = self._path(model.fingerprint)
+        if os.path.isdir(path):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=f".{model.fingerprint}.", dir=self.directory)
+        try:
+            neighbors = model.neighbors.neighbors
+            np.save(os.path.join(tmp_path, 'neighbors_indptr.npy'), neighbors.indptr)
+            np.save(os.path.join(tmp_path, 'neighbors_indices.npy'), neighbors.indices)
+            np.save(os.path.join(tmp_path, 'neighbors_data.npy'), neighbors.data)
+            np.save(os.path.join(tmp_path, 'vectors_indptr.npy'), model.vectors.indptr)
+            np.save(os.path.join(tmp_path, 'vectors_indices.npy'), model.vectors.indices)
+            np.save(os.path.join(tmp_path, 'vectors_data.npy'), model.vectors.data)
+            if model.index is not None:
+                index_arrays = (model.index.centroids.indptr, model.index.centroids.indices, model.index.centroids.data,
+                                model.index.list_indptr, model.index.list_items)
+                for name, array in zip(INDEX_ARRAYS, index_arrays):
+                    np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+            vectorizer_meta = {'kind': None}
+            vectorizer_array = np.empty(0, dtype=np.float64)
+            if isinstance(model.vectorizer, HashingTfidfVectorizer):
+                vectorizer_meta = {
+                    'kind': 'hashing',
+                    'n_features': model.vectorizer.n_features,
+                    'n_documents': model.vectorizer.n_documents,
+                    'sublinear_tf': model.vectorizer.sublinear_tf,
+                    'max_df': model.vectorizer.max_df,
+                }
+                vectorizer_array = model.vectorizer.document_frequency
+            elif model.vectorizer is not None:
+                vectorizer_meta = {
+                    'kind': 'tfidf',
+                    'vocabulary': {term: int(index) for term, index in model.vectorizer.vocabulary_.items()},
+                }
+                vectorizer_array = model.vectorizer.idf_
+            np.save(os.path.join(tmp_path, 'vectorizer.npy'), vectorizer_array)
+            with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({'format': STORE_FORMAT, 'game_ids': model.neighbors.game_ids, 'n_terms': model.vectors.shape[1],
+                           'index': model.index is not None, 'vectorizer': vectorizer_meta}, f, ensure_ascii=False)
+            os.rename(tmp_path, path)
+            self._prune(keep=model.fingerprint)
+        except OSError as e:
+            # Otro proceso pudo haber guardado la misma huella al mismo tiempo.
+            if not os.path.isdir(path):
+                print(f"Advertencia: No se pudo guardar el modelo de contenido en '{path}': {e}")
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
@@ -0,0 +1,138 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from content_ann import DEFAULT_N_PROBE, IVFIndex
+
+DEFAULT_TOP_K = 100
+DEFAULT_BLOCK_SIZE = 256
+
+
+class ContentNeighbors:
+    """
+    Los K vecinos más similares de cada juego por contenido, en lugar de la
+    matriz densa N×N de similitud coseno.
+
+    `neighbors` es una matriz CSR juegos × juegos: la fila de un juego guarda
+    los índices (int32) de sus vecinos y la similitud (float32) con cada uno.
+    No incluye al propio juego ni similitudes 0.
+    Los índices siguen el orden de `game_ids` (el orden de datos_juegos.json).
+    """
+
+    def __init__(self, game_ids: List[str], neighbors: sp.csr_matrix):
+        self.game_ids = game_ids
+        self.game_code_of = {game_id: code for code, game_id in enumerate(game_ids)}
+        self.neighbors = neighbors
+
+    @classmethod
+    def from_vectors(cls, game_ids: List[str], vectors: sp.csr_matrix, top_k: int = DEFAULT_TOP_K,
+                     block_size: int = DEFAULT_BLOCK_SIZE) -> 'ContentNeighbors':
+        """
+        Calcula los vecinos a partir de vectores con norma L2 unitaria (la salida
+        de TfidfVectorizer), donde el coseno es el producto punto. Se procesa por
+        bloques de `block_size` filas: en memoria solo existe un bloque
+        block_size × N de similitudes a la vez.
+        """
+        vectors = sp.csr_matrix(vectors, dtype=np.float64)
+        vectors_t = vectors.T.tocsc()
+        n_games = vectors.shape[0]
+        k = max(0, min(top_k, n_games - 1))
+
+        indptr = np.zeros(n_games + 1, dtype=np.int64)
+        indices_blocks: List[np.ndarray] = []
+        data_blocks: List[np.ndarray] = []
+        for start in range(0, n_games, block_size):
+            stop = min(start + block_size, n_games)
+            similarity = (vectors[start:stop] @ vectors_t).toarray()
+            rows = np.arange(stop - start)
+            similarity[rows, rows + start] = 0.0  # sin el propio juego
+
+            if k:
+                top = np.sort(np.argpartition(-similarity, k - 1, axis=1)[:, :k], axis=1)
+            else:
+                top = np.empty((stop - start, 0), dtype=np.int64)
+            top_similarity = np.take_along_axis(similarity, top, axis=1)
+
+            keep = top_similarity > 0
+            indices_blocks.append(top[keep].astype(np.int32))
+            data_blocks.append(top_similarity[keep].astype(np.float32))
+            indptr[start + 1:stop + 1] = indptr[start] + np.cumsum(keep.sum(axis=1))
+
+        indices = np.concatenate(indices_blocks) if indices_blocks else np.empty(0, dtype=np.int32)
+        data = np.concatenate(data_blocks) if data_blocks else np.empty(0, dtype=np.float32)
+        neighbors = sp.csr_matrix((data, indices, indptr), shape=(n_games, n_games))
+        return cls(game_ids, neighbors)
+
+    @classmethod
+    def from_index(cls, game_ids: List[str], index: IVFIndex, top_k: int = DEFAULT_TOP_K,
+                   n_probe: int = DEFAULT_N_PROBE) -> 'ContentNeighbors':
+        """
+        Igual que `from_vectors`, pero cada juego se compara solo con los juegos
+        de las listas cercanas de un índice aproximado (ver content_ann.py) en
+        lugar de con todo el catálogo: para catálogos grandes, donde el cálculo
+        exacto es cuadrático.
+        """
+        n_games = len(game_ids)
+        k = max(0, min(top_k, n_games - 1))
+        neighbor_codes = np.zeros((n_games, k), dtype=np.int32)
+        similarities = np.zeros((n_games, k), dtype=np.float32)
+        for codes, block_neighbors, block_similarities in index.neighbor_blocks(k, n_probe):
+            found = block_neighbors.shape[1]
+            neighbor_codes[codes, :found] = block_neighbors
+            similarities[codes, :found] = block_similarities
+
+        order = np.argsort(neighbor_codes, axis=1)
+        neighbor_codes = np.take_along_axis(neighbor_codes, order, axis=1)
+        similarities = np.take_along_axis(similarities, order, axis=1)
+        keep = similarities > 0
+        indptr = np.concatenate(([0], np.cumsum(keep.sum(axis=1)))).astype(np.int64)
+        neighbors = sp.csr_matrix((similarities[keep], neighbor_codes[keep], indptr), shape=(n_games, n_games))
+        return cls(game_ids, neighbors)
+
+    @property
+    def n_games(self) -> int:
+        return len(self.game_ids)
+
+    def neighbors_of(self, game_id: str):
+        """(índices de los vecinos, similitudes) de un juego; vacíos si no tiene contenido."""
+        code = self.game_code_of.get(game_id)
+        if code is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        start, stop = self.neighbors.indptr[code], self.neighbors.indptr[code + 1]
+        return self.neighbors.indices[start:stop], self.neighbors.data[start:stop]
+
+    def score(self, liked_codes: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Para cada juego del catálogo: (suma de similitudes con los juegos gustados
+        ponderadas por `weights`, suma de similitudes). Son dos productos
+        vector × matriz dispersa sobre las filas de vecinos de los juegos gustados.
+        """
+        rows = self.neighbors[np.asarray(liked_codes, dtype=np.int64)]
+        weighted_sums = np.asarray(rows.T @ np.asarray(weights, dtype=np.float64)).ravel()
+        sim_sums = np.asarray(rows.sum(axis=0), dtype=np.float64).ravel()
+        return weighted_sums, sim_sums
+
+    def recommend(self, liked_codes: np.ndarray, weights: np.ndarray, exclude_codes: Iterable[int],
+                  top_n: int) -> List[Tuple[int, float]]:
+        """
+        Los `top_n` juegos con mayor promedio ponderado (suma ponderada / suma de
+        similitudes), sin los de `exclude_codes` ni los que no tienen similitud
+        con ningún juego gustado. A igual puntuación, en el orden del catálogo.
+        """
+        weighted_sums, sim_sums = self.score(liked_codes, weights)
+        candidate_mask = sim_sums > 0
+        candidate_mask[np.fromiter(exclude_codes, dtype=np.int64)] = False
+        candidates = np.flatnonzero(candidate_mask)
+        if candidates.size == 0 or top_n <= 0:
+            return []
+        scores = weighted_sums[candidates] / sim_sums[candidates]
+
+        if candidates.size > top_n:
+            # argpartition da los top_n en orden arbitrario; se conservan todos los empatados
+            # con el último para desempatar por catálogo igual que un ordenamiento completo.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(int(code), float(score)) for code, score in zip(candidates[order], scores[order])]
@@ -0,0 +1,197 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from content_ann import DEFAULT_N_PROBE, IVFIndex
+
+# Los términos de un perfil que quedan en |valor| menor a esto (al quitar un juego) se eliminan.
+ZERO_TOLERANCE = 1e-9
+
+
+def content_weight(interaction: Dict) -> float:
+    """
+    Peso de un juego en el perfil de contenido, con el criterio de
+    recomendar_juegos_tfidf: si le gustó (calificación >= 4 o like), su
+    calificación, o 5 si solo tiene like; si no, 0 (no entra en el perfil).
+    """
+    try:
+        calificacion = float(interaction.get('calificacion') or 0)
+    except (TypeError, ValueError):
+        calificacion = 0.0
+    if calificacion >= 4.0 or interaction.get('like', False):
+        return calificacion if calificacion > 0 else 5.0
+    return 0.0
+
+
+def _merge(indices: np.ndarray, data: np.ndarray, other_indices: np.ndarray, other_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Suma de dos vectores dispersos (índices, valores); sin los términos que quedan en ~0."""
+    merged, inverse = np.unique(np.concatenate([indices, other_indices]), return_inverse=True)
+    values = np.bincount(inverse, weights=np.concatenate([data, other_data]), minlength=len(merged))
+    keep = np.abs(values) > ZERO_TOLERANCE
+    return merged[keep].astype(np.int32), values[keep]
+
+
+class ContentProfiles:
+    """
+    Perfil de contenido de cada usuario: la suma de los vectores de contenido
+    (TF-IDF o hashing, ver content_model_store.ContentModel) de los juegos que
+    le gustan, ponderados por `content_weight`.
+
+    Los pesos por juego se mantienen al día evento por evento, igual que
+    `LikedPairCounts`: se construyen una vez por carga de interacciones.json y
+    `update()` aplica la interacción resultante de cada /responder_juego. Los
+    vectores de los juegos llegan con `attach()` cuando hay un modelo de
+    contenido; desde entonces cada evento suma al perfil solo la diferencia
+    (nuevo peso - anterior) por el vector del juego, en O(nnz del juego), en
+    lugar de recorrer otra vez todas las interacciones del usuario.
+
+    La consulta compara el perfil con el catálogo sin densificarlo: con el
+    índice aproximado del modelo (catálogos grandes, ver content_ann.py) solo
+    contra los juegos de las listas cercanas; sin él, solo contra los juegos
+    que comparten algún término con el perfil.
+
+    Si un usuario repite un juego cuenta su primera interacción, como en
+    `UserInteractionIndex`. Las llaves de juego son el id_juego como cadena.
+    Lecturas y escrituras usan el candado propio de la clase.
+    """
+
+    def __init__(self, interacciones_data: Dict):
+        self._lock = threading.Lock()
+        self._weights: Dict[Any, Dict[str, float]] = {}
+        self._attached_key: Optional[str] = None
+        self._game_ids: List[str] = []
+        self._game_code_of: Dict[str, int] = {}
+        self._vectors = sp.csr_matrix((0, 0), dtype=np.float32)
+        self._vectors_t: Optional[sp.csr_matrix] = None
+        self._index: Optional[IVFIndex] = None
+        self._n_probe = DEFAULT_N_PROBE
+        self._profiles: Dict[Any, Tuple[np.ndarray, np.ndarray]] = {}
+
+        for user_entry in interacciones_data.get('interacciones', []):
+            user_id = user_entry.get('id')
+            if user_id is None or user_id in self._weights:
+                continue
+            weights: Dict[str, float] = {}
+            for interaction in user_entry.get('interacciones', []):
+                weights.setdefault(str(interaction.get('id_juego')), content_weight(interaction))
+            self._weights[user_id] = {game_id: weight for game_id, weight in weights.items() if weight > 0}
+
+    def attach(self, key: str, game_ids: List[str], vectors: sp.csr_matrix, index: Optional[IVFIndex] = None,
+               n_probe: int = DEFAULT_N_PROBE) -> None:
+        """
+        Usa los vectores de contenido de `game_ids` (filas de `vectors`, con
+        norma L2 unitaria) y calcula todos los perfiles con un solo producto
+        disperso usuarios × juegos por juegos × términos. Con `index`, las
+        consultas revisan `n_probe` listas del índice. `key` identifica el
+        modelo (su huella): si ya está puesto, no hace nada.
+        """
+        with self._lock:
+            if key == self._attached_key:
+                return
+            game_code_of = {game_id: code for code, game_id in enumerate(game_ids)}
+            user_ids = list(self._weights)
+            rows, columns, values = [], [], []
+            for row, user_id in enumerate(user_ids):
+                for game_id, weight in self._weights[user_id].items():
+                    game_code = game_code_of.get(game_id)
+                    if game_code is not None:
+                        rows.append(row)
+                        columns.append(game_code)
+                        values.append(weight)
+            user_weights = sp.csr_matrix((values, (rows, columns)), shape=(len(user_ids), len(game_ids)), dtype=np.float64)
+            profiles = sp.csr_matrix(user_weights @ vectors)
+
+            self._profiles = {}
+            for row, user_id in enumerate(user_ids):
+                start, stop = profiles.indptr[row], profiles.indptr[row + 1]
+                if stop > start:
+                    self._profiles[user_id] = (profiles.indices[start:stop].astype(np.int32), profiles.data[start:stop].copy())
+            self._attached_key = key
+            self._game_ids = game_ids
+            self._game_code_of = game_code_of
+            self._vectors = vectors
+            # Sin índice: términos × juegos, para recorrer solo los juegos de los términos del perfil.
+            self._vectors_t = sp.csr_matrix(vectors.T) if index is None else None
+            self._index = index
+            self._n_probe = n_probe
+
+    def update(self, user_id, nueva: Dict) -> None:
+        """Aplica la interacción resultante de un evento (la que devuelve `UserInteractionIndex.apply`)."""
+        game_id = str(nueva.get('id_juego'))
+        with self._lock:
+            weights = self._weights.setdefault(user_id, {})
+            old_weight = weights.get(game_id, 0.0)
+            new_weight = content_weight(nueva)
+            if new_weight == old_weight:
+                return
+            if new_weight > 0:
+                weights[game_id] = new_weight
+            else:
+                weights.pop(game_id, None)
+
+            game_code = self._game_code_of.get(game_id)
+            if game_code is None:
+                return
+            start, stop = self._vectors.indptr[game_code], self._vectors.indptr[game_code + 1]
+            indices, data = self._profiles.get(user_id, (np.empty(0, dtype=np.int32), np.empty(0)))
+            indices, data = _merge(indices, data, self._vectors.indices[start:stop],
+                                   (new_weight - old_weight) * self._vectors.data[start:stop].astype(np.float64))
+            if not weights or indices.size == 0:
+                self._profiles.pop(user_id, None)
+            else:
+                self._profiles[user_id] = (indices, data)
+
+    @property
+    def n_games(self) -> int:
+        return len(self._game_ids)
+
+    def profile(self, user_id) -> Optional[sp.csr_matrix]:
+        """Perfil del usuario como vector 1 × términos (None si no le gusta ningún juego del catálogo)."""
+        with self._lock:
+            stored = self._profiles.get(user_id)
+            n_terms = self._vectors.shape[1]
+        if stored is None:
+            return None
+        indices, data = stored
+        return sp.csr_matrix((data, indices, [0, len(indices)]), shape=(1, n_terms))
+
+    def recommend(self, user_id, exclude_game_ids: Iterable[str], top_n: int) -> List[Tuple[str, float]]:
+        """
+        Los `top_n` juegos del catálogo con mayor similitud coseno con el perfil
+        del usuario, sin los de `exclude_game_ids` ni los de similitud 0. La
+        consulta es el perfil disperso: con índice, una búsqueda aproximada
+        (`IVFIndex.search`); sin él, un producto perfil × (términos × juegos)
+        que solo toca los juegos con algún término del perfil. A igual
+        puntuación, en el orden del catálogo.
+        """
+        with self._lock:
+            stored = self._profiles.get(user_id)
+            n_terms, vectors_t, index, n_probe = self._vectors.shape[1], self._vectors_t, self._index, self._n_probe
+            game_ids, game_code_of = self._game_ids, self._game_code_of
+        if stored is None or top_n <= 0:
+            return []
+        indices, data = stored
+        query = sp.csr_matrix((data / np.linalg.norm(data), indices, [0, len(indices)]), shape=(1, n_terms))
+        excluded = np.array([game_code_of[game_id] for game_id in exclude_game_ids if game_id in game_code_of],
+                            dtype=np.int64)
+
+        if index is not None:
+            candidates, scores = index.search(query, top_n, n_probe, exclude=excluded)
+            keep = scores > 0
+            return [(game_ids[code], float(score)) for code, score in zip(candidates[keep], scores[keep])]
+
+        similarities = sp.csr_matrix(query @ vectors_t)
+        candidates, scores = similarities.indices, similarities.data
+        keep = (scores > 0) & ~np.isin(candidates, excluded)
+        candidates, scores = candidates[keep], scores[keep]
+        if candidates.size == 0:
+            return []
+        if candidates.size > top_n:
+            # Se conservan los empatados con el último para desempatar por catálogo.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(game_ids[code], float(score)) for code, score in zip(candidates[order], scores[order])]
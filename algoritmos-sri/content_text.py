@@ -0,0 +1,129 @@
+import html
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+DEFAULT_N_FEATURES = 2 ** 20
+DEFAULT_CHUNK_SIZE = 1000
+
+_HTML_TAG = re.compile(r'<[^>]+>')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def strip_html(text: Optional[str]) -> str:
+    """Texto plano de una descripción de Steam (sin etiquetas HTML ni entidades)."""
+    if not text:
+        return ''
+    return _WHITESPACE.sub(' ', html.unescape(_HTML_TAG.sub(' ', text))).strip()
+
+
+def tag_words(details: Dict) -> List[str]:
+    """Categorías y etiquetas del juego normalizadas como palabras (minúsculas, espacios → '_')."""
+    content_words = []
+    if 'categorias' in details and details['categorias']:
+        content_words.extend([cat.lower().replace(' ', '_') for cat in details['categorias']])
+    if 'tags' in details and details['tags']:
+        content_words.extend([tag['description'].lower().replace(' ', '_') for tag in details['tags']])
+    return content_words
+
+
+def text_document(details: Dict) -> str:
+    """Categorías/etiquetas más las descripciones corta y larga sin HTML."""
+    parts = [" ".join(tag_words(details)), strip_html(details.get('descripcion_corta')), strip_html(details.get('descripcion_larga'))]
+    return " ".join(part for part in parts if part)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF sin vocabulario: los términos se asignan a `n_features` columnas con
+    una función hash (HashingVectorizer), así que no hay nada que ajustar salvo
+    la frecuencia de documento de cada columna, que se acumula por partes.
+
+    Permite vectorizar el catálogo en bloques de `chunk_size` documentos con
+    memoria acotada (no existe un diccionario de términos) y agregar juegos
+    nuevos con `partial_fit` sin reajustar nada. El IDF usa la misma fórmula
+    suavizada que TfidfVectorizer y los vectores salen con norma L2 unitaria.
+
+    Como las descripciones son largas y en español (sin lista de stop words),
+    por omisión el TF es sublineal (1 + log tf) y se ignoran los términos que
+    aparecen en más de `max_df` de los documentos, como en TfidfVectorizer.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, document_frequency: Optional[np.ndarray] = None,
+                 n_documents: int = 0, sublinear_tf: bool = True, max_df: float = 0.5):
+        self.n_features = n_features
+        self.sublinear_tf = sublinear_tf
+        self.max_df = max_df
+        self.document_frequency = (
+            np.zeros(n_features, dtype=np.int64) if document_frequency is None else document_frequency
+        )
+        self.n_documents = n_documents
+        self._hasher = HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None, dtype=np.float32)
+
+    def term_counts(self, documents: List[str]) -> sp.csr_matrix:
+        """Conteos de términos (documentos × columnas hash)."""
+        return self._hasher.transform(documents)
+
+    def partial_fit(self, term_counts: sp.csr_matrix) -> 'HashingTfidfVectorizer':
+        """Suma las frecuencias de documento de un bloque de conteos."""
+        counts = sp.csr_matrix(term_counts)
+        counts.sum_duplicates()
+        self.document_frequency = self.document_frequency + np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        return self
+
+    @property
+    def idf_(self) -> np.ndarray:
+        """IDF por columna; 0 para los términos demasiado frecuentes (más de `max_df`)."""
+        idf = np.log((1 + self.n_documents) / (1 + self.document_frequency)) + 1
+        idf[self.document_frequency > self.max_df * self.n_documents] = 0.0
+        return idf
+
+    def weight(self, term_counts: sp.csr_matrix) -> sp.csr_matrix:
+        """Conteos → TF-IDF normalizado con las frecuencias de documento actuales."""
+        weighted = sp.csr_matrix(term_counts, dtype=np.float64)
+        if self.sublinear_tf:
+            weighted.data = 1 + np.log(weighted.data)
+        weighted.data *= self.idf_[weighted.indices]
+        weighted.eliminate_zeros()
+        return normalize(weighted)
+
+    def transform(self, documents: List[str]) -> sp.csr_matrix:
+        return self.weight(self.term_counts(documents))
+
+    def fit_transform_stream(self, documents: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> sp.csr_matrix:
+        """
+        Vectoriza `documents` (cualquier iterable, p. ej. un generador) de
+        `chunk_size` en `chunk_size`: solo el texto de un bloque está en memoria
+        a la vez; de lo anterior se conservan los conteos dispersos.
+        """
+        blocks = []
+        for chunk in _chunks(documents, chunk_size):
+            counts = self.term_counts(chunk)
+            self.partial_fit(counts)
+            blocks.append(counts)
+        if not blocks:
+            return sp.csr_matrix((0, self.n_features), dtype=np.float64)
+        return self.weight(sp.vstack(blocks, format='csr'))
+
+
+def catalog_text_documents(datos_juegos_data: Dict) -> Iterator[Tuple[str, str]]:
+    """(id de juego, documento de texto) de los juegos con algo de contenido, en orden del catálogo."""
+    for game_id, details in datos_juegos_data.items():
+        document = text_document(details)
+        if document:
+            yield str(game_id), document
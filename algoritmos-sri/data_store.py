@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from content_profiles import ContentProfiles
+from interaction_index import GameInteractionCounters, LikedPairCounts, UserInteractionIndex
+from interaction_log import InteractionLog
+from user_cf import UserNeighborhoods
+
+
+class DataSnapshot(NamedTuple):
+    """
+    Vista de los tres archivos base cargados en memoria. Juegos y usuarios no
+    cambian dentro de una versión; las interacciones (con su índice por usuario,
+    sus contadores por juego, los conteos de pares gustados, los perfiles de
+    contenido y los vecindarios de usuarios) reciben in situ los eventos
+    registrados con `DataStore.record_interaction()`.
+    """
+    interacciones: Dict
+    juegos: Dict
+    usuarios: Dict
+    interacciones_por_usuario: UserInteractionIndex
+    estadisticas_por_juego: GameInteractionCounters
+    coocurrencias: LikedPairCounts
+    perfiles_contenido: ContentProfiles
+    vecindarios_usuarios: UserNeighborhoods
+    version: int
+
+
+class DataStore:
+    """
+    Almacén de datos compartido por todo el proceso.
+
+    Carga interacciones, juegos y usuarios una sola vez y solo vuelve a leer
+    los archivos cuando cambia su firma (mtime + tamaño). La recarga construye
+    un snapshot nuevo completo y lo publica de una sola vez, así que una
+    solicitud nunca ve una mezcla de datos viejos y nuevos.
+
+    Si se configura una InteractionLog, las interacciones en memoria son el
+    snapshot de interacciones.json más los eventos de la bitácora, y las
+    escrituras de /responder_juego pasan por `record_interaction()`.
+
+    Los datos devueltos se comparten entre solicitudes: los endpoints deben
+    tratarlos como de solo lectura (copiar antes de modificar).
+    """
+
+    def __init__(self, interacciones_path: str, juegos_path: str, usuarios_path: str,
+                 interaction_log: Optional[InteractionLog] = None):
+        self.interacciones_path = interacciones_path
+        self.juegos_path = juegos_path
+        self.usuarios_path = usuarios_path
+        self.interaction_log = interaction_log
+        self._lock = threading.RLock()
+        self._snapshot: Optional[DataSnapshot] = None
+        self._signature: Optional[Tuple] = None
+        self._compactor: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _file_signature(filepath: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _log_signature(self) -> Tuple:
+        if self.interaction_log is None:
+            return ()
+        return (
+            self._file_signature(self.interaction_log.compacting_path),
+            self._file_signature(self.interaction_log.log_path),
+        )
+
+    def _current_signature(self) -> Tuple:
+        return (
+            self._file_signature(self.interacciones_path),
+            self._file_signature(self.juegos_path),
+            self._file_signature(self.usuarios_path),
+        ) + self._log_signature()
+
+    @staticmethod
+    def _read_json(filepath: str) -> Dict:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    # Errores de lectura que no deben tumbar una recarga si ya hay datos en memoria.
+    _load_errors: Tuple = (OSError, json.JSONDecodeError)
+
+    def _load_sources(self) -> Tuple[Dict, Dict, Dict]:
+        """Lee interacciones (snapshot + bitácora), juegos y usuarios desde los archivos JSON."""
+        interacciones = self._read_json(self.interacciones_path)
+        juegos = self._read_json(self.juegos_path)
+        usuarios = self._read_json(self.usuarios_path)
+        if self.interaction_log is not None:
+            self.interaction_log.replay(interacciones)
+        return interacciones, juegos, usuarios
+
+    def _reload(self, signature: Tuple) -> None:
+        """Lee todas las fuentes y publica el snapshot nuevo solo si todas se cargaron bien."""
+        try:
+            interacciones, juegos, usuarios = self._load_sources()
+        except self._load_errors as e:
+            if self._snapshot is None:
+                raise
+            # Probablemente un archivo a medio escribir: se conserva el snapshot
+            # anterior y no se actualiza la firma para reintentar en la siguiente lectura.
+            print(f"Advertencia: No se pudieron recargar los datos ({e}). Se conservan los datos anteriores.")
+            return
+
+        version = self._snapshot.version + 1 if self._snapshot is not None else 1
+        self._snapshot = DataSnapshot(
+            interacciones,
+            juegos,
+            usuarios,
+            UserInteractionIndex(interacciones),
+            GameInteractionCounters(interacciones),
+            LikedPairCounts(interacciones),
+            ContentProfiles(interacciones),
+            UserNeighborhoods(interacciones),
+            version,
+        )
+        self._signature = signature
+
+    def get(self) -> DataSnapshot:
+        """Devuelve el snapshot vigente, recargando primero si algún archivo cambió en disco."""
+        signature = self._current_signature()
+        snapshot = self._snapshot
+        if snapshot is not None and signature == self._signature:
+            return snapshot
+
+        with self._lock:
+            # Se vuelve a leer la firma bajo el candado: la de arriba puede ser anterior a
+            # una escritura o compactación de este mismo proceso que ya actualizó `_signature`.
+            signature = self._current_signature()
+            if self._snapshot is None or signature != self._signature:
+                self._reload(signature)
+            return self._snapshot
+
+    # --- Persistencia de escrituras (se sobreescriben en otros backends) ---
+
+    def _persist_interaction(self, event: Dict) -> None:
+        if self.interaction_log is None:
+            raise RuntimeError("El DataStore no tiene una bitácora de interacciones configurada.")
+        self.interaction_log.append(event)
+
+    def _persist_user(self, nombre: str, edad: int, generos_favoritos: List[str], usuarios_actuales: List[Dict]) -> Dict:
+        nuevo_id = max(u['id'] for u in usuarios_actuales) + 1 if usuarios_actuales else 1
+        nuevo_usuario = {
+            'id': nuevo_id,
+            'nombre': nombre,
+            'edad': edad,
+            'generos_favoritos': generos_favoritos
+        }
+        with open(self.usuarios_path, 'w', encoding='utf-8') as f:
+            json.dump({'usuarios': usuarios_actuales + [nuevo_usuario]}, f, indent=2, ensure_ascii=False)
+        return nuevo_usuario
+
+    def _refresh_signature_after_write(self) -> None:
+        """Actualiza solo la firma de lo que escribió este proceso: lo que está en memoria ya lo refleja."""
+        self._signature = self._signature[:2] + (self._file_signature(self.usuarios_path),) + self._log_signature()
+
+    # --- Escrituras ---
+
+    def record_interaction(self, event: Dict) -> DataSnapshot:
+        """
+        Registra un evento de interacción: lo persiste (una línea en la bitácora)
+        y lo aplica sobre los datos en memoria, sin reescribir interacciones.json.
+        Devuelve el snapshot resultante (con la versión incrementada).
+        """
+        self.get()
+        with self._lock:
+            snapshot = self._snapshot
+            self._persist_interaction(event)
+            anterior, nueva = snapshot.interacciones_por_usuario.apply(event)
+            snapshot.estadisticas_por_juego.replace(anterior, nueva)
+            snapshot.coocurrencias.update(event['id_usuario'], nueva)
+            snapshot.perfiles_contenido.update(event['id_usuario'], nueva)
+            snapshot.vecindarios_usuarios.update(event['id_usuario'], nueva)
+            self._refresh_signature_after_write()
+            self._snapshot = snapshot._replace(version=snapshot.version + 1)
+            return self._snapshot
+
+    def create_user(self, nombre: str, edad: int, generos_favoritos: List[str]) -> Optional[Dict]:
+        """
+        Crea un usuario nuevo con el siguiente ID disponible.
+        Devuelve None si el nombre ya está en uso (sin distinguir mayúsculas).
+        """
+        self.get()
+        with self._lock:
+            if self.find_user_by_name(nombre) is not None:
+                return None
+            snapshot = self._snapshot
+            usuarios_actuales = snapshot.usuarios.get('usuarios', [])
+            nuevo_usuario = self._persist_user(nombre, edad, generos_favoritos, usuarios_actuales)
+            usuarios = dict(snapshot.usuarios, usuarios=usuarios_actuales + [nuevo_usuario])
+            self._refresh_signature_after_write()
+            self._snapshot = snapshot._replace(usuarios=usuarios, version=snapshot.version + 1)
+            return nuevo_usuario
+
+    # --- Consultas puntuales ---
+
+    def find_user_by_name(self, nombre: str) -> Optional[Dict]:
+        """Busca un usuario por nombre sin distinguir mayúsculas ni espacios en los extremos."""
+        nombre_normalizado = nombre.strip().lower()
+        return next(
+            (u for u in self.get().usuarios.get('usuarios', []) if u['nombre'].strip().lower() == nombre_normalizado),
+            None
+        )
+
+    def get_game(self, appid: str) -> Optional[Dict]:
+        """Devuelve los datos de un juego por su appid (como cadena) o None."""
+        return self.get().juegos.get(str(appid))
+
+    def compact_interactions(self) -> bool:
+        """Pliega la bitácora en interacciones.json sin provocar una recarga de los datos en memoria."""
+        if self.interaction_log is None:
+            return False
+
+        self.get()
+
+        def run_step(step) -> None:
+            # Cada cambio de archivos de la compactación ocurre bajo el candado junto con la
+            # firma: ningún get() ve la bitácora rotada o el snapshot nuevo con la firma vieja.
+            # El contenido no cambia (snapshot + eventos = lo mismo que ya está en memoria);
+            # si la memoria ya estaba desfasada de los archivos, se deja que get() recargue.
+            with self._lock:
+                in_sync = self._current_signature() == self._signature
+                step()
+                if in_sync:
+                    self._signature = self._current_signature()
+
+        return self.interaction_log.compact(run_step)
+
+    def _compact_periodically(self, interval: float, max_pending_bytes: int) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                if self.interaction_log.pending_bytes() >= max_pending_bytes:
+                    self.compact_interactions()
+            except Exception as e:
+                print(f"Error al compactar la bitácora de interacciones: {e}")
+
+    def start_compactor(self, interval: float = 30.0, max_pending_bytes: int = 256 * 1024) -> None:
+        """Arranca un hilo que compacta la bitácora cuando los eventos pendientes superan `max_pending_bytes`."""
+        if self.interaction_log is None or self._compactor is not None:
+            return
+        self._compactor = threading.Thread(
+            target=self._compact_periodically,
+            args=(interval, max_pending_bytes),
+            name='interaction-log-compactor',
+            daemon=True,
+        )
+        self._compactor.start()
+
+    @property
+    def version(self) -> int:
+        """Versión del snapshot actual (0 si todavía no se ha cargado nada)."""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
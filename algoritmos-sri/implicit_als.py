@@ -0,0 +1,209 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from interaction_matrix import InteractionMatrix, as_float64
+
+DEFAULT_FACTORS = 32
+DEFAULT_ITERATIONS = 10
+DEFAULT_REGULARIZATION = 0.1
+DEFAULT_ALPHA = 10.0
+# Pasos de gradiente conjugado por vector en cada iteración (partiendo del valor anterior).
+DEFAULT_CG_STEPS = 3
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_BLOCK_SIZE_TOP = 1024
+
+# Evidencia de cada señal (ver `implicit_feedback`).
+LIKE_WEIGHT = 1.0
+# Calificación neutra: por encima suma evidencia positiva y por debajo negativa.
+NEUTRAL_RATING = 2.5
+RATING_WEIGHT = 1.0 / 2.5
+HOURS_WEIGHT = 0.25
+
+
+def implicit_feedback(matrix: InteractionMatrix, alpha: float = DEFAULT_ALPHA) -> sp.csr_matrix:
+    """
+    Preferencia y confianza (Hu, Koren y Volinsky) de cada par usuario-juego a
+    partir de todas las señales de una interacción, no solo la calificación:
+
+        e = LIKE_WEIGHT * like + RATING_WEIGHT * (calificación - 2.5) + HOURS_WEIGHT * log(1 + horas)
+
+    con like = 1, -1 (dislike) o 0. Las interacciones repetidas de un par se
+    suman. La preferencia es 1 si e > 0 y 0 si e < 0 (un dislike o una mala
+    calificación son evidencia de que no le gusta); la confianza es
+    1 + alpha * |e|. Los pares con e = 0 se descartan (igual que sin interacción).
+
+    Devuelve una matriz usuarios × juegos (CSR, float32) con alpha * e en cada
+    par: el signo es la preferencia y el valor absoluto, la confianza menos 1.
+    """
+    ratings = as_float64(matrix.ratings)
+    hours = as_float64(matrix.hours)
+    evidence = LIKE_WEIGHT * matrix.likes.astype(np.float64)
+    evidence += np.where(np.isnan(ratings), 0.0, RATING_WEIGHT * (ratings - NEUTRAL_RATING))
+    evidence += np.where(np.isnan(hours) | (hours <= 0), 0.0, HOURS_WEIGHT * np.log1p(np.maximum(hours, 0.0)))
+
+    valid = np.array([user_id is not None for user_id in matrix.user_ids], dtype=bool)[matrix.user_codes]
+    summed = matrix.to_csr(evidence, valid)
+    summed.sum_duplicates()
+    summed.eliminate_zeros()
+    summed.data = (alpha * summed.data).astype(np.float32)
+    return summed
+
+
+def _conjugate_gradient(factors: np.ndarray, other: np.ndarray, gram: np.ndarray, feedback: sp.csr_matrix,
+                        regularization: float, cg_steps: int) -> np.ndarray:
+    """
+    Unos pasos de gradiente conjugado, a la vez para todas las filas del bloque, sobre
+
+        (YtY + Yt (C_u - I) Y + reg I) x_u = Yt C_u p_u
+
+    partiendo de `factors` (el valor de la iteración anterior). Y es `other`;
+    `feedback` son las filas del bloque en la matriz de `implicit_feedback`.
+    YtY se calcula una vez por iteración (`gram`) y el resto solo recorre los
+    pares con interacción: cada paso cuesta O(nnz × factores).
+    """
+    rows = np.repeat(np.arange(feedback.shape[0]), np.diff(feedback.indptr))
+    columns = feedback.indices
+    confidence = np.abs(feedback.data)
+    other_nonzero = other[columns]
+
+    def apply(vectors: np.ndarray) -> np.ndarray:
+        weights = confidence * np.einsum('ij,ij->i', vectors[rows], other_nonzero)
+        product = sp.csr_matrix((weights, columns, feedback.indptr), shape=feedback.shape) @ other
+        return vectors @ gram + regularization * vectors + product
+
+    # Yt C_u p_u: solo los pares con preferencia 1, con su confianza completa.
+    target = sp.csr_matrix((np.where(feedback.data > 0, confidence + 1, 0).astype(np.float32), columns, feedback.indptr),
+                           shape=feedback.shape) @ other
+    x = factors.copy()
+    residual = target - apply(x)
+    direction = residual.copy()
+    residual_norm = np.einsum('ij,ij->i', residual, residual)
+    for _ in range(cg_steps):
+        applied = apply(direction)
+        curvature = np.einsum('ij,ij->i', direction, applied)
+        step = np.divide(residual_norm, curvature, out=np.zeros_like(residual_norm), where=curvature > 0)
+        x += step[:, None] * direction
+        residual -= step[:, None] * applied
+        new_norm = np.einsum('ij,ij->i', residual, residual)
+        beta = np.divide(new_norm, residual_norm, out=np.zeros_like(new_norm), where=residual_norm > 0)
+        direction = residual + beta[:, None] * direction
+        residual_norm = new_norm
+    return x
+
+
+class ImplicitALS:
+    """
+    Filtrado colaborativo con retroalimentación implícita (ALS de Hu, Koren y
+    Volinsky): usa likes, dislikes, calificaciones y horas jugadas, no solo
+    las calificaciones como los modelos de Surprise.
+
+    Factoriza la matriz de preferencias (ver `implicit_feedback`) en factores de
+    usuario X y de juego Y, ponderando cada par por su confianza. Cada iteración
+    alterna usuarios y juegos; cada vector se actualiza con unos pasos de
+    gradiente conjugado en lugar de invertir una matriz por usuario, así que
+    tiempo y memoria crecen linealmente con las interacciones. Las filas se
+    reparten en bloques entre los hilos de `workers` (NumPy y SciPy sueltan el
+    GIL en los productos).
+
+    La puntuación de un juego para un usuario es X[u] @ Y[i]; se recomiendan
+    los juegos sin interacción del usuario con mayor puntuación. Los usuarios
+    sin ninguna evidencia distinta de 0 no tienen factores entrenados y se
+    tratan como desconocidos.
+    """
+
+    def __init__(self, user_ids: List, item_ids: List[str], user_factors: np.ndarray, item_factors: np.ndarray,
+                 interacted: sp.csr_matrix, trained: Optional[np.ndarray] = None):
+        self.user_ids = user_ids
+        if trained is None:
+            trained = np.ones(len(user_ids), dtype=bool)
+        self.user_code_of = {user_id: code for code, user_id in enumerate(user_ids) if trained[code]}
+        self.item_ids = item_ids
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        # Usuarios × juegos; 1 donde el usuario ya interactuó con el juego (aunque su evidencia sume 0).
+        self.interacted = interacted
+
+    @classmethod
+    def fit(cls, matrix: InteractionMatrix, factors: int = DEFAULT_FACTORS, iterations: int = DEFAULT_ITERATIONS,
+            regularization: float = DEFAULT_REGULARIZATION, alpha: float = DEFAULT_ALPHA,
+            cg_steps: int = DEFAULT_CG_STEPS, workers: Optional[int] = None,
+            block_size: int = DEFAULT_BLOCK_SIZE, seed: int = 0) -> 'ImplicitALS':
+        feedback = implicit_feedback(matrix, alpha)
+        feedback_t = sp.csr_matrix(feedback.T)
+
+        rng = np.random.default_rng(seed)
+        user_factors = (rng.standard_normal((matrix.n_users, factors)) * 0.01).astype(np.float32)
+        item_factors = (rng.standard_normal((matrix.n_games, factors)) * 0.01).astype(np.float32)
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            for _ in range(iterations):
+                cls._solve(pool, user_factors, item_factors, feedback, regularization, cg_steps, block_size)
+                cls._solve(pool, item_factors, user_factors, feedback_t, regularization, cg_steps, block_size)
+
+        interacted = sp.csr_matrix(
+            (np.ones(matrix.nnz, dtype=np.bool_), (matrix.user_codes, matrix.game_codes)),
+            shape=(matrix.n_users, matrix.n_games)
+        )
+        trained = np.diff(feedback.indptr) > 0
+        return cls(list(matrix.user_ids), list(matrix.game_ids), user_factors, item_factors, interacted, trained)
+
+    @staticmethod
+    def _solve(pool: ThreadPoolExecutor, factors: np.ndarray, other: np.ndarray, feedback: sp.csr_matrix,
+               regularization: float, cg_steps: int, block_size: int) -> None:
+        """Actualiza `factors` en su lugar, un bloque de filas por tarea del pool."""
+        gram = other.T @ other
+
+        def solve_block(start: int) -> None:
+            stop = min(start + block_size, factors.shape[0])
+            factors[start:stop] = _conjugate_gradient(
+                factors[start:stop], other, gram, feedback[start:stop], regularization, cg_steps
+            )
+
+        list(pool.map(solve_block, range(0, factors.shape[0], block_size)))
+
+    def scores(self, user_codes: np.ndarray) -> np.ndarray:
+        """Puntuación de cada juego para cada usuario de `user_codes` (usuarios × juegos); los ya vistos en -inf."""
+        user_codes = np.asarray(user_codes, dtype=np.int64)
+        estimates = (self.user_factors[user_codes] @ self.item_factors.T).astype(np.float64)
+        estimates[self.interacted[user_codes].nonzero()] = -np.inf
+        return estimates
+
+    def _top(self, scores: np.ndarray, top_n: int) -> List[Tuple[str, float]]:
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if candidates.size == 0 or top_n <= 0:
+            return []
+        scores = scores[candidates]
+        if candidates.size > top_n:
+            # Se conservan los empatados con el último y se desempata por índice de juego.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(self.item_ids[code], float(score)) for code, score in zip(candidates[order], scores[order])]
+
+    def recommend(self, user_id, top_n: int) -> Optional[List[Tuple[str, float]]]:
+        """
+        Los `top_n` juegos sin interacción con mayor puntuación para el usuario:
+        [(id de juego, puntuación)]. None si el usuario no tiene interacciones
+        (o ninguna con evidencia distinta de 0).
+        """
+        code = self.user_code_of.get(user_id)
+        if code is None:
+            return None
+        return self._top(self.scores(np.array([code]))[0], top_n)
+
+    def recommend_batch(self, user_ids: Iterable, top_n: int,
+                        block_size: int = DEFAULT_BLOCK_SIZE_TOP) -> Dict[object, List[Tuple[str, float]]]:
+        """`recommend` para muchos usuarios, por bloques de `block_size` usuarios con un producto de matrices cada uno."""
+        known = [(user_id, self.user_code_of[user_id]) for user_id in user_ids if user_id in self.user_code_of]
+        recommendations = {}
+        for start in range(0, len(known), block_size):
+            block = known[start:start + block_size]
+            block_scores = self.scores(np.array([code for _, code in block]))
+            for (user_id, _), user_scores in zip(block, block_scores):
+                recommendations[user_id] = self._top(user_scores, top_n)
+        return recommendations
@@ -0,0 +1,300 @@
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class UserInteractionIndex:
+    """
+    Índice `user_id -> {id_juego: interacción}` sobre la estructura de
+    interacciones.json, para encontrar las interacciones de un usuario en O(1)
+    sin recorrer la lista completa de usuarios.
+
+    Se construye una vez por carga y se mantiene al día con `apply()`. Los
+    dicts por usuario se reemplazan (no se modifican) en cada escritura, así
+    que un lector puede iterar el que obtuvo con `games()` mientras llega un
+    evento nuevo. Si un usuario tuviera la misma interacción repetida, cuenta
+    la primera, igual que al buscarla recorriendo la lista.
+    """
+
+    def __init__(self, interacciones_data: Dict):
+        self.interacciones_data = interacciones_data
+        self._entries: Dict[Any, Dict] = {}
+        self._games: Dict[Any, Dict[Any, Dict]] = {}
+        self._positions: Dict[Any, Dict[Any, int]] = {}
+        # Número de eventos aplicados desde la carga y el último que tocó a cada usuario,
+        # para que los resultados precalculados sepan si un usuario cambió después.
+        self.write_seq = 0
+        self._last_write: Dict[Any, int] = {}
+
+        for user_entry in interacciones_data.get('interacciones', []):
+            user_id = user_entry.get('id')
+            if user_id in self._entries:
+                continue
+            games: Dict[Any, Dict] = {}
+            positions: Dict[Any, int] = {}
+            for idx, interaction in enumerate(user_entry.get('interacciones', [])):
+                id_juego = interaction.get('id_juego')
+                if id_juego not in games:
+                    games[id_juego] = interaction
+                    positions[id_juego] = idx
+            self._entries[user_id] = user_entry
+            self._games[user_id] = games
+            self._positions[user_id] = positions
+
+    def __contains__(self, user_id) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, user_id) -> Optional[Dict]:
+        """Entrada del usuario tal como aparece en interacciones.json (None si no existe)."""
+        return self._entries.get(user_id)
+
+    def games(self, user_id) -> Dict[Any, Dict]:
+        """Interacciones del usuario por id_juego, en el orden del archivo (vacío si no existe)."""
+        return self._games.get(user_id, {})
+
+    def last_write(self, user_id) -> int:
+        """Valor de `write_seq` tras el último evento del usuario (0 si no ha cambiado desde la carga)."""
+        return self._last_write.get(user_id, 0)
+
+    def written_since(self, seq: int) -> List:
+        """Usuarios con algún evento posterior a `seq` (un valor anterior de `write_seq`)."""
+        return [user_id for user_id, last in list(self._last_write.items()) if last > seq]
+
+    def apply(self, event: Dict) -> Tuple[Optional[Dict], Dict]:
+        """
+        Aplica un evento sobre la estructura indexada con la misma semántica
+        que tenía /responder_juego: si la interacción ya existe se reemplazan
+        calificacion/like por los enviados (los omitidos se eliminan) y se
+        quitan las horas_jugadas; si no existe, se agrega.
+
+        Las entradas existentes se sustituyen por un dict nuevo en lugar de
+        modificarse, para que los lectores concurrentes nunca vean un dict a medio cambiar.
+        Aplicar el mismo evento dos veces deja el mismo resultado.
+
+        Devuelve (interacción anterior o None, interacción nueva), para que
+        quien mantenga agregados pueda aplicar solo la diferencia.
+        """
+        resultado = self._apply(event)
+        # Se marca al usuario después de cambiar sus datos: quien lea `write_seq` antes
+        # de leer las interacciones nunca tomará por vigente un resultado viejo.
+        self.write_seq += 1
+        self._last_write[event['id_usuario']] = self.write_seq
+        return resultado
+
+    def _apply(self, event: Dict) -> Tuple[Optional[Dict], Dict]:
+        id_usuario = event['id_usuario']
+        id_juego = event['id_juego']
+
+        nueva_interaccion = {'id_juego': id_juego}
+        if 'calificacion' in event:
+            nueva_interaccion['calificacion'] = event['calificacion']
+        if 'like' in event:
+            nueva_interaccion['like'] = event['like']
+
+        usuario = self._entries.get(id_usuario)
+        if usuario is None:
+            usuario = {
+                'id': id_usuario,
+                'interacciones': [nueva_interaccion]
+            }
+            self.interacciones_data.setdefault('interacciones', []).append(usuario)
+            self._entries[id_usuario] = usuario
+            self._games[id_usuario] = {id_juego: nueva_interaccion}
+            self._positions[id_usuario] = {id_juego: 0}
+            return None, nueva_interaccion
+
+        juegos_usuario = usuario.setdefault('interacciones', [])
+        positions = self._positions[id_usuario]
+        idx = positions.get(id_juego)
+        anterior = None
+        if idx is not None:
+            anterior = juegos_usuario[idx]
+            actualizada = {k: v for k, v in anterior.items() if k not in ('calificacion', 'like', 'horas_jugadas')}
+            actualizada.update(nueva_interaccion)
+            juegos_usuario[idx] = actualizada
+            nueva_interaccion = actualizada
+        else:
+            positions[id_juego] = len(juegos_usuario)
+            juegos_usuario.append(nueva_interaccion)
+
+        games = dict(self._games[id_usuario])
+        games[id_juego] = nueva_interaccion
+        self._games[id_usuario] = games
+        return anterior, nueva_interaccion
+
+
+class GameInteractionStats(NamedTuple):
+    """Estadísticas suficientes de un juego para /games/<id>/aggregate-interactions."""
+    total_likes: int = 0
+    total_dislikes: int = 0
+    ratings_sum: float = 0.0
+    rating_count: int = 0
+
+    @property
+    def average_rating(self) -> Optional[float]:
+        return self.ratings_sum / self.rating_count if self.rating_count > 0 else None
+
+
+def _valid_rating(interaction: Dict) -> Optional[float]:
+    """Calificación numérica en el rango 1-5, o None si falta o no es válida."""
+    calificacion = interaction.get('calificacion')
+    if calificacion is None:
+        return None
+    try:
+        rating_value = float(calificacion)
+    except (TypeError, ValueError):
+        return None  # Ignorar calificaciones no numéricas
+    return rating_value if 1 <= rating_value <= 5 else None
+
+
+class GameInteractionCounters:
+    """
+    Contadores por juego (likes, dislikes, suma y cantidad de calificaciones
+    válidas) construidos una vez por carga y actualizados con la diferencia de
+    cada evento, incluida la calificación anterior cuando se sobrescribe.
+
+    Cada juego guarda una tupla inmutable que se reemplaza en cada escritura,
+    así que un lector nunca ve una mitad actualizada y la otra no.
+    Las llaves son el id_juego como cadena, igual que en datos_juegos.json.
+    """
+
+    def __init__(self, interacciones_data: Dict):
+        self._stats: Dict[str, GameInteractionStats] = {}
+        for user_entry in interacciones_data.get('interacciones', []):
+            for interaction in user_entry.get('interacciones', []):
+                self._update(interaction, 1)
+
+    def _update(self, interaction: Dict, sign: int) -> None:
+        game_id = str(interaction.get('id_juego'))
+        like = interaction.get('like')
+        rating_value = _valid_rating(interaction)
+        if like is not True and like is not False and rating_value is None:
+            return
+
+        stats = self._stats.get(game_id, GameInteractionStats())
+        rating_count = stats.rating_count + sign * (rating_value is not None)
+        self._stats[game_id] = GameInteractionStats(
+            total_likes=stats.total_likes + sign * (like is True),
+            total_dislikes=stats.total_dislikes + sign * (like is False),
+            # Sin calificaciones la suma vuelve a cero exacto (sin residuos de redondeo de las restas).
+            ratings_sum=stats.ratings_sum + sign * (rating_value or 0.0) if rating_count else 0.0,
+            rating_count=rating_count,
+        )
+
+    def replace(self, anterior: Optional[Dict], nueva: Dict) -> None:
+        """Descuenta la interacción anterior (si existía) y suma la nueva."""
+        if anterior is not None:
+            self._update(anterior, -1)
+        self._update(nueva, 1)
+
+    def get(self, game_id) -> GameInteractionStats:
+        """Estadísticas del juego (todo en cero si nadie ha interactuado con él)."""
+        return self._stats.get(str(game_id), GameInteractionStats())
+
+
+def is_liked(interaction: Dict) -> bool:
+    """Criterio de juego gustado de las reglas de asociación: calificación >= 3.5 o like."""
+    calificacion = interaction.get('calificacion')
+    try:
+        if calificacion is not None and float(calificacion) >= 3.5:
+            return True
+    except (TypeError, ValueError):
+        pass
+    return bool(interaction.get('like', False))
+
+
+class LikedPairCounts:
+    """
+    Conteos de soporte de 1 y 2 itemsets sobre los juegos gustados, mantenidos
+    al día evento por evento: cuántos usuarios gustan de cada juego y de cada
+    par de juegos, y cuántos usuarios (transacciones) hay en total. Con ellos
+    se derivan las reglas de asociación de un antecedente y un consecuente sin
+    volver a minar (ver `apriori_rules.pair_rules`).
+
+    Siguen las mismas reglas que la canasta de Apriori: una fila por usuario con
+    ID, y si un usuario repite un juego cuenta su última interacción. Las llaves
+    son el id_juego como cadena. Las lecturas devuelven copias tomadas bajo el
+    candado propio de la clase, así que nunca ven un evento aplicado a medias.
+    """
+
+    def __init__(self, interacciones_data: Dict):
+        self._lock = threading.Lock()
+        self.n_users = 0
+        self.item_counts: Dict[str, int] = {}
+        self._pairs: Dict[str, Dict[str, int]] = {}
+        self._liked: Dict[Any, Set[str]] = {}
+
+        for user_entry in interacciones_data.get('interacciones', []):
+            user_id = user_entry.get('id')
+            if user_id is None:
+                continue
+            estado: Dict[str, bool] = {}
+            for interaction in user_entry.get('interacciones', []):
+                estado[str(interaction.get('id_juego'))] = is_liked(interaction)
+            self._register_user(user_id)
+            for game_id, liked in estado.items():
+                if liked:
+                    self._add(user_id, game_id)
+
+    def _register_user(self, user_id) -> None:
+        if user_id not in self._liked:
+            self._liked[user_id] = set()
+            self.n_users += 1
+
+    def _add(self, user_id, game_id: str) -> None:
+        liked = self._liked[user_id]
+        if game_id in liked:
+            return
+        self.item_counts[game_id] = self.item_counts.get(game_id, 0) + 1
+        pairs = self._pairs.setdefault(game_id, {})
+        for other in liked:
+            pairs[other] = pairs.get(other, 0) + 1
+            other_pairs = self._pairs.setdefault(other, {})
+            other_pairs[game_id] = other_pairs.get(game_id, 0) + 1
+        liked.add(game_id)
+
+    def _remove(self, user_id, game_id: str) -> None:
+        liked = self._liked[user_id]
+        if game_id not in liked:
+            return
+        liked.discard(game_id)
+        self.item_counts[game_id] -= 1
+        if self.item_counts[game_id] == 0:
+            del self.item_counts[game_id]
+        for other in liked:
+            self._decrement_pair(game_id, other)
+            self._decrement_pair(other, game_id)
+
+    def _decrement_pair(self, game_id: str, other: str) -> None:
+        row = self._pairs[game_id]
+        row[other] -= 1
+        if row[other] == 0:
+            del row[other]
+
+    def update(self, user_id, nueva: Dict) -> None:
+        """Aplica la interacción resultante de un evento (la que devuelve `UserInteractionIndex.apply`)."""
+        game_id = str(nueva.get('id_juego'))
+        with self._lock:
+            self._register_user(user_id)
+            if is_liked(nueva):
+                self._add(user_id, game_id)
+            else:
+                self._remove(user_id, game_id)
+
+    def liked(self, user_id) -> Set[str]:
+        """Copia de los juegos gustados por el usuario."""
+        with self._lock:
+            return set(self._liked.get(user_id, ()))
+
+    def neighbourhood(self, game_ids: Iterable[str]) -> Tuple[int, Dict[str, int], Dict[str, Dict[str, int]]]:
+        """Como `copy_counts`, pero solo con las filas de `game_ids` (los pares de cada uno con cualquier otro juego)."""
+        with self._lock:
+            rows = {game_id: dict(self._pairs.get(game_id, {})) for game_id in game_ids}
+            return self.n_users, {game_id: self.item_counts.get(game_id, 0) for game_id in rows}, rows
+
+    def copy_counts(self) -> Tuple[int, Dict[str, int], Dict[str, Dict[str, int]]]:
+        """Copia consistente de (usuarios totales, conteo por juego, conteo por par)."""
+        with self._lock:
+            return self.n_users, dict(self.item_counts), {game_id: dict(row) for game_id, row in self._pairs.items()}
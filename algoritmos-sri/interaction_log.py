@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterator, Optional
+
+from interaction_index import UserInteractionIndex
+
+
+def build_interaction_event(id_usuario, id_juego, calificacion=None, like=None) -> Dict:
+    """Construye el registro de un evento de /responder_juego con solo los campos enviados."""
+    event = {'id_usuario': id_usuario, 'id_juego': id_juego}
+    if calificacion is not None:
+        event['calificacion'] = calificacion
+    if like is not None:
+        event['like'] = like
+    return event
+
+
+def apply_interaction_event(interacciones_data: Dict, event: Dict, index: Optional[UserInteractionIndex] = None) -> None:
+    """
+    Aplica un evento sobre la estructura de interacciones.json (ver
+    `UserInteractionIndex.apply`). Sin un índice ya construido se arma uno
+    temporal; para aplicar varios eventos conviene pasar el mismo índice.
+    """
+    if index is None:
+        index = UserInteractionIndex(interacciones_data)
+    index.apply(event)
+
+
+class InteractionLog:
+    """
+    Bitácora de solo-anexar (JSONL) para las interacciones de /responder_juego.
+
+    Cada like o calificación agrega una línea a `<snapshot>.log.jsonl`, así que
+    el costo de escritura no depende del tamaño del dataset. El estado completo
+    es siempre: snapshot (interacciones.json) + eventos pendientes en la bitácora.
+
+    La compactación rota la bitácora a `.compacting` (operación rápida bajo el
+    candado), pliega esos eventos en un snapshot nuevo que reemplaza al anterior
+    de forma atómica y por último borra el archivo rotado. Como los eventos son
+    idempotentes, una caída a mitad de la compactación no pierde ni duplica datos.
+    """
+
+    def __init__(self, snapshot_path: str, log_path: Optional[str] = None, fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path or f"{os.path.splitext(snapshot_path)[0]}.log.jsonl"
+        self.compacting_path = f"{self.log_path}.compacting"
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+
+    def append(self, event: Dict) -> None:
+        """Agrega un evento al final de la bitácora."""
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+    @staticmethod
+    def _read_events(filepath: str) -> Iterator[Dict]:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # Una línea truncada (p. ej. caída durante la escritura) solo puede ser la última.
+                        print(f"Advertencia: Se ignoró una línea inválida en '{filepath}'.")
+        except FileNotFoundError:
+            return
+
+    def replay(self, interacciones_data: Dict, index: Optional[UserInteractionIndex] = None) -> int:
+        """
+        Aplica sobre el snapshot cargado los eventos pendientes (rotados y
+        actuales), usando `index` si ya se construyó uno. Devuelve cuántos aplicó.
+        """
+        if index is None:
+            index = UserInteractionIndex(interacciones_data)
+        applied = 0
+        for filepath in (self.compacting_path, self.log_path):
+            for event in self._read_events(filepath):
+                index.apply(event)
+                applied += 1
+        return applied
+
+    def pending_bytes(self) -> int:
+        """Tamaño en bytes de los eventos que todavía no se han plegado en el snapshot."""
+        total = 0
+        for filepath in (self.compacting_path, self.log_path):
+            try:
+                total += os.path.getsize(filepath)
+            except OSError:
+                pass
+        return total
+
+    def compact(self, run_step: Optional[Callable[[Callable[[], None]], None]] = None) -> bool:
+        """
+        Pliega los eventos pendientes en el snapshot. Devuelve True si hubo algo que compactar.
+
+        Los dos pasos que cambian archivos (rotar la bitácora; reemplazar el
+        snapshot y borrar el archivo rotado) se ejecutan a través de `run_step`,
+        para que quien tiene los datos en memoria los haga bajo su propio candado
+        y actualice su firma de archivos en el mismo momento (ver
+        `DataStore.compact_interactions`). El plegado en sí, O(dataset), queda fuera.
+        """
+        if run_step is None:
+            def run_step(step: Callable[[], None]) -> None:
+                step()
+
+        with self._compact_lock:
+            rotated = []
+
+            def rotate() -> None:
+                with self._lock:
+                    if not os.path.exists(self.compacting_path):
+                        if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+                            return
+                        os.replace(self.log_path, self.compacting_path)
+                    rotated.append(True)
+
+            run_step(rotate)
+            if not rotated:
+                return False
+
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    interacciones_data = json.load(f)
+            except FileNotFoundError:
+                interacciones_data = {'interacciones': []}
+
+            index = UserInteractionIndex(interacciones_data)
+            for event in self._read_events(self.compacting_path):
+                index.apply(event)
+
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'interacciones': interacciones_data.get('interacciones', [])}, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+
+            def publish() -> None:
+                os.replace(tmp_path, self.snapshot_path)
+                os.remove(self.compacting_path)
+
+            run_step(publish)
+            return True
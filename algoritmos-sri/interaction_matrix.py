@@ -0,0 +1,165 @@
+import math
+from typing import Any, Dict, List
+
+import numpy as np
+import scipy.sparse as sp
+
+# Valores de `likes`: tri-estado en int8.
+LIKE = 1
+DISLIKE = -1
+NO_LIKE = 0
+
+
+def as_float64(values: np.ndarray) -> np.ndarray:
+    """
+    Convierte calificaciones/horas float32 a float64 recuperando el valor
+    original: float32 conserva ~7 dígitos significativos, así que redondear a
+    6 decimales devuelve exactamente 4.7 en lugar de 4.69999981.
+    """
+    return np.round(values.astype(np.float64), 6)
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class InteractionMatrix:
+    """
+    Representación columnar de interacciones.json, construida una vez por
+    versión de datos y compartida por todas las estrategias.
+
+    Cada interacción es una posición en arreglos paralelos:
+      - user_codes / game_codes: códigos densos (int32) de usuario y juego.
+      - ratings: calificación (float32, NaN si no hay).
+      - likes: 1 like, -1 dislike, 0 sin like (int8).
+      - hours: horas jugadas (float32, NaN si no hay).
+
+    Los códigos siguen el orden de primera aparición en el JSON, de modo que
+    recorrerlos en orden reproduce el orden de inserción de los dicts que usaba
+    cada algoritmo. `user_ids[c]` / `game_ids[c]` traducen un código al ID
+    original (los juegos siempre como cadena, igual que las llaves de datos_juegos.json).
+    Se conservan las interacciones duplicadas (mismo usuario y juego); cada
+    consumidor decide cómo combinarlas, como lo hacía antes.
+    """
+
+    def __init__(self, user_ids: List[Any], game_ids: List[str], user_codes: np.ndarray, game_codes: np.ndarray,
+                 ratings: np.ndarray, likes: np.ndarray, hours: np.ndarray):
+        self.user_ids = user_ids
+        self.game_ids = game_ids
+        self.user_code_of: Dict[Any, int] = {user_id: code for code, user_id in enumerate(user_ids)}
+        self.game_code_of: Dict[str, int] = {game_id: code for code, game_id in enumerate(game_ids)}
+        self.user_codes = user_codes
+        self.game_codes = game_codes
+        self.ratings = ratings
+        self.likes = likes
+        self.hours = hours
+
+        # Índices tipo CSR/CSC sobre las posiciones: las interacciones del usuario u son
+        # user_order[user_indptr[u]:user_indptr[u + 1]] (en su orden original), y lo mismo por juego.
+        self.user_order = np.argsort(user_codes, kind='stable')
+        self.user_indptr = np.concatenate(([0], np.cumsum(np.bincount(user_codes, minlength=self.n_users)))).astype(np.int64)
+        self.game_order = np.argsort(game_codes, kind='stable')
+        self.game_indptr = np.concatenate(([0], np.cumsum(np.bincount(game_codes, minlength=self.n_games)))).astype(np.int64)
+
+    @classmethod
+    def from_interacciones(cls, interacciones_data: Dict) -> 'InteractionMatrix':
+        """Recorre la estructura anidada de interacciones.json una sola vez."""
+        user_ids: List[Any] = []
+        user_code_of: Dict[Any, int] = {}
+        game_ids: List[str] = []
+        game_code_of: Dict[str, int] = {}
+        user_codes: List[int] = []
+        game_codes: List[int] = []
+        ratings: List[float] = []
+        likes: List[int] = []
+        hours: List[float] = []
+
+        # Se copian las listas: pueden recibir eventos nuevos mientras se construye la matriz.
+        for user_entry in list(interacciones_data.get('interacciones', [])):
+            user_id = user_entry.get('id')
+            user_code = user_code_of.get(user_id)
+            if user_code is None:
+                user_code = user_code_of[user_id] = len(user_ids)
+                user_ids.append(user_id)
+
+            for interaction in list(user_entry.get('interacciones', [])):
+                game_id = str(interaction.get('id_juego'))
+                game_code = game_code_of.get(game_id)
+                if game_code is None:
+                    game_code = game_code_of[game_id] = len(game_ids)
+                    game_ids.append(game_id)
+
+                like = interaction.get('like')
+                user_codes.append(user_code)
+                game_codes.append(game_code)
+                ratings.append(_to_float(interaction.get('calificacion')))
+                likes.append(LIKE if like is True else DISLIKE if like is False else NO_LIKE)
+                hours.append(_to_float(interaction.get('horas_jugadas')))
+
+        return cls(
+            user_ids,
+            game_ids,
+            np.asarray(user_codes, dtype=np.int32),
+            np.asarray(game_codes, dtype=np.int32),
+            np.asarray(ratings, dtype=np.float32),
+            np.asarray(likes, dtype=np.int8),
+            np.asarray(hours, dtype=np.float32),
+        )
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_ids)
+
+    @property
+    def n_games(self) -> int:
+        return len(self.game_ids)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.user_codes)
+
+    @property
+    def has_rating(self) -> np.ndarray:
+        return ~np.isnan(self.ratings)
+
+    def user_entries(self, user_id) -> np.ndarray:
+        """Posiciones de las interacciones de un usuario (vacío si no existe)."""
+        code = self.user_code_of.get(user_id)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.user_order[self.user_indptr[code]:self.user_indptr[code + 1]]
+
+    def game_entries(self, game_id) -> np.ndarray:
+        """Posiciones de las interacciones de un juego (vacío si no existe)."""
+        code = self.game_code_of.get(str(game_id))
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        return self.game_order[self.game_indptr[code]:self.game_indptr[code + 1]]
+
+    def to_csr(self, values: np.ndarray, mask: np.ndarray = None) -> sp.csr_matrix:
+        """Matriz usuarios × juegos (CSR) con `values` en cada interacción; los duplicados se suman."""
+        rows, cols = self.user_codes, self.game_codes
+        if mask is not None:
+            rows, cols, values = rows[mask], cols[mask], values[mask]
+        return sp.csr_matrix((values, (rows, cols)), shape=(self.n_users, self.n_games))
+
+    def to_csc(self, values: np.ndarray, mask: np.ndarray = None) -> sp.csc_matrix:
+        """Igual que `to_csr`, pero en formato CSC (acceso eficiente por juego)."""
+        return self.to_csr(values, mask).tocsc()
+
+    def per_game_sum(self, values: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+        """Suma por código de juego (float64) de `values` en las posiciones de `mask`."""
+        codes = self.game_codes
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+        return np.bincount(codes, weights=as_float64(values), minlength=self.n_games)
+
+    def per_game_count(self, mask: np.ndarray = None) -> np.ndarray:
+        """Cantidad de interacciones por código de juego en las posiciones de `mask`."""
+        codes = self.game_codes if mask is None else self.game_codes[mask]
+        return np.bincount(codes, minlength=self.n_games)
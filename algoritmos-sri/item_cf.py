@@ -0,0 +1,180 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_TOP_K = 100
+# Vecinos por predicción, como KNNBasic(k=40).
+DEFAULT_K = 40
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def cosine_similarity(ratings: sp.csr_matrix, rated: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    Similitud coseno entre columnas (juegos) de una matriz usuarios × juegos,
+    con la definición de Surprise (`sim_options={'name': 'cosine'}`): las
+    normas se toman solo sobre los usuarios que calificaron ambos juegos.
+
+        sim(i, j) = sum_u r_ui r_uj / sqrt(sum_u r_ui^2 * sum_u r_uj^2),  u en U_i ∩ U_j
+
+    `rated` tiene 1 donde hay calificación (también las calificaciones 0). Son
+    tres productos dispersos; sin la diagonal y sin similitudes 0.
+    """
+    products = sp.csr_matrix(ratings.T @ ratings)
+    # squares[i, j] = suma de r_ui^2 sobre los usuarios que calificaron i y j.
+    squares = sp.csr_matrix(ratings.multiply(ratings).T @ rated)
+    # El patrón de `products` está contenido en el de `squares`: el producto
+    # elemento a elemento conserva justo los pares con similitud > 0.
+    similarity = sp.csr_matrix(products.multiply(squares.power(-0.5)).multiply(squares.T.power(-0.5)))
+    similarity.setdiag(0.0)
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def _prune_rows(similarity: sp.csr_matrix, top_k: int) -> sp.csr_matrix:
+    """Conserva las `top_k` similitudes más altas de cada fila."""
+    indptr, indices, data = [0], [], []
+    for row in range(similarity.shape[0]):
+        start, stop = similarity.indptr[row], similarity.indptr[row + 1]
+        row_indices, row_data = similarity.indices[start:stop], similarity.data[start:stop]
+        if len(row_data) > top_k:
+            keep = np.sort(np.argpartition(-row_data, top_k - 1)[:top_k])
+            row_indices, row_data = row_indices[keep], row_data[keep]
+        indices.append(row_indices)
+        data.append(row_data)
+        indptr.append(indptr[-1] + len(row_data))
+    return sp.csr_matrix(
+        (np.concatenate(data) if data else np.empty(0), np.concatenate(indices) if indices else np.empty(0, dtype=np.int32), indptr),
+        shape=similarity.shape,
+    )
+
+
+class ItemItemCF:
+    """
+    Filtrado colaborativo ítem-ítem sobre una matriz dispersa de calificaciones
+    (usuarios × juegos, CSR), en lugar de un KNNBasic(user_based=False) de
+    Surprise con un `predict` por juego candidato.
+
+    La similitud coseno entre juegos se calcula una vez por versión de datos y
+    se guardan los `top_k` vecinos de cada juego (`neighbors`, juegos × juegos).
+    La predicción para el usuario u y el juego i es la de KNNBasic:
+
+        sum_j sim(i, j) r_uj / sum_j sim(i, j)
+
+    sobre los (hasta `k`) juegos j calificados por u más similares a i, con
+    similitud > 0; si no hay ninguno, el promedio global. Para un usuario con
+    `k` calificaciones o menos son dos productos dispersos r_u · S para todo el
+    catálogo. Con `top_k` >= juegos - 1 la tabla está completa y las
+    predicciones son las mismas que las de KNNBasic.
+
+    Los índices de usuarios y juegos siguen el orden de primera aparición en
+    las calificaciones, como los índices internos de un trainset de Surprise.
+    Si un usuario califica dos veces el mismo juego cuenta la primera.
+    """
+
+    def __init__(self, user_ids: List, item_ids: np.ndarray, ratings: sp.csr_matrix, rated: sp.csr_matrix,
+                 neighbors: sp.csr_matrix, global_mean: float, rating_scale: Tuple[float, float], k: int = DEFAULT_K):
+        self.user_ids = user_ids
+        self.user_code_of = {user_id: code for code, user_id in enumerate(user_ids)}
+        self.item_ids = item_ids
+        self.ratings = ratings
+        # 1 donde el usuario calificó el juego, aunque la calificación sea 0.
+        self.rated = rated
+        self.neighbors = neighbors
+        # Traspuesta en CSR: las puntuaciones de los usuarios son filas × esta matriz.
+        self._neighbors_t = sp.csr_matrix(neighbors.T)
+        self.global_mean = global_mean
+        self.rating_scale = rating_scale
+        self.k = k
+
+    @classmethod
+    def from_ratings(cls, ratings: Iterable[Tuple[object, object, float]], rating_scale: Tuple[float, float] = (0, 5),
+                     top_k: int = DEFAULT_TOP_K, k: int = DEFAULT_K) -> 'ItemItemCF':
+        """`ratings` son tuplas (id de usuario, id de juego, calificación), como las que recibe Surprise."""
+        user_code_of: Dict = {}
+        item_code_of: Dict = {}
+        seen = set()
+        rows, columns, values = [], [], []
+        for user_id, item_id, rating in ratings:
+            user_code = user_code_of.setdefault(user_id, len(user_code_of))
+            item_code = item_code_of.setdefault(item_id, len(item_code_of))
+            if (user_code, item_code) in seen:
+                continue
+            seen.add((user_code, item_code))
+            rows.append(user_code)
+            columns.append(item_code)
+            values.append(float(rating))
+        shape = (len(user_code_of), len(item_code_of))
+        rating_matrix = sp.csr_matrix((values, (rows, columns)), shape=shape, dtype=np.float64)
+        rated = sp.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=shape)
+        neighbors = _prune_rows(cosine_similarity(rating_matrix, rated), top_k) if top_k > 0 else sp.csr_matrix((shape[1], shape[1]))
+        return cls(list(user_code_of), np.array(list(item_code_of)), rating_matrix, rated, neighbors,
+                   float(np.mean(values)) if values else 0.0, rating_scale, k)
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_ids)
+
+    def _heavy_user_sums(self, user_code: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sumas (similitud × calificación, similitud) de un usuario con más de `k`
+        calificaciones: para cada juego solo cuentan sus `k` juegos calificados
+        más similares, como en KNNBasic.
+        """
+        start, stop = self.rated.indptr[user_code], self.rated.indptr[user_code + 1]
+        rated_codes = self.rated.indices[start:stop]
+        user_ratings = self.ratings[user_code].toarray().ravel()[rated_codes]
+        # Juegos × juegos calificados; se leen filas de la traspuesta (leer columnas de una CSR es lento).
+        similarity = self._neighbors_t[rated_codes].toarray().T
+        top = np.argpartition(-similarity, self.k - 1, axis=1)[:, :self.k]
+        top_similarity = np.take_along_axis(similarity, top, axis=1)
+        return (top_similarity * user_ratings[top]).sum(axis=1), top_similarity.sum(axis=1)
+
+    def scores(self, user_codes: np.ndarray) -> np.ndarray:
+        """Predicción de cada juego para cada usuario de `user_codes` (usuarios × juegos); los ya calificados en -inf."""
+        user_codes = np.asarray(user_codes, dtype=np.int64)
+        weighted_sums = (self.ratings[user_codes] @ self._neighbors_t).toarray()
+        sim_sums = (self.rated[user_codes] @ self._neighbors_t).toarray()
+        for row in np.flatnonzero(np.diff(self.rated.indptr)[user_codes] > self.k):
+            weighted_sums[row], sim_sums[row] = self._heavy_user_sums(user_codes[row])
+
+        estimates = np.full(weighted_sums.shape, self.global_mean)
+        np.divide(weighted_sums, sim_sums, out=estimates, where=sim_sums > 0)
+        np.clip(estimates, *self.rating_scale, out=estimates)
+        estimates[self.rated[user_codes].nonzero()] = -np.inf
+        return estimates
+
+    def _top(self, scores: np.ndarray, top_n: int) -> List[Tuple[object, float]]:
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if candidates.size == 0 or top_n <= 0:
+            return []
+        scores = scores[candidates]
+        if candidates.size > top_n:
+            # Se conservan los empatados con el último y se desempata por índice de juego.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(self.item_ids[code].item(), float(score)) for code, score in zip(candidates[order], scores[order])]
+
+    def recommend(self, user_id, top_n: int) -> Optional[List[Tuple[object, float]]]:
+        """
+        Los `top_n` juegos sin calificar con mayor predicción para el usuario:
+        [(id de juego, predicción)]. None si el usuario no tiene calificaciones.
+        """
+        code = self.user_code_of.get(user_id)
+        if code is None:
+            return None
+        return self._top(self.scores(np.array([code]))[0], top_n)
+
+    def recommend_batch(self, user_ids: Iterable, top_n: int,
+                        block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[object, List[Tuple[object, float]]]:
+        """`recommend` para muchos usuarios, por bloques de `block_size` usuarios con un producto disperso cada uno."""
+        known = [(user_id, self.user_code_of[user_id]) for user_id in user_ids if user_id in self.user_code_of]
+        recommendations = {}
+        for start in range(0, len(known), block_size):
+            block = known[start:start + block_size]
+            block_scores = self.scores(np.array([code for _, code in block]))
+            for (user_id, _), user_scores in zip(block, block_scores):
+                recommendations[user_id] = self._top(user_scores, top_n)
+        return recommendations
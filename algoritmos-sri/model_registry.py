@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from data_store import DataSnapshot, DataStore
+
+
+class ModelRegistry:
+    """
+    Registro de modelos entrenados una sola vez por versión de datos.
+
+    `build_fn` recibe un DataSnapshot y devuelve el conjunto completo de modelos.
+    El primer entrenamiento ocurre al llamar a `start()`; después, un hilo en
+    segundo plano revisa periódicamente el DataStore y, si la versión cambió,
+    entrena un conjunto nuevo y lo publica con una sola asignación. Las
+    solicitudes siempre leen un conjunto completo (el anterior mientras se
+    entrena el nuevo) y nunca pagan el costo del entrenamiento.
+
+    Entre el fin de un entrenamiento y el inicio del siguiente pasan al menos
+    `min_interval` segundos: las escrituras de ese lapso (y los avisos de
+    `request_refresh()`) se juntan en un solo entrenamiento. Mientras tanto,
+    cada evento se refleja con las actualizaciones incrementales del DataStore.
+
+    `on_publish`, si se indica, recibe cada conjunto justo después de
+    publicarlo: ahí se aplican las escrituras que llegaron durante el
+    entrenamiento y que las solicitudes aplicaron sobre el conjunto anterior.
+    """
+
+    def __init__(self, data_store: DataStore, build_fn: Callable[[DataSnapshot], Any], poll_interval: float = 5.0,
+                 on_publish: Optional[Callable[[Any], None]] = None, min_interval: float = 0.0):
+        self.data_store = data_store
+        self.build_fn = build_fn
+        self.on_publish = on_publish
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+        # Momento (time.monotonic) en que terminó el último entrenamiento.
+        self._last_built = float('-inf')
+        self._models: Optional[Any] = None
+        self._version = 0
+        self._build_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self) -> Optional[Any]:
+        """Devuelve el último conjunto de modelos publicado (None si aún no hay ninguno)."""
+        return self._models
+
+    @property
+    def version(self) -> int:
+        """Versión de datos con la que se entrenaron los modelos publicados."""
+        return self._version
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Entrena y publica modelos nuevos si los datos cambiaron desde el último entrenamiento.
+        Devuelve True si se publicó un conjunto nuevo.
+        """
+        with self._build_lock:
+            snapshot = self.data_store.get()
+            if not force and self._models is not None and snapshot.version == self._version:
+                return False
+
+            started = time.perf_counter()
+            models = self.build_fn(snapshot)
+            self._models = models
+            self._version = snapshot.version
+            if self.on_publish is not None:
+                self.on_publish(models)
+            self._last_built = time.monotonic()
+            print(f"Modelos entrenados para la versión de datos {snapshot.version} en {time.perf_counter() - started:.2f}s.")
+            return True
+
+    def request_refresh(self) -> None:
+        """
+        Despierta al hilo de fondo para que revise los datos sin esperar al
+        siguiente intervalo de sondeo (pero sí a que pasen `min_interval`
+        segundos desde el último entrenamiento).
+        """
+        self._wake.set()
+
+    def _watch(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            remaining = self._last_built + self.min_interval - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error al reconstruir los modelos en segundo plano: {e}. Se conservan los modelos anteriores.")
+
+    def start(self) -> None:
+        """Entrena el primer conjunto de modelos y arranca el hilo de reconstrucción en segundo plano."""
+        try:
+            self.refresh(force=True)
+        except Exception as e:
+            print(f"Error al entrenar los modelos iniciales: {e}. Se reintentará en segundo plano.")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
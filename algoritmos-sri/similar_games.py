@@ -0,0 +1,100 @@
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_TOP_K = 20
+# Relleno de las filas con menos de `top_k` vecinos.
+NO_GAME = -1
+
+
+class SimilarGamesTable:
+    """
+    Los `top_k` juegos más similares de cada juego (similitud coseno ítem-ítem
+    de las calificaciones), en una tabla compacta que se guarda en disco:
+
+      - game_ids:  IDs de los juegos con vecinos (int32, ordenados).
+      - neighbors: juegos × top_k, IDs de los vecinos (int32) de mayor a menor
+                   similitud; las filas cortas se rellenan con NO_GAME.
+      - scores:    juegos × top_k, la similitud con cada vecino (float32).
+
+    Consultar un juego es una búsqueda binaria en `game_ids` y el corte de una
+    fila: no hace falta ningún objeto de Surprise.
+    """
+
+    def __init__(self, game_ids: np.ndarray, neighbors: np.ndarray, scores: np.ndarray):
+        self.game_ids = game_ids
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @classmethod
+    def from_item_neighbors(cls, item_ids: np.ndarray, neighbors: sp.csr_matrix,
+                            top_k: int = DEFAULT_TOP_K) -> 'SimilarGamesTable':
+        """
+        A partir de la matriz de vecinos de item_cf.ItemItemCF (juegos × juegos,
+        índices en el orden de `item_ids`). Los empates se desempatan por índice
+        de juego, como KNNBasic.get_neighbors.
+        """
+        n_items = len(item_ids)
+        neighbors = sp.csr_matrix(neighbors)
+        counts = np.minimum(np.diff(neighbors.indptr), top_k)
+        rows = np.repeat(np.arange(n_items), np.diff(neighbors.indptr))
+        # Por fila: similitud descendente (ya en float32, la precisión que se guarda) y luego índice de juego.
+        order = np.lexsort((neighbors.indices, -neighbors.data.astype(np.float32), rows))
+        rank = np.arange(len(order)) - np.repeat(neighbors.indptr[:-1], np.diff(neighbors.indptr))
+        keep = order[rank < top_k]
+
+        table_ids = np.full((n_items, top_k), NO_GAME, dtype=np.int32)
+        table_scores = np.zeros((n_items, top_k), dtype=np.float32)
+        table_rows, table_columns = rows[keep], rank[rank < top_k]
+        table_ids[table_rows, table_columns] = np.asarray(item_ids)[neighbors.indices[keep]]
+        table_scores[table_rows, table_columns] = neighbors.data[keep]
+
+        has_neighbors = counts > 0
+        game_ids = np.asarray(item_ids, dtype=np.int32)[has_neighbors]
+        by_id = np.argsort(game_ids, kind='stable')
+        return cls(game_ids[by_id], table_ids[has_neighbors][by_id], table_scores[has_neighbors][by_id])
+
+    @property
+    def top_k(self) -> int:
+        return self.neighbors.shape[1]
+
+    def similar_to(self, game_id: int) -> List[Tuple[int, float]]:
+        """[(id de juego, similitud)] de mayor a menor similitud; vacío si el juego no tiene vecinos."""
+        row = int(np.searchsorted(self.game_ids, game_id))
+        if row == len(self.game_ids) or self.game_ids[row] != game_id:
+            return []
+        neighbors, scores = self.neighbors[row], self.scores[row]
+        found = neighbors != NO_GAME
+        return list(zip(neighbors[found].tolist(), scores[found].tolist()))
+
+    def save(self, path: str) -> None:
+        """
+        Guarda la tabla en un .npz sin comprimir. Se escribe en un archivo temporal
+        que reemplaza al anterior al final, así que un lector nunca ve una tabla a medias.
+        """
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.juegos_similares.', suffix='.npz', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, game_ids=self.game_ids, neighbors=self.neighbors, scores=self.scores)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Advertencia: No se pudo guardar la tabla de juegos similares en '{path}': {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['SimilarGamesTable']:
+        """La tabla guardada en `path`, o None si no existe o no se puede leer."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as arrays:
+                return cls(arrays['game_ids'], arrays['neighbors'], arrays['scores'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Advertencia: No se pudo cargar la tabla de juegos similares de '{path}': {e}")
+            return None
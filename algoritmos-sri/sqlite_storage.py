@@ -0,0 +1,233 @@
+"""
+Backend SQLite opcional para usuarios, interacciones y datos de juegos.
+
+Migración única desde los JSON actuales (incluye los eventos pendientes de la
+bitácora de interacciones):
+
+    python sqlite_storage.py --db sri.db
+
+Después basta con arrancar la API con la variable SRI_SQLITE_DB=sri.db.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from data_store import DataStore
+from interaction_log import InteractionLog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_normalizado TEXT NOT NULL,
+    edad INTEGER,
+    generos_favoritos TEXT NOT NULL DEFAULT '[]'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_usuarios_nombre_normalizado ON usuarios (nombre_normalizado);
+
+CREATE TABLE IF NOT EXISTS juegos (
+    appid TEXT PRIMARY KEY,
+    nombre TEXT,
+    datos TEXT NOT NULL
+);
+
+-- game_id y horas_jugadas sin tipo declarado: se guardan tal como llegan (int/str, int/float).
+CREATE TABLE IF NOT EXISTS interacciones (
+    user_id INTEGER NOT NULL,
+    game_id NOT NULL,
+    calificacion REAL,
+    "like" INTEGER,
+    horas_jugadas,
+    PRIMARY KEY (user_id, game_id)
+);
+CREATE INDEX IF NOT EXISTS idx_interacciones_game_id ON interacciones (game_id);
+"""
+
+UPSERT_INTERACCION = """
+INSERT INTO interacciones (user_id, game_id, calificacion, "like", horas_jugadas)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (user_id, game_id) DO UPDATE SET
+    calificacion = excluded.calificacion,
+    "like" = excluded."like",
+    horas_jugadas = excluded.horas_jugadas
+"""
+
+
+def open_connection(db_path: str) -> sqlite3.Connection:
+    """Abre una conexión en modo WAL y se asegura de que exista el esquema."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _normalize_name(nombre: str) -> str:
+    return nombre.strip().lower()
+
+
+def _like_to_db(like) -> Optional[int]:
+    return None if like is None else int(bool(like))
+
+
+def _user_from_row(row) -> Dict:
+    user_id, nombre, edad, generos = row
+    return {'id': user_id, 'nombre': nombre, 'edad': edad, 'generos_favoritos': json.loads(generos)}
+
+
+class SQLiteDataStore(DataStore):
+    """
+    DataStore respaldado por SQLite en lugar de los archivos JSON.
+
+    Los modelos siguen leyendo el snapshot completo en memoria, pero las
+    consultas puntuales (login por nombre, juego por appid) son búsquedas por
+    índice y cada like/calificación es un único upsert por (user_id, game_id).
+    """
+
+    _load_errors = DataStore._load_errors + (sqlite3.Error,)
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path, db_path, db_path)
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = open_connection(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def _current_signature(self) -> Tuple:
+        return (
+            self._file_signature(self.db_path),
+            self._file_signature(f"{self.db_path}-wal"),
+        )
+
+    def _load_sources(self) -> Tuple[Dict, Dict, Dict]:
+        conn = self._connection()
+
+        usuarios = [
+            _user_from_row(row)
+            for row in conn.execute("SELECT id, nombre, edad, generos_favoritos FROM usuarios ORDER BY id")
+        ]
+        juegos = {appid: json.loads(datos) for appid, datos in conn.execute("SELECT appid, datos FROM juegos ORDER BY rowid")}
+        if not juegos:
+            print(f"Advertencia: La base '{self.db_path}' no tiene juegos. ¿Se ejecutó `python sqlite_storage.py --db {self.db_path}`?")
+
+        # Se conserva el orden de inserción (rowid) para que los usuarios y sus
+        # interacciones salgan en el mismo orden que en interacciones.json.
+        interacciones_por_usuario: Dict[int, List[Dict]] = {}
+        rows = conn.execute('SELECT user_id, game_id, calificacion, "like", horas_jugadas FROM interacciones ORDER BY rowid')
+        for user_id, game_id, calificacion, like, horas_jugadas in rows:
+            interaccion = {'id_juego': game_id}
+            if calificacion is not None:
+                interaccion['calificacion'] = calificacion
+            if like is not None:
+                interaccion['like'] = bool(like)
+            if horas_jugadas is not None:
+                interaccion['horas_jugadas'] = horas_jugadas
+            interacciones_por_usuario.setdefault(user_id, []).append(interaccion)
+
+        interacciones = {
+            'interacciones': [
+                {'id': user_id, 'interacciones': lista}
+                for user_id, lista in interacciones_por_usuario.items()
+            ]
+        }
+        return interacciones, juegos, {'usuarios': usuarios}
+
+    def _persist_interaction(self, event: Dict) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(UPSERT_INTERACCION, (
+                event['id_usuario'],
+                event['id_juego'],
+                event.get('calificacion'),
+                _like_to_db(event.get('like')),
+                None,
+            ))
+
+    def _persist_user(self, nombre: str, edad: int, generos_favoritos: List[str], usuarios_actuales: List[Dict]) -> Dict:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO usuarios (nombre, nombre_normalizado, edad, generos_favoritos) VALUES (?, ?, ?, ?)",
+                (nombre, _normalize_name(nombre), edad, json.dumps(generos_favoritos, ensure_ascii=False)),
+            )
+        return {'id': cursor.lastrowid, 'nombre': nombre, 'edad': edad, 'generos_favoritos': generos_favoritos}
+
+    def _refresh_signature_after_write(self) -> None:
+        self._signature = self._current_signature()
+
+    def find_user_by_name(self, nombre: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT id, nombre, edad, generos_favoritos FROM usuarios WHERE nombre_normalizado = ?",
+            (_normalize_name(nombre),),
+        ).fetchone()
+        return _user_from_row(row) if row else None
+
+    def get_game(self, appid: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT datos FROM juegos WHERE appid = ?", (str(appid),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def migrate_json_to_sqlite(db_path: str, interacciones_path: str, juegos_path: str, usuarios_path: str) -> Dict[str, int]:
+    """Importa los JSON (más la bitácora pendiente) a la base SQLite, reemplazando su contenido."""
+    with open(juegos_path, 'r', encoding='utf-8') as f:
+        juegos = json.load(f)
+    with open(usuarios_path, 'r', encoding='utf-8') as f:
+        usuarios = json.load(f).get('usuarios', [])
+    with open(interacciones_path, 'r', encoding='utf-8') as f:
+        interacciones = json.load(f)
+    InteractionLog(interacciones_path).replay(interacciones)
+
+    interaction_rows = []
+    for user_entry in interacciones.get('interacciones', []):
+        for interaction in user_entry.get('interacciones', []):
+            interaction_rows.append((
+                user_entry['id'],
+                interaction['id_juego'],
+                interaction.get('calificacion'),
+                _like_to_db(interaction.get('like')),
+                interaction.get('horas_jugadas'),
+            ))
+
+    conn = open_connection(db_path)
+    with conn:
+        conn.execute("DELETE FROM interacciones")
+        conn.execute("DELETE FROM usuarios")
+        conn.execute("DELETE FROM juegos")
+        conn.executemany(
+            "INSERT INTO usuarios (id, nombre, nombre_normalizado, edad, generos_favoritos) VALUES (?, ?, ?, ?, ?)",
+            [
+                (u['id'], u['nombre'], _normalize_name(u['nombre']), u.get('edad'), json.dumps(u.get('generos_favoritos', []), ensure_ascii=False))
+                for u in usuarios
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO juegos (appid, nombre, datos) VALUES (?, ?, ?)",
+            [(str(appid), game.get('nombre'), json.dumps(game, ensure_ascii=False)) for appid, game in juegos.items()],
+        )
+        conn.executemany(UPSERT_INTERACCION, interaction_rows)
+    conn.close()
+
+    return {'usuarios': len(usuarios), 'juegos': len(juegos), 'interacciones': len(interaction_rows)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Migra usuarios, interacciones y datos de juegos de JSON a SQLite.")
+    parser.add_argument('--db', default='sri.db', help="Ruta de la base SQLite a crear/reemplazar.")
+    parser.add_argument('--interacciones', default='interacciones.json')
+    parser.add_argument('--juegos', default='datos_juegos.json')
+    parser.add_argument('--usuarios', default='usuarios.json')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.juegos):
+        parser.error(f"No se encontró '{args.juegos}'. Ejecuta el comando desde la carpeta de la API.")
+
+    counts = migrate_json_to_sqlite(args.db, args.interacciones, args.juegos, args.usuarios)
+    print(f"Migración completa en '{args.db}': {counts['usuarios']} usuarios, {counts['juegos']} juegos, {counts['interacciones']} interacciones.")
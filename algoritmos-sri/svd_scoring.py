@@ -0,0 +1,175 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from surprise import SVD
+
+DEFAULT_BLOCK_SIZE = 1024
+# Regularización del fold-in: la de SVD() de Surprise (reg_bu = reg_pu = reg_all = 0.02).
+DEFAULT_FOLD_IN_REGULARIZATION = 0.02
+
+
+class SVDScorer:
+    """
+    Los factores de un modelo SVD de Surprise ya entrenado, en arreglos de NumPy,
+    para puntuar todos los juegos de un usuario con una sola expresión:
+
+        mu + b_u + b_i + P[u] @ Q.T
+
+    recortada a la escala de calificación, igual que `SVD.predict` (que hace lo
+    mismo juego por juego). Los juegos que el usuario ya calificó quedan en -inf.
+
+    Los índices internos de usuarios y juegos son los del trainset con que se
+    entrenó el modelo.
+
+    Entre reentrenamientos, `fold_in` recalcula el sesgo y los factores de un
+    usuario (nuevo o con calificaciones nuevas) contra los factores de juego
+    congelados; ese usuario se puntúa con los valores recalculados.
+    """
+
+    def __init__(self, global_mean: float, user_bias: np.ndarray, item_bias: np.ndarray,
+                 user_factors: np.ndarray, item_factors: np.ndarray, user_ids: List,
+                 item_ids: np.ndarray, rated: sp.csr_matrix, rating_scale: Tuple[float, float],
+                 biased: bool = True):
+        self.global_mean = global_mean
+        self.user_bias = user_bias
+        self.item_bias = item_bias
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.user_code_of = {user_id: code for code, user_id in enumerate(user_ids)}
+        self.item_ids = item_ids
+        self.item_code_of = {item_id: code for code, item_id in enumerate(item_ids.tolist())}
+        # Usuarios × juegos; 1 donde el usuario ya tiene calificación.
+        self.rated = rated
+        self.rating_scale = rating_scale
+        self.biased = biased
+        # user_id -> (b_u, p_u, índices de los juegos calificados) calculados con `fold_in`.
+        # Cada usuario se reemplaza con una sola asignación: un lector nunca ve uno a medias.
+        self._folded: Dict[object, Tuple[float, np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def from_model(cls, model: SVD, trainset) -> 'SVDScorer':
+        rows, columns = [], []
+        for inner_uid, user_ratings in trainset.ur.items():
+            for inner_iid, _ in user_ratings:
+                rows.append(inner_uid)
+                columns.append(inner_iid)
+        rated = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.bool_), (rows, columns)), shape=(trainset.n_users, trainset.n_items)
+        )
+        if model.biased:
+            global_mean, user_bias, item_bias = trainset.global_mean, np.asarray(model.bu), np.asarray(model.bi)
+        else:
+            global_mean, user_bias, item_bias = 0.0, np.zeros(trainset.n_users), np.zeros(trainset.n_items)
+        return cls(
+            global_mean,
+            user_bias,
+            item_bias,
+            np.asarray(model.pu),
+            np.asarray(model.qi),
+            [trainset.to_raw_uid(inner_uid) for inner_uid in trainset.all_users()],
+            np.array([trainset.to_raw_iid(inner_iid) for inner_iid in trainset.all_items()]),
+            rated,
+            trainset.rating_scale,
+            biased=model.biased,
+        )
+
+    def scores(self, user_codes: np.ndarray) -> np.ndarray:
+        """Puntuación de cada juego para cada usuario de `user_codes` (usuarios × juegos), en un solo producto."""
+        user_codes = np.asarray(user_codes, dtype=np.int64)
+        estimates = self.user_factors[user_codes] @ self.item_factors.T
+        estimates += self.global_mean + self.user_bias[user_codes, None] + self.item_bias[None, :]
+        np.clip(estimates, *self.rating_scale, out=estimates)
+        estimates[self.rated[user_codes].nonzero()] = -np.inf
+        return estimates
+
+    def fold_in(self, user_id, ratings: Iterable[Tuple[object, float]],
+                regularization: float = DEFAULT_FOLD_IN_REGULARIZATION) -> bool:
+        """
+        Recalcula b_u y p_u del usuario a partir de sus calificaciones
+        [(id de juego, calificación)], sin tocar los factores de los juegos:
+
+            min  sum_i (r_ui - mu - b_i - b_u - p_u · q_i)^2 + reg (b_u^2 + |p_u|^2)
+
+        sobre los juegos del modelo, que es un sistema lineal de
+        (factores + 1) × (factores + 1). Devuelve False (y deja al usuario como
+        estaba en el modelo) si ninguna calificación es de un juego conocido.
+        """
+        codes, values = [], []
+        for item_id, rating in ratings:
+            code = self.item_code_of.get(item_id)
+            if code is not None:
+                codes.append(code)
+                values.append(float(rating))
+        if not codes:
+            self._folded.pop(user_id, None)
+            return False
+
+        codes = np.asarray(codes, dtype=np.int64)
+        residuals = np.asarray(values) - self.global_mean - self.item_bias[codes]
+        design = self.item_factors[codes]
+        if self.biased:
+            design = np.hstack([np.ones((len(codes), 1)), design])
+        penalty = regularization * len(codes) * np.eye(design.shape[1])
+        solution = np.linalg.solve(design.T @ design + penalty, design.T @ residuals)
+        bias, factors = (solution[0], solution[1:]) if self.biased else (0.0, solution)
+        self._folded[user_id] = (float(bias), factors, codes)
+        return True
+
+    def _folded_scores(self, user_id) -> np.ndarray:
+        bias, factors, codes = self._folded[user_id]
+        estimates = self.item_factors @ factors + self.global_mean + bias + self.item_bias
+        np.clip(estimates, *self.rating_scale, out=estimates)
+        estimates[codes] = -np.inf
+        return estimates
+
+    def _top(self, scores: np.ndarray, top_n: int) -> List[Tuple[int, float]]:
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if candidates.size == 0 or top_n <= 0:
+            return []
+        scores = scores[candidates]
+        if candidates.size > top_n:
+            # Con el recorte a la escala es común empatar en el máximo: se conservan
+            # los empatados con el último y se desempata por índice del trainset.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(self.item_ids[code].item(), float(score)) for code, score in zip(candidates[order], scores[order])]
+
+    def has_user(self, user_id) -> bool:
+        return user_id in self._folded or user_id in self.user_code_of
+
+    def recommend(self, user_id, top_n: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Los `top_n` juegos sin calificar con mayor predicción para el usuario:
+        [(id de juego, predicción)]. None si el usuario no está en el trainset
+        ni se le hizo `fold_in`.
+        """
+        if user_id in self._folded:
+            return self._top(self._folded_scores(user_id), top_n)
+        code = self.user_code_of.get(user_id)
+        if code is None:
+            return None
+        return self._top(self.scores(np.array([code]))[0], top_n)
+
+    def recommend_batch(self, user_ids: Iterable, top_n: int,
+                        block_size: int = DEFAULT_BLOCK_SIZE) -> Dict[object, List[Tuple[int, float]]]:
+        """
+        `recommend` para muchos usuarios: cada bloque de `block_size` usuarios se
+        puntúa con una sola multiplicación de matrices. Los usuarios que no están
+        en el trainset (ni se les hizo `fold_in`) no aparecen en el resultado.
+        """
+        recommendations = {}
+        known = []
+        for user_id in user_ids:
+            if user_id in self._folded:
+                recommendations[user_id] = self._top(self._folded_scores(user_id), top_n)
+            elif user_id in self.user_code_of:
+                known.append((user_id, self.user_code_of[user_id]))
+        for start in range(0, len(known), block_size):
+            block = known[start:start + block_size]
+            block_scores = self.scores(np.array([code for _, code in block]))
+            for (user_id, _), user_scores in zip(block, block_scores):
+                recommendations[user_id] = self._top(user_scores, top_n)
+        return recommendations
@@ -0,0 +1,208 @@
+"""
+Paridad de los motores propios con las bibliotecas a las que reemplazan, sobre
+los datos del repositorio (interacciones.json y datos_juegos.json):
+
+  - item_cf.ItemItemCF y user_cf.UserNeighborhoods contra KNNBasic de Surprise.
+  - svd_scoring.SVDScorer contra SVD.predict.
+  - apriori_rules.pair_rules contra la minería de mlxtend con max_len=2.
+  - content_neighbors.ContentNeighbors (la puntuación de recomendar_juegos_tfidf)
+    contra el recorrido original sobre la matriz densa de similitud coseno.
+
+Uso:
+    python -m pytest -q test_parity.py
+"""
+import json
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+from surprise import SVD, Dataset, KNNBasic, Reader
+
+from apriori_rules import MiningConfig, mine_association_rules, pair_rules, rules_from_dataframe
+from content_neighbors import ContentNeighbors
+from content_text import tag_words
+from interaction_index import LikedPairCounts, UserInteractionIndex, is_liked
+from interaction_matrix import InteractionMatrix, as_float64
+from item_cf import ItemItemCF
+from svd_scoring import SVDScorer
+from user_cf import UserNeighborhoods
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _read_json(filename: str) -> Dict:
+    with open(os.path.join(DATA_DIR, filename), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='module')
+def interacciones() -> Dict:
+    return _read_json('interacciones.json')
+
+
+@pytest.fixture(scope='module')
+def juegos() -> Dict:
+    return _read_json('datos_juegos.json')
+
+
+@pytest.fixture(scope='module')
+def ratings(interacciones) -> List[Tuple[object, int, float]]:
+    """Las calificaciones (usuario, juego, calificación) con que app.py arma el trainset de Surprise."""
+    matrix = InteractionMatrix.from_interacciones(interacciones)
+    values = as_float64(matrix.ratings)
+    valid = np.flatnonzero(matrix.has_rating & (values >= 0) & (values <= 5))
+    return [
+        (matrix.user_ids[user_code], int(matrix.game_ids[game_code]), float(rating))
+        for user_code, game_code, rating in zip(matrix.user_codes[valid], matrix.game_codes[valid], values[valid])
+        if matrix.user_ids[user_code] is not None
+    ]
+
+
+@pytest.fixture(scope='module')
+def trainset(ratings):
+    data = pd.DataFrame(ratings, columns=['userID', 'itemID', 'rating'])
+    return Dataset.load_from_df(data, Reader(rating_scale=(0, 5))).build_full_trainset()
+
+
+def _knn(trainset, user_based: bool) -> KNNBasic:
+    model = KNNBasic(sim_options={'name': 'cosine', 'user_based': user_based}, verbose=False)
+    model.fit(trainset)
+    return model
+
+
+def test_item_cf_matches_knnbasic(ratings, trainset):
+    model = _knn(trainset, user_based=False)
+    item_cf = ItemItemCF.from_ratings(ratings, top_k=len({item_id for _, item_id, _ in ratings}))
+
+    for user_id, code in item_cf.user_code_of.items():
+        scores = item_cf.scores(np.array([code]))[0]
+        unrated = np.isfinite(scores)
+        expected = [model.predict(user_id, item_id).est for item_id in item_cf.item_ids[unrated].tolist()]
+        np.testing.assert_allclose(scores[unrated], expected, atol=1e-9)
+
+
+def test_user_neighborhoods_match_knnbasic(interacciones, trainset):
+    model = _knn(trainset, user_based=True)
+    neighborhoods = UserNeighborhoods(interacciones)
+    neighborhoods.rebuild(top_k=len(neighborhoods.user_ids))
+
+    checked = 0
+    for user_id in neighborhoods.user_ids:
+        recommendations = neighborhoods.recommend(user_id, len(neighborhoods.item_ids))
+        if recommendations is None:
+            continue
+        for item_id, score in recommendations:
+            assert score == pytest.approx(model.predict(user_id, item_id).est, abs=1e-9)
+        checked += 1
+    assert checked > 0
+
+
+def test_svd_scorer_matches_predict(trainset):
+    model = SVD(random_state=0)
+    model.fit(trainset)
+    scorer = SVDScorer.from_model(model, trainset)
+
+    for user_id, code in scorer.user_code_of.items():
+        scores = scorer.scores(np.array([code]))[0]
+        unrated = np.isfinite(scores)
+        expected = [model.predict(user_id, item_id).est for item_id in scorer.item_ids[unrated].tolist()]
+        np.testing.assert_allclose(scores[unrated], expected, atol=1e-9)
+
+
+def test_pair_rules_match_mlxtend(interacciones, juegos):
+    game_id_to_name = {str(game_id): details['nombre'] for game_id, details in juegos.items()}
+    # Columnas como en app.basket_columns: una por nombre, en orden de primera aparición.
+    column_of_name: Dict[str, int] = {}
+    for game_id in InteractionMatrix.from_interacciones(interacciones).game_ids:
+        column_of_name.setdefault(game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})"), len(column_of_name))
+
+    # Canasta de referencia: una fila por usuario con ID; si repite un juego cuenta su última interacción.
+    rows, columns = [], []
+    users = [entry for entry in interacciones['interacciones'] if entry.get('id') is not None]
+    for row, user_entry in enumerate(users):
+        liked = {str(interaction.get('id_juego')): is_liked(interaction) for interaction in user_entry['interacciones']}
+        for game_name in {game_id_to_name.get(game_id, f"Juego Desconocido ({game_id})")
+                          for game_id, is_game_liked in liked.items() if is_game_liked}:
+            rows.append(row)
+            columns.append(column_of_name[game_name])
+    basket = sp.csr_matrix((np.ones(len(rows), dtype=bool), (rows, columns)), shape=(len(users), len(column_of_name)))
+
+    config = MiningConfig(max_len=2)
+    expected = rules_from_dataframe(mine_association_rules(basket, list(column_of_name), config)[0])
+    n_users, item_counts, pairs = LikedPairCounts(interacciones).copy_counts()
+    got = pair_rules(n_users, item_counts, pairs, column_of_name, game_id_to_name, config)
+
+    def normalized(rules):
+        return sorted((tuple(sorted(antecedent)), tuple(sorted(consequent)), round(confidence, 12))
+                      for antecedent, consequent, confidence in rules)
+
+    assert expected
+    assert normalized(got) == normalized(expected)
+
+
+def _dense_content_scores(sim_df: pd.DataFrame, user_interactions: List[Dict]) -> Dict[str, float]:
+    """El recorrido original de recomendar_juegos_tfidf sobre la matriz N×N (sin orden ni formato)."""
+    played_game_ids = {str(interaction.get('id_juego')) for interaction in user_interactions}
+    highly_rated_game_ids = [str(interaction.get('id_juego')) for interaction in user_interactions
+                             if interaction.get('calificacion', 0) >= 4.0 or interaction.get('like', False)]
+    predicted_scores = {}
+    for game_id_to_predict in sim_df.index:
+        if game_id_to_predict in played_game_ids:
+            continue
+        sim_sum = 0
+        weighted_score_sum = 0
+        for liked_game_id in highly_rated_game_ids:
+            if liked_game_id in sim_df.columns:
+                similarity = sim_df.loc[game_id_to_predict, liked_game_id]
+                current_rating = next(interaction.get('calificacion', 0) for interaction in user_interactions
+                                      if str(interaction.get('id_juego')) == liked_game_id)
+                weighted_score_sum += similarity * (current_rating if current_rating > 0 else 5)
+                sim_sum += similarity
+        if sim_sum > 0:
+            predicted_scores[game_id_to_predict] = weighted_score_sum / sim_sum
+    return predicted_scores
+
+
+def test_content_scores_match_dense_loop(interacciones, juegos):
+    game_ids, documents = [], []
+    for game_id, details in juegos.items():
+        content_words = tag_words(details)
+        if content_words:
+            game_ids.append(str(game_id))
+            documents.append(" ".join(content_words))
+    tfidf_matrix = TfidfVectorizer().fit_transform(documents)
+    sim_df = pd.DataFrame(cosine_similarity(tfidf_matrix), index=game_ids, columns=game_ids)
+    # Con tantos vecinos como juegos, la tabla guarda todas las similitudes distintas de 0.
+    neighbors = ContentNeighbors.from_vectors(game_ids, tfidf_matrix, top_k=len(game_ids))
+    interaction_index = UserInteractionIndex(interacciones)
+
+    checked = 0
+    for user_entry in interacciones['interacciones']:
+        user_interactions = list(interaction_index.games(user_entry.get('id')).values())
+        liked = [interaction for interaction in user_interactions
+                 if interaction.get('calificacion', 0) >= 4.0 or interaction.get('like', False)]
+        if user_entry.get('id') is None or not liked:
+            continue
+        liked_codes, weights = [], []
+        for interaction in liked:
+            game_code = neighbors.game_code_of.get(str(interaction['id_juego']))
+            if game_code is not None:
+                rating = interaction.get('calificacion', 0)
+                liked_codes.append(game_code)
+                weights.append(rating if rating > 0 else 5)
+        played_codes = [neighbors.game_code_of[str(interaction['id_juego'])] for interaction in user_interactions
+                        if str(interaction['id_juego']) in neighbors.game_code_of]
+        recommendations = neighbors.recommend(liked_codes, weights, played_codes, len(game_ids))
+        got = {neighbors.game_ids[code]: score for code, score in recommendations}
+        expected = _dense_content_scores(sim_df, user_interactions)
+
+        assert got.keys() == expected.keys()
+        for game_id, score in expected.items():
+            assert got[game_id] == pytest.approx(score, abs=1e-6)
+        checked += 1
+    assert checked > 0
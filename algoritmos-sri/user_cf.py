@@ -0,0 +1,490 @@
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+DEFAULT_TOP_K = 100
+# Vecinos por predicción, como KNNBasic(k=40).
+DEFAULT_K = 40
+DEFAULT_BLOCK_SIZE = 1024
+
+
+def rating_of(interaction: Dict) -> Optional[float]:
+    """Calificación válida para el filtrado colaborativo (0 a 5, como en Surprise); None si no tiene."""
+    try:
+        rating = float(interaction.get('calificacion'))
+    except (TypeError, ValueError):
+        return None
+    return rating if 0 <= rating <= 5 else None
+
+
+# Fila de calificaciones: (códigos ordenados, calificaciones). Por usuario, los
+# códigos son de juego; por juego, de los usuarios que lo calificaron.
+Row = Tuple[np.ndarray, np.ndarray]
+EMPTY_ROW: Row = (np.empty(0, dtype=np.int32), np.empty(0))
+
+
+def _pattern(matrix: sp.csr_matrix, data: np.ndarray) -> sp.csr_matrix:
+    """Matriz con el mismo patrón que `matrix` (incluidos sus ceros explícitos) y otros valores."""
+    return sp.csr_matrix((data, matrix.indices, matrix.indptr), shape=matrix.shape)
+
+
+def _sorted_top_k(codes: np.ndarray, similarities: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Los `top_k` de mayor similitud, ordenados de mayor a menor (a igual similitud, por código)."""
+    if len(codes) > top_k:
+        keep = np.argpartition(-similarities, top_k - 1)[:top_k]
+        threshold = similarities[keep].min()
+        keep = similarities >= threshold
+        codes, similarities = codes[keep], similarities[keep]
+    order = np.lexsort((codes, -similarities))[:top_k]
+    return codes[order].astype(np.int32), similarities[order]
+
+
+def _with_neighbor(codes: np.ndarray, similarities: np.ndarray, code: int, similarity: float,
+                   top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lista de vecinos (ordenada como la deja `_sorted_top_k`) sin `code` y, si
+    `similarity` > 0, con `code` en su lugar: sin volver a ordenar la lista.
+    """
+    present = np.flatnonzero(codes == code)
+    if present.size:
+        position = present[0]
+        codes = np.concatenate((codes[:position], codes[position + 1:]))
+        similarities = np.concatenate((similarities[:position], similarities[position + 1:]))
+    if similarity > 0:
+        descending = -similarities
+        start = descending.searchsorted(-similarity, side='left')
+        stop = descending.searchsorted(-similarity, side='right')
+        position = start + codes[start:stop].searchsorted(code)
+        if position < top_k:
+            codes = np.concatenate((codes[:position], np.array([code], dtype=codes.dtype), codes[position:top_k - 1]))
+            similarities = np.concatenate((similarities[:position], [similarity], similarities[position:top_k - 1]))
+    return codes, similarities
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """`array` con al menos `size` posiciones (las nuevas en 0); duplica la capacidad para crecer en O(1) amortizado."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _value_in(row: Row, key: int) -> Optional[float]:
+    keys, values = row
+    position = np.searchsorted(keys, key)
+    return float(values[position]) if position < len(keys) and keys[position] == key else None
+
+
+def _with_value(row: Row, key: int, value: Optional[float]) -> Row:
+    """Copia de la fila con `key` reemplazada (o quitada, con None): las filas nunca se modifican en su lugar."""
+    keys, values = row
+    position = np.searchsorted(keys, key)
+    if position < len(keys) and keys[position] == key:
+        keys, values = np.delete(keys, position), np.delete(values, position)
+    if value is not None:
+        keys, values = np.insert(keys, position, key), np.insert(values, position, value)
+    return keys, values
+
+
+def _co_raters(row: Row, raters: List[Row]) -> np.ndarray:
+    """Usuarios que calificaron alguno de los juegos de la fila de un usuario (ordenados, sin repetir)."""
+    if len(row[0]) == 0:
+        return np.empty(0, dtype=np.int32)
+    return np.unique(np.concatenate([raters[item][0] for item in row[0].tolist()]))
+
+
+def _stacked(codes: np.ndarray, rows: List[Row]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Las filas de `codes`, una tras otra: (posición en `codes` de cada calificación, juegos, calificaciones)."""
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0)
+    items, ratings = zip(*[rows[code] for code in codes.tolist()])
+    lengths = np.fromiter(map(len, items), dtype=np.int64, count=len(items))
+    return np.repeat(np.arange(len(codes)), lengths), np.concatenate(items), np.concatenate(ratings)
+
+
+def _similarities_with(row: Row, stacked: Tuple[np.ndarray, np.ndarray, np.ndarray], n_others: int) -> np.ndarray:
+    """
+    Similitud coseno (de Surprise) de la fila de un usuario con cada una de
+    las `n_others` filas de `stacked` (ver `_stacked`). Las sumas sobre los
+    juegos que calificaron ambos se acumulan en orden de juego, como en el
+    producto disperso de `UserNeighborhoods.rebuild()`, así que dan
+    exactamente los mismos valores.
+    """
+    items, ratings = row
+    owner, other_items, other_ratings = stacked
+    similarities = np.zeros(n_others)
+    if n_others == 0 or len(items) == 0:
+        return similarities
+    positions = np.minimum(np.searchsorted(items, other_items), len(items) - 1)
+    common = items[positions] == other_items
+    own, other, owner = ratings[positions[common]], other_ratings[common], owner[common]
+    products = np.bincount(owner, weights=own * other, minlength=n_others)
+    own_squares = np.bincount(owner, weights=own ** 2, minlength=n_others)
+    other_squares = np.bincount(owner, weights=other ** 2, minlength=n_others)
+    positive = products > 0
+    similarities[positive] = products[positive] / np.sqrt(own_squares[positive] * other_squares[positive])
+    return similarities
+
+
+class UserNeighborhoods:
+    """
+    Filtrado colaborativo basado en usuarios con los vecinos de cada usuario
+    precalculados, en lugar de un KNNBasic(user_based=True) de Surprise, que
+    calcula la matriz completa usuarios × usuarios.
+
+    Las calificaciones (0 a 5) se guardan por usuario (sus juegos y
+    calificaciones) y por juego (quiénes lo calificaron), y se mantienen al día
+    evento por evento, como `LikedPairCounts`: se construyen una vez por carga
+    de interacciones.json y `update()` aplica la interacción resultante de cada
+    /responder_juego reescribiendo solo la fila de ese usuario y la de ese
+    juego. Si un usuario repite un juego cuenta su primera interacción, como en
+    `UserInteractionIndex`.
+
+    `rebuild()` (en cada entrenamiento de modelos) arma la matriz CSR usuarios
+    × juegos fuera del candado y calcula los `top_k` vecinos de cada usuario
+    con el coseno de Surprise (normas solo sobre los juegos calificados por
+    ambos), por bloques de usuarios. Entre entrenamientos, un evento solo
+    cambia la similitud del usuario con quienes calificaron el mismo juego: se
+    recalculan esas similitudes (antes y después del evento) recorriendo solo
+    sus filas, y con ellas se corrige la lista del usuario y su lugar en las
+    listas de los afectados. El costo depende de cuántos calificaron el juego,
+    no del total de calificaciones. Si en una lista llena baja la similitud de
+    un vecino, el lugar que deja puede corresponder a alguien de fuera de la
+    lista: esa lista se marca y se recalcula completa la próxima vez que se
+    consulta el usuario. Así, las listas consultadas son siempre las vigentes.
+
+    La predicción es la de KNNBasic, solo con los vecinos guardados:
+    sum_v sim(u, v) r_vi / sum_v sim(u, v) sobre los (hasta `k`) vecinos más
+    similares que calificaron el juego; sin ninguno, el promedio global. Con
+    `top_k` >= usuarios - 1 las predicciones son las mismas que las de KNNBasic.
+
+    Los IDs de juego son enteros, como en los datos de Surprise. Lecturas y
+    escrituras usan el candado propio de la clase.
+    """
+
+    def __init__(self, interacciones_data: Dict):
+        self._lock = threading.Lock()
+        self.top_k = DEFAULT_TOP_K
+        self.k = DEFAULT_K
+        self.user_ids: List[Any] = []
+        self.user_code_of: Dict[Any, int] = {}
+        self.item_ids: List[int] = []
+        self.item_code_of: Dict[int, int] = {}
+        # Fila de cada usuario (juegos y calificaciones) y de cada juego (usuarios y calificaciones).
+        self._rows: List[Row] = []
+        self._raters: List[Row] = []
+        self._rating_sum = 0.0
+        self._rating_count = 0
+        # Con capacidad de sobra (ver `_grow`): solo valen las primeras len(item_ids) / len(user_ids).
+        self._item_counts = np.zeros(0, dtype=np.int64)
+        self._neighbors: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # Similitud y código del último vecino de cada usuario con la lista llena (0 si no está llena).
+        self._floor = np.zeros(0)
+        self._floor_code = np.zeros(0, dtype=np.int64)
+        self._built = False
+        # Usuarios con eventos desde que empezó el `rebuild()` en curso.
+        self._dirty: Set[int] = set()
+        # Usuarios cuya lista puede no tener a todos sus `top_k` vecinos (ver `_update_other_lists`).
+        self._stale: Set[int] = set()
+
+        rows, columns, values = [], [], []
+        seen = set()
+        for user_entry in interacciones_data.get('interacciones', []):
+            user_id = user_entry.get('id')
+            if user_id is None:
+                continue
+            for interaction in user_entry.get('interacciones', []):
+                item_id = self._item_id(interaction)
+                rating = rating_of(interaction)
+                if item_id is None or (user_id, item_id) in seen:
+                    continue
+                seen.add((user_id, item_id))
+                if rating is None:
+                    continue
+                rows.append(self._user_code(user_id))
+                columns.append(self._item_code(item_id))
+                values.append(rating)
+        ratings = self._csr(rows, columns, values, (len(self.user_ids), len(self.item_ids)))
+        by_item = ratings.tocsc()
+        self._rows = [(ratings.indices[ratings.indptr[code]:ratings.indptr[code + 1]],
+                       ratings.data[ratings.indptr[code]:ratings.indptr[code + 1]]) for code in range(ratings.shape[0])]
+        self._raters = [(by_item.indices[by_item.indptr[code]:by_item.indptr[code + 1]],
+                         by_item.data[by_item.indptr[code]:by_item.indptr[code + 1]]) for code in range(by_item.shape[1])]
+        self._rating_sum, self._rating_count = float(sum(values)), len(values)
+        self._item_counts = np.diff(by_item.indptr).astype(np.int64)
+        self._floor = np.zeros(len(self.user_ids))
+        self._floor_code = np.zeros(len(self.user_ids), dtype=np.int64)
+
+    @staticmethod
+    def _item_id(interaction: Dict) -> Optional[int]:
+        try:
+            return int(interaction.get('id_juego'))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _csr(rows: List[int], columns: List[int], values: List[float], shape: Tuple[int, int]) -> sp.csr_matrix:
+        """CSR que conserva las calificaciones 0 como ceros explícitos (sí cuentan como calificadas)."""
+        rows, columns = np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int32)
+        order = np.lexsort((columns, rows))
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=shape[0])))).astype(np.int64)
+        return sp.csr_matrix((np.asarray(values, dtype=np.float64)[order], columns[order], indptr), shape=shape)
+
+    @staticmethod
+    def _rows_csr(rows: List[Row], n_items: int) -> sp.csr_matrix:
+        """Las filas de usuario como una CSR usuarios × juegos (para `rebuild()`)."""
+        if not rows:
+            return sp.csr_matrix((0, n_items))
+        lengths = np.array([len(items) for items, _ in rows], dtype=np.int64)
+        indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        indices = np.concatenate([items for items, _ in rows]).astype(np.int32)
+        data = np.concatenate([values for _, values in rows]).astype(np.float64)
+        return sp.csr_matrix((data, indices, indptr), shape=(len(rows), n_items))
+
+    def _user_code(self, user_id) -> int:
+        code = self.user_code_of.get(user_id)
+        if code is None:
+            code = self.user_code_of[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+            self._rows.append(EMPTY_ROW)
+            self._floor = _grow(self._floor, len(self.user_ids))
+            self._floor_code = _grow(self._floor_code, len(self.user_ids))
+        return code
+
+    def _item_code(self, item_id: int) -> int:
+        code = self.item_code_of.get(item_id)
+        if code is None:
+            code = self.item_code_of[item_id] = len(self.item_ids)
+            self.item_ids.append(item_id)
+            self._raters.append(EMPTY_ROW)
+            self._item_counts = _grow(self._item_counts, len(self.item_ids))
+        return code
+
+    @property
+    def global_mean(self) -> float:
+        return self._rating_sum / self._rating_count if self._rating_count else 0.0
+
+    @staticmethod
+    def _block_similarities(ratings: sp.csr_matrix, rated: sp.csr_matrix, squared: sp.csr_matrix,
+                            start: int, stop: int) -> sp.csr_matrix:
+        """Similitud coseno (de Surprise) de los usuarios start..stop con todos; sin similitudes 0."""
+        products = sp.csr_matrix(ratings[start:stop] @ ratings.T)
+        products.eliminate_zeros()
+        products.sort_indices()
+        # Suma de r_ui^2 (y de r_vi^2) sobre los juegos que calificaron ambos; su patrón contiene
+        # al de `products`, así que al multiplicar por su patrón quedan alineados con `products.data`.
+        pattern = _pattern(products, np.ones_like(products.data))
+        own_squares = sp.csr_matrix((squared[start:stop] @ rated.T).multiply(pattern))
+        other_squares = sp.csr_matrix((rated[start:stop] @ squared.T).multiply(pattern))
+        own_squares.sort_indices()
+        other_squares.sort_indices()
+        # Misma fórmula (y redondeo) que `_similarities_with`.
+        return _pattern(products, products.data / np.sqrt(own_squares.data * other_squares.data))
+
+    def _row_similarities(self, code: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Usuarios con similitud positiva con `code` (sin él) y sus similitudes, sobre las calificaciones vigentes."""
+        row = self._rows[code]
+        others = _co_raters(row, self._raters)
+        others = others[others != code]
+        similarities = _similarities_with(row, _stacked(others, self._rows), len(others))
+        positive = similarities > 0
+        return others[positive], similarities[positive]
+
+    def rebuild(self, top_k: int = DEFAULT_TOP_K, k: int = DEFAULT_K, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        """
+        Recalcula los vecinos de todos los usuarios. El cálculo se hace fuera
+        del candado sobre las calificaciones vigentes al empezar y se publica
+        siempre; los usuarios con eventos durante el cálculo se vuelven a
+        aplicar después sobre la tabla nueva, como si el evento llegara en ese
+        momento. Quien llama no debe ejecutar dos `rebuild()` a la vez.
+        """
+        with self._lock:
+            # Las filas no se modifican en su lugar: basta copiar las listas.
+            rows, raters = list(self._rows), list(self._raters)
+            n_items = len(self.item_ids)
+            self._dirty = set()
+        ratings = self._rows_csr(rows, n_items)
+        rated = _pattern(ratings, np.ones_like(ratings.data))
+        squared = _pattern(ratings, ratings.data ** 2)
+        neighbors: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        floor, floor_code = np.zeros(ratings.shape[0]), np.zeros(ratings.shape[0], dtype=np.int64)
+        for start in range(0, ratings.shape[0], block_size):
+            stop = min(start + block_size, ratings.shape[0])
+            similarities = self._block_similarities(ratings, rated, squared, start, stop)
+            for row in range(stop - start):
+                code = start + row
+                row_start, row_stop = similarities.indptr[row], similarities.indptr[row + 1]
+                codes, values = similarities.indices[row_start:row_stop], similarities.data[row_start:row_stop]
+                keep = codes != code
+                codes, values = _sorted_top_k(codes[keep], values[keep], top_k)
+                if len(codes):
+                    neighbors[code] = (codes, values)
+                    if len(codes) == top_k:
+                        floor[code], floor_code[code] = values[-1], codes[-1]
+        with self._lock:
+            self.top_k, self.k = top_k, k
+            self._neighbors = neighbors
+            self._floor = _grow(floor, len(self.user_ids))
+            self._floor_code = _grow(floor_code, len(self.user_ids))
+            self._stale = set()
+            self._built = True
+            self._replay(rows, raters)
+            self._dirty = set()
+
+    def _replay(self, rows: List[Row], raters: List[Row]) -> None:
+        """
+        Lleva la tabla recién calculada sobre `rows`/`raters` a las calificaciones
+        vigentes: solo cambiaron las filas de los usuarios de `_dirty`.
+        """
+        dirty = np.array(sorted(self._dirty), dtype=np.int64)
+        for code in dirty.tolist():
+            self._set_neighbors(code, *self._row_similarities(code))
+        # Entre dos usuarios con eventos la similitud ya quedó en las listas de ambos; con
+        # los demás cambió solo la de quienes calificaron algún juego de la fila anterior o la nueva.
+        for code in dirty.tolist():
+            previous_row = rows[code] if code < len(rows) else EMPTY_ROW
+            others = np.union1d(_co_raters(previous_row, raters), _co_raters(self._rows[code], self._raters))
+            others = others[~np.isin(others, dirty)]
+            stacked = _stacked(others, self._rows)
+            self._update_other_lists(code, others, _similarities_with(previous_row, stacked, len(others)),
+                                     _similarities_with(self._rows[code], stacked, len(others)))
+
+    def _store_list(self, code: int, codes: np.ndarray, similarities: np.ndarray) -> None:
+        """Guarda la lista de vecinos de `code` (ya ordenada y recortada) y su piso."""
+        if len(codes):
+            self._neighbors[code] = (codes, similarities)
+        else:
+            self._neighbors.pop(code, None)
+        full = len(codes) == self.top_k
+        self._floor[code] = similarities[-1] if full else 0.0
+        self._floor_code[code] = codes[-1] if full else 0
+
+    def _set_neighbors(self, code: int, codes: np.ndarray, similarities: np.ndarray) -> None:
+        """Lista completa de vecinos de `code` a partir de sus similitudes positivas."""
+        self._store_list(code, *_sorted_top_k(codes, similarities, self.top_k))
+        self._stale.discard(code)
+
+    def _update_own_list(self, code: int, others: np.ndarray, similarities: np.ndarray) -> None:
+        """Corrige la lista de `code` con sus similitudes nuevas con `others` (ordenados); las demás no cambiaron."""
+        codes, values = self._neighbors.get(code, (np.empty(0, dtype=np.int32), np.empty(0)))
+        changed = np.isin(codes, others)
+        # Lista llena con un vecino que bajó: alguien de fuera podría ocupar el lugar.
+        if self._floor[code] > 0 and np.any(similarities[np.searchsorted(others, codes[changed])] < values[changed]):
+            self._stale.add(code)
+        positive = similarities > 0
+        self._store_list(code, *_sorted_top_k(np.concatenate((codes[~changed], others[positive])),
+                                              np.concatenate((values[~changed], similarities[positive])), self.top_k))
+
+    def _update_other_lists(self, code: int, others: np.ndarray, previous_similarities: np.ndarray,
+                            similarities: np.ndarray) -> None:
+        """Corrige la entrada de `code` en las listas de `others`, con su similitud anterior y la nueva."""
+        # Solo las listas donde `code` estaba o donde ahora entra: en una lista llena, si
+        # su (similitud, código) no queda detrás del último vecino (a igual similitud
+        # decide el código, como en `rebuild()`); en una no llena (piso 0), si es positiva.
+        floor, floor_code = self._floor[others], self._floor_code[others]
+        was_in = (previous_similarities > 0) & (
+            (previous_similarities > floor) | ((previous_similarities == floor) & (code <= floor_code)))
+        enters = (similarities > 0) & ((similarities > floor) | ((similarities == floor) & (code < floor_code)))
+        affected = np.flatnonzero((similarities != previous_similarities) & (was_in | enters))
+        if affected.size == 0:
+            return
+        others, previous, current = others[affected], previous_similarities[affected], similarities[affected]
+        # Listas llenas en las que `code` estaba y bajó: alguien de fuera podría ocupar el lugar.
+        self._stale.update(others[(floor[affected] > 0) & was_in[affected] & (current < previous)].tolist())
+
+        no_neighbors = (np.empty(0, dtype=np.int32), np.empty(0))
+        for other, current in zip(others.tolist(), current.tolist()):
+            self._store_list(other, *_with_neighbor(*self._neighbors.get(other, no_neighbors), code, current, self.top_k))
+
+    def update(self, user_id, nueva: Dict) -> None:
+        """Aplica la interacción resultante de un evento (la que devuelve `UserInteractionIndex.apply`)."""
+        item_id = self._item_id(nueva)
+        if user_id is None or item_id is None:
+            return
+        rating = rating_of(nueva)
+        with self._lock:
+            if rating is None and (user_id not in self.user_code_of or item_id not in self.item_code_of):
+                return
+            user_code, item_code = self._user_code(user_id), self._item_code(item_id)
+            previous_row = self._rows[user_code]
+            previous = _value_in(previous_row, item_code)
+            if previous == rating:
+                return
+            # Solo cambia la similitud con quienes calificaron este juego (sus filas no cambian).
+            others = self._raters[item_code][0]
+            others = others[others != user_code]
+            stacked = _stacked(others, self._rows) if self._built else None
+            previous_similarities = _similarities_with(previous_row, stacked, len(others)) if self._built else None
+
+            self._rows[user_code] = _with_value(previous_row, item_code, rating)
+            self._raters[item_code] = _with_value(self._raters[item_code], user_code, rating)
+            if previous is not None:
+                self._rating_sum -= previous
+                self._rating_count -= 1
+                self._item_counts[item_code] -= 1
+            if rating is not None:
+                self._rating_sum += rating
+                self._rating_count += 1
+                self._item_counts[item_code] += 1
+            self._dirty.add(user_code)
+
+            if self._built:
+                similarities = _similarities_with(self._rows[user_code], stacked, len(others))
+                self._update_own_list(user_code, others, similarities)
+                self._update_other_lists(user_code, others, previous_similarities, similarities)
+
+    def recommend(self, user_id, top_n: int) -> Optional[List[Tuple[int, float]]]:
+        """
+        Los `top_n` juegos sin calificar con mayor predicción para el usuario:
+        [(id de juego, predicción)]. None si el usuario no tiene calificaciones.
+        """
+        with self._lock:
+            code = self.user_code_of.get(user_id)
+            if code is None or len(self._rows[code][0]) == 0:
+                return None
+            if code in self._stale:
+                self._set_neighbors(code, *self._row_similarities(code))
+            neighbor_codes, similarities = self._neighbors.get(code, (np.empty(0, dtype=np.int32), np.empty(0)))
+            # Las filas no se modifican en su lugar: se pueden leer fuera del candado.
+            neighbor_rows = [self._rows[other] for other in neighbor_codes.tolist()]
+            user_items = self._rows[code][0]
+            n_items = len(self.item_ids)
+            k, global_mean, item_counts, item_ids = self.k, self.global_mean, self._item_counts[:n_items].copy(), list(self.item_ids)
+
+        # Calificaciones de los vecinos, con las filas en orden de similitud descendente.
+        if neighbor_rows:
+            rows = np.repeat(np.arange(len(neighbor_rows)), [len(items) for items, _ in neighbor_rows])
+            columns = np.concatenate([items for items, _ in neighbor_rows]).astype(np.int64)
+            values = np.concatenate([ratings for _, ratings in neighbor_rows])
+        else:
+            rows, columns, values = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        if len(neighbor_codes) > k:
+            # Por juego, solo los `k` vecinos más similares que lo calificaron.
+            order = np.lexsort((rows, columns))
+            rows, columns, values = rows[order], columns[order], values[order]
+            group_start = np.searchsorted(columns, columns, side='left')
+            keep = np.arange(len(columns)) - group_start < k
+            rows, columns, values = rows[keep], columns[keep], values[keep]
+        weights = similarities[rows]
+        weighted_sums = np.bincount(columns, weights=weights * values, minlength=n_items)
+        sim_sums = np.bincount(columns, weights=weights, minlength=n_items)
+        scores = np.full(n_items, global_mean)
+        np.divide(weighted_sums, sim_sums, out=scores, where=sim_sums > 0)
+        np.clip(scores, 0, 5, out=scores)
+
+        candidate_mask = item_counts > 0
+        candidate_mask[user_items] = False
+        candidates = np.flatnonzero(candidate_mask)
+        if candidates.size == 0 or top_n <= 0:
+            return []
+        scores = scores[candidates]
+        if candidates.size > top_n:
+            # Se conservan los empatados con el último y se desempata por índice de juego.
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            keep = scores >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+        order = np.lexsort((candidates, -scores))[:top_n]
+        return [(item_ids[code], float(score)) for code, score in zip(candidates[order], scores[order])]